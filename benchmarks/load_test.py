@@ -0,0 +1,202 @@
+import argparse
+import asyncio
+import json
+import os
+import sys
+import time
+from contextlib import asynccontextmanager
+
+import httpx
+import numpy as np
+import pandas as pd
+
+# 📦 Add the project root directory to the Python path
+project_root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, project_root)
+
+from src.api.pydantic_models import CustomerInput
+from src.api.server_timing import parse_server_timing
+
+# 🚦 Load generator for the API: replays recorded or synthetic CustomerInput payloads against
+# /api/predict or /api/predict_batch, either in-process (ASGI transport, no network) or against
+# a running uvicorn / src.api.serve instance, and reports throughput, latency percentiles,
+# errors and the server's own stage timings (Server-Timing header).
+#
+# Closed loop (--concurrency C): C clients each send their next request as soon as the last one
+# answers, which measures capacity. Open loop (--rps R): requests are sent on a fixed schedule
+# whether or not earlier ones have answered, and latency counts from the scheduled send time,
+# so a stalled server shows up as queueing delay instead of fewer requests (coordinated omission).
+
+API_KEY = os.getenv("API_KEY", "supersecretkey")
+PAYLOAD_FIELDS = list(CustomerInput.model_fields)
+PERCENTILES = (50, 95, 99)
+
+# 📥 Payloads: a recorded .jsonl (one CustomerInput per line, optionally under "payload"), a
+# prediction log (.parquet file or directory, or .csv), or synthetic Xente-shaped transactions
+def load_payloads(replay: str = None, n: int = 1000, seed: int = 42) -> list:
+    if replay is None:
+        from src.synthetic_data import generate_transactions
+        df = generate_transactions(n, seed)
+    elif replay.endswith(".jsonl"):
+        with open(replay) as f:
+            records = [json.loads(line) for line in f if line.strip()]
+        df = pd.DataFrame([record.get("payload", record) for record in records])
+    elif replay.endswith(".csv"):
+        df = pd.read_csv(replay)
+    else:
+        df = pd.read_parquet(replay)
+    missing = [field for field in PAYLOAD_FIELDS if field not in df.columns]
+    if missing:
+        raise ValueError(f"Replay source {replay} lacks CustomerInput fields: {missing}")
+    df = df[PAYLOAD_FIELDS].astype({"Amount": float, "Value": float, "TransactionStartTime": str})
+    return [CustomerInput(**record).model_dump() for record in df.to_dict(orient="records")]
+
+# 📨 One request per /predict payload, or one CSV upload per batch_rows payloads
+def build_requests(payloads: list, endpoint: str = "predict", batch_rows: int = 100) -> list:
+    if endpoint == "predict":
+        return [{"method": "POST", "url": "/api/predict", "json": payload} for payload in payloads]
+    if endpoint == "predict_batch":
+        requests = []
+        for start in range(0, len(payloads), batch_rows):
+            body = pd.DataFrame(payloads[start:start + batch_rows]).to_csv(index=False).encode()
+            requests.append({"method": "POST", "url": "/api/predict_batch",
+                             "files": {"file": ("batch.csv", body, "text/csv")}})
+        return requests
+    raise ValueError(f"Unknown endpoint '{endpoint}', use predict or predict_batch")
+
+async def _send(client, request, scheduled=None):
+    started = time.perf_counter()
+    try:
+        response = await client.request(headers={"x-api-key": API_KEY}, **request)
+        status, timing = response.status_code, parse_server_timing(response.headers.get("server-timing"))
+    except httpx.HTTPError as e:
+        status, timing = type(e).__name__, {}
+    finished = time.perf_counter()
+    return {"latency_s": finished - (scheduled if scheduled is not None else started),
+            "service_s": finished - started, "status": status, "server_ms": timing}
+
+# 🔁 Fixed number of clients, each sending back to back
+async def closed_loop(client, requests: list, concurrency: int, total: int = None, duration: float = None) -> list:
+    samples, sent = [], 0
+    deadline = time.perf_counter() + duration if duration else None
+
+    async def worker():
+        nonlocal sent
+        while (total is None or sent < total) and (deadline is None or time.perf_counter() < deadline):
+            request = requests[sent % len(requests)]
+            sent += 1
+            samples.append(await _send(client, request))
+
+    await asyncio.gather(*(worker() for _ in range(concurrency)))
+    return samples
+
+# ⏲️ Fixed arrival rate, independent of how fast the server answers
+async def open_loop(client, requests: list, rps: float, total: int = None, duration: float = None) -> list:
+    total = total if total is not None else int(rps * duration)
+    started = time.perf_counter()
+    tasks = []
+    for i in range(total):
+        scheduled = started + i / rps
+        delay = scheduled - time.perf_counter()
+        if delay > 0:
+            await asyncio.sleep(delay)
+        tasks.append(asyncio.create_task(_send(client, requests[i % len(requests)], scheduled)))
+    return list(await asyncio.gather(*tasks))
+
+# 📊 Throughput, latency percentiles, errors and per-stage server time
+def summarize(samples: list, elapsed_s: float) -> dict:
+    latencies = np.array([sample["latency_s"] for sample in samples]) * 1000
+    statuses = pd.Series([str(sample["status"]) for sample in samples]).value_counts()
+    errors = {status: int(count) for status, count in statuses.items() if status != "200"}
+    report = {
+        "requests": len(samples),
+        "elapsed_s": elapsed_s,
+        "throughput_rps": len(samples) / elapsed_s if elapsed_s > 0 else None,
+        "error_rate": sum(errors.values()) / len(samples) if samples else None,
+        "errors": errors,
+        "latency_ms": {},
+        "server_ms": {},
+    }
+    if len(latencies):
+        report["latency_ms"] = {**{f"p{p}": float(np.percentile(latencies, p)) for p in PERCENTILES},
+                                "mean": float(latencies.mean()), "max": float(latencies.max())}
+    stages = pd.DataFrame([sample["server_ms"] for sample in samples if sample["status"] == 200])
+    for stage in stages.columns:
+        values = stages[stage].dropna().to_numpy()
+        report["server_ms"][stage] = {f"p{p}": float(np.percentile(values, p)) for p in PERCENTILES}
+    return report
+
+@asynccontextmanager
+async def _client(url: str = None, timeout: float = 30.0, ready_timeout: float = 120.0):
+    if url is not None:
+        async with httpx.AsyncClient(base_url=url, timeout=timeout) as client:
+            yield client
+        return
+
+    # In-process: run the app's lifespan (model load, warm-up, background workers) ourselves
+    from src.api.main import app
+    async with app.router.lifespan_context(app):
+        transport = httpx.ASGITransport(app=app)
+        async with httpx.AsyncClient(transport=transport, base_url="http://loadtest", timeout=timeout) as client:
+            deadline = time.perf_counter() + ready_timeout
+            while (response := await client.get("/api/ready")).status_code != 200:
+                if response.json().get("error") or time.perf_counter() > deadline:
+                    raise RuntimeError(f"API never became ready: {response.json()}")
+                await asyncio.sleep(0.1)
+            yield client
+
+async def run_load_test(requests: list, url: str = None, concurrency: int = 8, rps: float = None,
+                        total: int = None, duration: float = None, warmup: int = 0) -> dict:
+    if total is None and duration is None:
+        total = len(requests)
+    async with _client(url) as client:
+        # 🔥 Unmeasured warm-up requests (connection pool, first-call allocations)
+        for request in requests[:warmup]:
+            await _send(client, request)
+        started = time.perf_counter()
+        if rps:
+            samples = await open_loop(client, requests, rps, total, duration)
+        else:
+            samples = await closed_loop(client, requests, concurrency, total, duration)
+        elapsed = time.perf_counter() - started
+    report = summarize(samples, elapsed)
+    report["mode"] = {"rps": rps} if rps else {"concurrency": concurrency}
+    return report
+
+def print_report(report: dict):
+    latency = report["latency_ms"]
+    print(f"🚀 {report['requests']} requests in {report['elapsed_s']:.2f}s "
+          f"→ {report['throughput_rps']:.1f} req/s ({report['mode']})")
+    if latency:
+        print("⏱️ Latency ms: " + ", ".join(f"{key} {value:.1f}" for key, value in latency.items()))
+    print(f"❌ Error rate {report['error_rate']:.2%} {report['errors'] or ''}")
+    for stage, values in report["server_ms"].items():
+        print(f"   🖥️ {stage:<10} " + ", ".join(f"{key} {value:.2f}" for key, value in values.items()))
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Replay recorded or synthetic payloads against the API")
+    parser.add_argument("--url", default=None, help="Base URL of a running server (default: in-process app)")
+    parser.add_argument("--endpoint", choices=["predict", "predict_batch"], default="predict")
+    parser.add_argument("--replay", default=None,
+                        help="Recorded payloads: .jsonl, .csv or prediction-log .parquet (default: synthetic)")
+    parser.add_argument("--payloads", type=int, default=1000, help="Synthetic payloads to generate")
+    parser.add_argument("--batch-rows", type=int, default=100, help="Rows per /predict_batch upload")
+    parser.add_argument("--concurrency", type=int, default=8, help="Closed-loop clients")
+    parser.add_argument("--rps", type=float, default=None, help="Open-loop arrival rate (overrides --concurrency)")
+    parser.add_argument("--requests", type=int, default=None, help="Requests to send (default: one per payload)")
+    parser.add_argument("--duration", type=float, default=None, help="Seconds to run instead of a request count")
+    parser.add_argument("--warmup", type=int, default=10, help="Unmeasured requests sent first")
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--output", default=None, help="Write the JSON report here")
+    args = parser.parse_args()
+
+    requests = build_requests(load_payloads(args.replay, args.payloads, args.seed), args.endpoint, args.batch_rows)
+    report = asyncio.run(run_load_test(requests, args.url, args.concurrency, args.rps, args.requests,
+                                       args.duration, args.warmup))
+    report["endpoint"] = args.endpoint
+    print_report(report)
+    if args.output:
+        os.makedirs(os.path.dirname(args.output) or ".", exist_ok=True)
+        with open(args.output, "w") as f:
+            json.dump(report, f, indent=2)
+        print(f"📄 Report saved to {args.output}")
@@ -0,0 +1,335 @@
+import argparse
+import contextlib
+import io
+import json
+import os
+import platform
+import shutil
+import statistics
+import sys
+import tempfile
+import time
+import tracemalloc
+import warnings
+from datetime import datetime, timezone
+
+# Add the project root directory to the Python path
+project_root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, project_root)
+
+import numpy as np
+import pandas as pd
+
+from src.synthetic_data import as_loaded, generate_transactions
+
+DEFAULT_SIZES = [1_000, 10_000, 100_000]
+DEFAULT_BASELINE = os.path.join(project_root, "benchmarks", "baseline.json")
+DEFAULT_OUTPUT = os.path.join(project_root, "benchmarks", "results", "latest.json")
+# A result regresses when it is this much slower / bigger than the baseline AND the absolute
+# difference is above the floor (timings of a few milliseconds are mostly scheduler noise)
+TIME_TOLERANCE = 0.25
+MEMORY_TOLERANCE = 0.10
+TIME_FLOOR_S = 0.02
+MEMORY_FLOOR_MB = 1.0
+# Timings only compare between runs that agree on these environment() fields
+COMPARABLE_ENVIRONMENT = ("cpu_count", "python", "numpy", "pandas", "sklearn", "xgboost")
+# predict_risk scores with one model trained on this many rows, whatever the benchmark size
+PREDICT_TRAIN_ROWS = 5_000
+
+# 🧱 Inputs per size, built once and shared by the benchmarks (never timed)
+class Inputs:
+    def __init__(self, n_rows, seed, workdir):
+        self.n_rows = n_rows
+        self.seed = seed
+        self.workdir = workdir
+        self._cache = {}
+
+    def get(self, name, build):
+        if name not in self._cache:
+            with contextlib.redirect_stdout(io.StringIO()):
+                self._cache[name] = build()
+        return self._cache[name]
+
+    def raw(self):
+        return self.get("raw", lambda: generate_transactions(self.n_rows, self.seed))
+
+    def loaded(self):
+        return self.get("loaded", lambda: as_loaded(self.raw()))
+
+    def processed(self):
+        from src.data_processing import preprocess_data
+        return self.get("processed", lambda: preprocess_data(self.loaded()))
+
+    def rfm(self):
+        from src.features.rfm_target import create_rfm_features
+        df = self.processed()
+        return self.get("rfm", lambda: create_rfm_features(df, df["TransactionStartTime"].max().tz_localize(None)))
+
+    def processed_path(self):
+        def build():
+            from src.data_processing import to_processed_frame
+            path = os.path.join(self.workdir, f"processed_{self.n_rows}.parquet")
+            to_processed_frame(self.processed()).to_parquet(path, index=False)
+            return path
+        return self.get("processed_path", build)
+
+_scoring_pipelines = {}
+
+# 🤖 A fitted training pipeline (fast profile) on a fixed-size synthetic sample
+def scoring_pipeline(seed):
+    if seed not in _scoring_pipelines:
+        from src.models.predict_model import engineer_features
+        from src.models.train_model import (
+            CATEGORICAL_FEATURES, NUMERIC_FEATURES, build_pipeline, fit_pipeline, to_serving_pipeline
+        )
+        raw = generate_transactions(PREDICT_TRAIN_ROWS, seed + 1)
+        X = engineer_features(raw)[NUMERIC_FEATURES + CATEGORICAL_FEATURES]
+        y = raw["FraudResult"].to_numpy()
+        # Default imbalance handling ("none"), as train_model trains it
+        pipeline = build_pipeline(NUMERIC_FEATURES, CATEGORICAL_FEATURES, profile="fast")
+        with contextlib.redirect_stdout(io.StringIO()), warnings.catch_warnings():
+            warnings.simplefilter("ignore")
+            fit_pipeline(pipeline, X, y)
+        _scoring_pipelines[seed] = to_serving_pipeline(pipeline)
+    return _scoring_pipelines[seed]
+
+# 🏁 Benchmarks: name -> (prepare(inputs) -> zero-argument callable, largest size it runs at)
+def _preprocess_data(inputs):
+    from src.data_processing import preprocess_data
+    df = inputs.loaded()
+    return lambda: preprocess_data(df)
+
+def _date_feature_extractor(inputs):
+    from src.features.transformers import DateFeatureExtractor
+    df = inputs.raw()
+    return lambda: DateFeatureExtractor().fit_transform(df)
+
+def _aggregate_customer_features(inputs):
+    from src.features.transformers import AggregateCustomerFeatures
+    df = inputs.raw()
+    return lambda: AggregateCustomerFeatures().fit_transform(df)
+
+def _create_rfm_features(inputs):
+    from src.features.rfm_target import create_rfm_features
+    df = inputs.processed()
+    snapshot_date = df["TransactionStartTime"].max().tz_localize(None)
+    return lambda: create_rfm_features(df, snapshot_date)
+
+def _assign_risk_label(inputs):
+    from src.features.rfm_target import assign_risk_label
+    rfm = inputs.rfm()
+    return lambda: assign_risk_label(rfm.copy())
+
+def _engineer_features(inputs):
+    from src.models.predict_model import engineer_features
+    df = inputs.raw()
+    return lambda: engineer_features(df)
+
+def _predict_risk(inputs):
+    from src.models.predict_model import predict_risk
+    pipeline = scoring_pipeline(inputs.seed)
+    df = inputs.raw()
+    return lambda: predict_risk(pipeline, df, explain=False)
+
+def _train_and_evaluate(inputs):
+    from src.models.train_model import train_and_evaluate
+    path = inputs.processed_path()
+
+    def run():
+        # Plots and the fitted pipeline land in the scratch directory, not the repo's models/
+        cwd = os.getcwd()
+        os.chdir(inputs.workdir)
+        try:
+            return train_and_evaluate(path, profile="fast")
+        finally:
+            os.chdir(cwd)
+    return run
+
+# Instrumentation overhead: one labelled histogram observation per row, as on the scoring path
+def _metrics_observe(inputs):
+    from src.metrics import Histogram, MetricsRegistry
+    histogram = Histogram("benchmark_seconds", "Benchmark", ("function", "stage"), registry=MetricsRegistry())
+    values = np.random.default_rng(inputs.seed).exponential(0.005, inputs.n_rows).tolist()
+
+    def run():
+        for value in values:
+            histogram.labels("predict_batch", "predict").observe(value)
+    return run
+
+BENCHMARKS = {
+    "preprocess_data": (_preprocess_data, None),
+    "DateFeatureExtractor": (_date_feature_extractor, None),
+    "AggregateCustomerFeatures": (_aggregate_customer_features, None),
+    "create_rfm_features": (_create_rfm_features, None),
+    "assign_risk_label": (_assign_risk_label, None),
+    "engineer_features": (_engineer_features, None),
+    "predict_risk": (_predict_risk, None),
+    "train_and_evaluate": (_train_and_evaluate, 20_000),
+    "metrics_observe": (_metrics_observe, None),
+}
+
+# ⏱️ Wall time over `repeats` quiet runs, then one run under tracemalloc for peak Python/NumPy memory
+# (allocations made inside XGBoost's C++ code are not traced)
+def measure(fn, repeats):
+    with warnings.catch_warnings():
+        # Tiny synthetic sizes trip sklearn/xgboost metric warnings that say nothing about speed
+        warnings.simplefilter("ignore")
+        return _measure(fn, repeats)
+
+def _measure(fn, repeats):
+    timings = []
+    for _ in range(repeats):
+        with contextlib.redirect_stdout(io.StringIO()):
+            start = time.perf_counter()
+            fn()
+            timings.append(time.perf_counter() - start)
+
+    tracemalloc.start()
+    try:
+        with contextlib.redirect_stdout(io.StringIO()):
+            fn()
+        _, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+    return {
+        "seconds_min": min(timings),
+        "seconds_median": statistics.median(timings),
+        "repeats": repeats,
+        "peak_mb": peak / 1024 ** 2,
+    }
+
+def environment() -> dict:
+    import sklearn
+    import xgboost
+    return {
+        "created": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "cpu_count": os.cpu_count(),
+        "numpy": np.__version__,
+        "pandas": pd.__version__,
+        "sklearn": sklearn.__version__,
+        "xgboost": xgboost.__version__,
+    }
+
+def run_benchmarks(sizes=DEFAULT_SIZES, names=None, repeats=5, seed=42, verbose=True) -> dict:
+    names = list(names or BENCHMARKS)
+    unknown = set(names) - set(BENCHMARKS)
+    if unknown:
+        raise ValueError(f"Unknown benchmarks {sorted(unknown)}, expected some of {list(BENCHMARKS)}")
+
+    results = []
+    workdir = tempfile.mkdtemp(prefix="benchmarks_")
+    try:
+        for n_rows in sizes:
+            inputs = Inputs(n_rows, seed, workdir)
+            for name in names:
+                prepare, max_rows = BENCHMARKS[name]
+                if max_rows is not None and n_rows > max_rows:
+                    continue
+                fn = prepare(inputs)
+                result = {"benchmark": name, "rows": n_rows,
+                          **measure(fn, 1 if name == "train_and_evaluate" else repeats)}
+                results.append(result)
+                if verbose:
+                    print(f"⏱️ {name:<26} {n_rows:>9,} rows  {result['seconds_min']:9.4f}s  "
+                          f"{result['peak_mb']:9.1f} MB peak")
+    finally:
+        shutil.rmtree(workdir, ignore_errors=True)
+    return {"environment": environment(), "seed": seed, "results": results}
+
+# 📊 One row per result found in both runs; regressed when over tolerance and over the noise floor
+# Fields of COMPARABLE_ENVIRONMENT that differ, as {field: (baseline, current)}
+def environment_differences(current: dict, baseline: dict) -> dict:
+    ours, theirs = current.get("environment", {}), baseline.get("environment", {})
+    return {key: (theirs.get(key), ours.get(key)) for key in COMPARABLE_ENVIRONMENT
+            if theirs.get(key) != ours.get(key)}
+
+def compare_results(current: dict, baseline: dict, time_tolerance=TIME_TOLERANCE,
+                    memory_tolerance=MEMORY_TOLERANCE) -> pd.DataFrame:
+    differences = environment_differences(current, baseline)
+    if differences:
+        raise ValueError(f"Baseline environment differs (baseline, current): {differences}")
+    reference = {(r["benchmark"], r["rows"]): r for r in baseline["results"]}
+    rows = []
+    for result in current["results"]:
+        base = reference.get((result["benchmark"], result["rows"]))
+        if base is None:
+            continue
+        time_ratio = result["seconds_min"] / base["seconds_min"] if base["seconds_min"] > 0 else 1.0
+        memory_ratio = result["peak_mb"] / base["peak_mb"] if base["peak_mb"] > 0 else 1.0
+        slower = (time_ratio > 1 + time_tolerance
+                  and result["seconds_min"] - base["seconds_min"] > TIME_FLOOR_S)
+        bigger = (memory_ratio > 1 + memory_tolerance
+                  and result["peak_mb"] - base["peak_mb"] > MEMORY_FLOOR_MB)
+        rows.append({
+            "benchmark": result["benchmark"],
+            "rows": result["rows"],
+            "seconds": result["seconds_min"],
+            "baseline_seconds": base["seconds_min"],
+            "time_ratio": time_ratio,
+            "peak_mb": result["peak_mb"],
+            "baseline_peak_mb": base["peak_mb"],
+            "memory_ratio": memory_ratio,
+            "regressed": slower or bigger,
+        })
+    return pd.DataFrame(rows)
+
+def _write_json(payload, path):
+    os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+    with open(path, "w") as f:
+        json.dump(payload, f, indent=2)
+
+def main(sizes=DEFAULT_SIZES, names=None, repeats=5, seed=42, output=DEFAULT_OUTPUT, baseline=DEFAULT_BASELINE,
+         update_baseline=False, time_tolerance=TIME_TOLERANCE, memory_tolerance=MEMORY_TOLERANCE) -> int:
+    current = run_benchmarks(sizes, names, repeats, seed)
+    _write_json(current, output)
+    print(f"💾 Results saved to {output}")
+
+    if update_baseline:
+        _write_json(current, baseline)
+        print(f"📌 Baseline updated at {baseline}")
+        return 0
+    if not os.path.exists(baseline):
+        print(f"⚠️ No baseline at {baseline}; run with --update-baseline to store one")
+        return 0
+
+    with open(baseline) as f:
+        reference = json.load(f)
+    try:
+        comparison = compare_results(current, reference, time_tolerance, memory_tolerance)
+    except ValueError as e:
+        print(f"❌ Not comparing against {baseline}: {e}. "
+              f"Record a baseline on this machine with --update-baseline")
+        return 2
+    if comparison.empty:
+        print("⚠️ No benchmark/size pairs in common with the baseline")
+        return 0
+    print(comparison.to_string(index=False, float_format=lambda v: f"{v:.4f}"))
+
+    regressions = comparison[comparison["regressed"]]
+    if not regressions.empty:
+        print(f"❌ {len(regressions)} regression(s) against {baseline}:")
+        for r in regressions.itertuples():
+            print(f"   {r.benchmark} @ {r.rows:,} rows: {r.time_ratio:.2f}x time, {r.memory_ratio:.2f}x peak memory")
+        return 1
+    print("✅ No regressions against the baseline")
+    return 0
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Time and memory benchmarks on synthetic Xente data")
+    parser.add_argument("--sizes", type=lambda s: [int(v) for v in s.split(",")], default=DEFAULT_SIZES,
+                        help="Comma-separated row counts, e.g. 1000,10000")
+    parser.add_argument("--only", nargs="*", default=None, choices=list(BENCHMARKS), help="Benchmarks to run")
+    parser.add_argument("--repeats", type=int, default=5, help="Timed runs per benchmark (minimum is compared)")
+    parser.add_argument("--seed", type=int, default=42, help="Synthetic data seed")
+    parser.add_argument("--output", default=DEFAULT_OUTPUT, help="Where to write this run's JSON results")
+    parser.add_argument("--baseline", default=DEFAULT_BASELINE, help="Baseline JSON to compare against")
+    parser.add_argument("--update-baseline", action="store_true", help="Store this run as the new baseline")
+    parser.add_argument("--time-tolerance", type=float, default=TIME_TOLERANCE,
+                        help="Allowed slowdown before failing (0.25 = 25%%)")
+    parser.add_argument("--memory-tolerance", type=float, default=MEMORY_TOLERANCE,
+                        help="Allowed peak-memory growth before failing (0.10 = 10%%)")
+    args = parser.parse_args()
+    sys.exit(main(args.sizes, args.only, args.repeats, args.seed, args.output, args.baseline,
+                  args.update_baseline, args.time_tolerance, args.memory_tolerance))
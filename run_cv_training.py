@@ -1,3 +1,4 @@
+import argparse
 import os
 import sys
 import pandas as pd
@@ -7,13 +8,19 @@ from datetime import datetime
 # Add src to path
 sys.path.append(os.path.join(os.path.dirname(__file__), "src"))
 
+from src.data_processing import load_processed_data
 from src.features.feature_engineering import build_feature_pipeline
 from src.features.rfm_target import create_rfm_features, assign_risk_label
-from src.models.train_model import get_model, evaluate_model
+from src.models.train_model import TRAINING_PROFILES, get_model, evaluate_model
 
-def main():
-    # 📥 Load dataset
-    df = pd.read_csv("data/processed/cleaned_transactions.csv")
+CV_COLUMNS = [
+    "TransactionId", "CustomerId", "TransactionStartTime", "Amount", "Value",
+    "ProductCategory", "ChannelId", "ProviderId"
+]
+
+def main(n_splits=5, n_workers=None, profile="full"):
+    # 📥 Load only the columns used for labelling and features
+    df = load_processed_data(CV_COLUMNS)
 
     # 🧠 Generate RFM-based risk labels
     snapshot_date = pd.to_datetime(df["TransactionStartTime"]).max().tz_localize(None)
@@ -29,14 +36,30 @@ def main():
     pipeline = build_feature_pipeline()
     X_transformed = pipeline.fit_transform(X)
 
-    # 🤖 Train and evaluate the model
-    model = get_model()
-    evaluate_model(pd.DataFrame(X_transformed), y, model)
+    # 🤖 Cross-validate on the transformed (sparse) matrix; folds share one memory-mapped copy
+    model = get_model(profile)
+    result = evaluate_model(X_transformed, y.astype(int), model, n_splits=n_splits, n_workers=n_workers)
+
+    # 🏁 Refit on all rows for serving. Early stopping would need a held-out set, so the refit
+    # instead grows the mean number of trees the CV folds stopped at.
+    if model.get_params().get("early_stopping_rounds") is not None:
+        n_trees = int(round(result["folds"].loc[list(range(n_splits)), "n_trees"].mean()))
+        model.set_params(n_estimators=n_trees, early_stopping_rounds=None)
+        print(f"🌲 Refitting with {n_trees} trees (mean CV early-stopping point)")
+    model.fit(X_transformed, y.astype(int))
 
-    # 💾 Save the fitted pipeline
+    # 💾 Save the fitted pipeline and model
     os.makedirs("models", exist_ok=True)
     joblib.dump(pipeline, "models/fitted_pipeline.pkl")
+    joblib.dump(model, "models/final_cv_model.pkl")
     print("✅ Fitted pipeline saved to models/fitted_pipeline.pkl")
+    print("✅ Final model saved to models/final_cv_model.pkl")
 
 if __name__ == "__main__":
-    main()
+    parser = argparse.ArgumentParser(description="Cross-validate and train the RFM risk model")
+    parser.add_argument("--folds", type=int, default=5, help="Number of stratified CV folds")
+    parser.add_argument("--workers", type=int, default=None,
+                        help="Processes running folds in parallel (default: one per fold, capped at CPU count)")
+    parser.add_argument("--profile", choices=tuple(TRAINING_PROFILES), default="full", help="XGBoost training profile from train_model")
+    args = parser.parse_args()
+    main(n_splits=args.folds, n_workers=args.workers, profile=args.profile)
@@ -0,0 +1,105 @@
+import argparse
+import json
+import os
+import sys
+from pathlib import Path
+
+import mlflow
+from sklearn.model_selection import train_test_split
+
+# Add src to path
+sys.path.append(os.path.join(os.path.dirname(__file__), "src"))
+
+from src.data_processing import PROCESSED_DATA_PATH
+from src.models.train_model import (
+    CATEGORICAL_FEATURES, DEFAULT_SAMPLING_RATIO, ID_ENCODINGS, IMBALANCE_STRATEGIES, NUMERIC_FEATURES,
+    TRAINING_PROFILES, build_pipeline, build_sampler, compute_scale_pos_weight, load_training_data
+)
+from src.models.tuning import successive_halving
+
+MLFLOW_EXPERIMENT = "credit-risk-model"
+BEST_PARAMS_PATH = "models/best_params.json"
+
+# 📝 One nested MLflow run per finished trial, under the search's parent run
+def log_trial_to_mlflow(trial):
+    with mlflow.start_run(run_name=f"trial-{trial['trial_id']}-rung-{trial['rung']}", nested=True):
+        mlflow.log_params({**trial["params"], "n_estimators": trial["n_estimators"],
+                           "trial_id": trial["trial_id"], "rung": trial["rung"]})
+        mlflow.log_metrics({key: trial[key] for key in ("roc_auc", "logloss", "fit_seconds", "score_seconds")})
+    print(f"🧪 trial {trial['trial_id']:>3} rung {trial['rung']} ({trial['n_estimators']} trees): "
+          f"AUC {trial['roc_auc']:.4f}, fit {trial['fit_seconds']:.1f}s")
+
+def main(data_path=PROCESSED_DATA_PATH, id_encoding="onehot", n_trials=27, min_trees=50, max_trees=1000,
+         eta=3, cpu_budget=None, threads_per_trial=1, time_budget_s=None, profile="full", imbalance="none",
+         sampling_ratio=DEFAULT_SAMPLING_RATIO):
+    X, y = load_training_data(data_path)
+    X_train, X_val, y_train, y_val = train_test_split(X, y, test_size=0.2, stratify=y, random_state=42)
+
+    # 🛠️ Transform once; every trial reuses the same memory-mapped matrices
+    preprocessor = build_pipeline(NUMERIC_FEATURES, CATEGORICAL_FEATURES, id_encoding).named_steps["preprocessor"]
+    X_train_t = preprocessor.fit_transform(X_train, y_train)
+    X_val_t = preprocessor.transform(X_val)
+
+    # Trials score the model train_model builds for the same profile and imbalance strategy
+    base_params = {"profile": profile}
+    if imbalance == "weight":
+        base_params["scale_pos_weight"] = compute_scale_pos_weight(y_train)
+    sampler = build_sampler(imbalance, sampling_ratio)
+    if sampler is not None:
+        X_train_t, y_train = sampler.fit_resample(X_train_t, y_train)
+
+    mlflow.set_tracking_uri(Path("mlruns").resolve().as_uri())
+    mlflow.set_experiment(MLFLOW_EXPERIMENT)
+    with mlflow.start_run(run_name="successive-halving"):
+        mlflow.log_params({
+            "search": "successive_halving", "id_encoding": id_encoding, "profile": profile,
+            "imbalance": imbalance, "sampling_ratio": sampling_ratio, "n_trials": n_trials,
+            "min_trees": min_trees, "max_trees": max_trees, "eta": eta, "cpu_budget": cpu_budget,
+            "threads_per_trial": threads_per_trial, "time_budget_s": time_budget_s
+        })
+        result = successive_halving(
+            X_train_t, y_train, X_val_t, y_val, n_trials=n_trials, min_trees=min_trees, max_trees=max_trees,
+            eta=eta, cpu_budget=cpu_budget, threads_per_trial=threads_per_trial, time_budget_s=time_budget_s,
+            base_params=base_params, log_trial=log_trial_to_mlflow
+        )
+        best = result["best"]
+        mlflow.log_params({f"best_{key}": value for key, value in best["params"].items()})
+        mlflow.log_metrics({"best_roc_auc": best["roc_auc"], "best_n_estimators": best["n_estimators"],
+                            "wall_seconds": result["wall_seconds"], "trials_finished": len(result["trials"])})
+
+    print(f"\n🏆 Best trial {best['trial_id']} ({best['n_estimators']} trees): AUC {best['roc_auc']:.4f}")
+    print(f"⏱️ {len(result['trials'])} trials in {result['wall_seconds']:.1f}s on {result['n_workers']} workers"
+          + (" (stopped by time budget)" if result["out_of_time"] else ""))
+
+    os.makedirs("models", exist_ok=True)
+    with open(BEST_PARAMS_PATH, "w") as f:
+        json.dump({**best["params"], "n_estimators": best["n_estimators"], "profile": profile,
+                   "imbalance": imbalance, "sampling_ratio": sampling_ratio, "id_encoding": id_encoding},
+                  f, indent=2)
+    print(f"✅ Best parameters saved to {BEST_PARAMS_PATH}; "
+          f"train with: python src/models/train_model.py --params {BEST_PARAMS_PATH}")
+    return result
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Budgeted XGBoost hyperparameter search (successive halving)")
+    parser.add_argument("--data", default=PROCESSED_DATA_PATH, help="Processed transactions file")
+    parser.add_argument("--id-encoding", choices=ID_ENCODINGS, default="onehot",
+                        help="CustomerId encoding from train_model")
+    parser.add_argument("--profile", choices=tuple(TRAINING_PROFILES), default="full",
+                        help="train_model profile the trials use (early stopping is off; trees are the budget)")
+    parser.add_argument("--imbalance", choices=IMBALANCE_STRATEGIES, default="none",
+                        help="train_model class-imbalance handling the trials use")
+    parser.add_argument("--sampling-ratio", type=float, default=DEFAULT_SAMPLING_RATIO,
+                        help="Minority/majority ratio after resampling for undersample/smote")
+    parser.add_argument("--trials", type=int, default=27, help="Configurations sampled for the first rung")
+    parser.add_argument("--min-trees", type=int, default=50, help="Trees per trial in the first rung")
+    parser.add_argument("--max-trees", type=int, default=1000, help="Upper bound on trees per trial")
+    parser.add_argument("--eta", type=int, default=3, help="Keep 1/eta of the trials per rung, eta x the trees")
+    parser.add_argument("--cpu-budget", type=int, default=None, help="Cores to use (default: all)")
+    parser.add_argument("--threads-per-trial", type=int, default=1, help="XGBoost threads per trial")
+    parser.add_argument("--time-budget", type=float, default=None,
+                        help="Wall-clock budget in seconds; unfinished trials are stopped")
+    args = parser.parse_args()
+    main(args.data, args.id_encoding, args.trials, args.min_trees, args.max_trees, args.eta,
+         args.cpu_budget, args.threads_per_trial, args.time_budget, args.profile, args.imbalance,
+         args.sampling_ratio)
@@ -0,0 +1,108 @@
+import argparse
+import json
+import os
+import sys
+
+import joblib
+import pandas as pd
+
+# Add src to path
+sys.path.append(os.path.join(os.path.dirname(__file__), "src"))
+
+import src.data_processing as data_processing
+import src.features.feature_engineering as feature_engineering
+import src.features.rfm_target as rfm_target
+import src.features.transformers as transformers
+import src.models.cross_validation as cross_validation
+from src.models.train_model import (
+    BASE_MODEL_PARAMS, DEFAULT_EVAL_FRACTION, TRAINING_PROFILES, fit_classifier, get_model
+)
+from src.pipeline_runner import DEFAULT_CACHE_DIR, ArtifactCache, Stage, run_stages
+
+# 🧼 data_processing.main, without writing the processed files
+def clean_stage(inputs):
+    df, definitions = data_processing.load_data(data_processing.RAW_DATA_PATH, data_processing.RAW_DEFINITIONS_PATH)
+    data_processing.validate_schema(df, definitions)
+    return {"transactions": data_processing.preprocess_data(df)}
+
+# 🧠 RFM clustering -> per-customer is_high_risk, as in run_cv_training
+def label_stage(inputs, n_clusters):
+    df = inputs["transactions"]
+    snapshot_date = pd.to_datetime(df["TransactionStartTime"]).max().tz_localize(None)
+    rfm = rfm_target.create_rfm_features(df, snapshot_date)
+    return {"risk_labels": rfm_target.assign_risk_label(rfm, n_clusters=n_clusters)}
+
+# 🛠️ Fit the feature pipeline once; the transformed matrix is what training iterates on
+def featurize_stage(inputs):
+    df = inputs["transactions"].merge(inputs["risk_labels"], on="CustomerId", how="left")
+    y = df["is_high_risk"].astype(int).to_numpy()
+    X = df.drop(columns=["is_high_risk", "TransactionId"], errors="ignore")
+    pipeline = feature_engineering.build_feature_pipeline()
+    return {"feature_pipeline": pipeline, "X": pipeline.fit_transform(X), "y": y}
+
+# 🔁 Optional parallel CV on the cached matrix
+def evaluate_stage(inputs, profile, n_splits, xgb_params):
+    model = get_model(profile, **xgb_params)
+    result = cross_validation.run_parallel_cv(inputs["X"], inputs["y"], model, n_splits=n_splits)
+    return {"cv_folds": result["folds"]}
+
+# 🤖 Fit the classifier on all rows (minus the early-stopping slice when the profile stops early)
+def train_stage(inputs, profile, xgb_params, eval_fraction):
+    model = get_model(profile, **xgb_params)
+    fit_classifier(model, inputs["X"], inputs["y"], eval_fraction)
+    return {"model": model}
+
+# get_model's source does not change when its settings do, so they are hashed as values too
+MODEL_DEPS = [get_model, BASE_MODEL_PARAMS, TRAINING_PROFILES]
+
+def build_stages(profile="full", xgb_params=None, n_clusters=3, n_splits=0):
+    xgb_params = dict(xgb_params or {})
+    raw_inputs = [data_processing.RAW_DATA_PATH, data_processing.RAW_DEFINITIONS_PATH]
+    stages = [
+        Stage("clean", clean_stage, inputs=raw_inputs, outputs=["transactions"],
+              code_deps=[data_processing]),
+        Stage("label", label_stage, inputs=["transactions"], outputs=["risk_labels"],
+              params={"n_clusters": n_clusters}, code_deps=[rfm_target]),
+        Stage("featurize", featurize_stage, inputs=["transactions", "risk_labels"],
+              outputs=["feature_pipeline", "X", "y"], code_deps=[feature_engineering, transformers]),
+    ]
+    if n_splits:
+        stages.append(Stage("evaluate", evaluate_stage, inputs=["X", "y"], outputs=["cv_folds"],
+                            params={"profile": profile, "n_splits": n_splits, "xgb_params": xgb_params},
+                            code_deps=[cross_validation, *MODEL_DEPS]))
+    stages.append(Stage("train", train_stage, inputs=["X", "y"], outputs=["model"],
+                        params={"profile": profile, "xgb_params": xgb_params, "eval_fraction": DEFAULT_EVAL_FRACTION},
+                        code_deps=[*MODEL_DEPS, fit_classifier]))
+    return stages
+
+def main(profile="full", xgb_params=None, n_clusters=3, n_splits=0, cache_dir=DEFAULT_CACHE_DIR,
+         cache_max_gb=5.0, force=()):
+    cache = ArtifactCache(cache_dir, max_bytes=int(cache_max_gb * 1024 ** 3))
+    artifacts, report = run_stages(build_stages(profile, xgb_params, n_clusters, n_splits), cache, force=force)
+
+    if n_splits:
+        print(artifacts["cv_folds"].to_string(float_format=lambda v: f"{v:.4f}"))
+
+    # 💾 Same artifacts run_cv_training writes
+    os.makedirs("models", exist_ok=True)
+    joblib.dump(artifacts["feature_pipeline"], "models/fitted_pipeline.pkl")
+    joblib.dump(artifacts["model"], "models/final_cv_model.pkl")
+    print("✅ Fitted pipeline saved to models/fitted_pipeline.pkl")
+    print("✅ Final model saved to models/final_cv_model.pkl")
+    print(f"🗄️ Cache {cache_dir}: {cache.size_bytes() / 1024 ** 2:.1f} MB")
+    return artifacts, report
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Run clean -> label -> featurize -> train with a stage cache")
+    parser.add_argument("--profile", choices=tuple(TRAINING_PROFILES), default="full",
+                        help="XGBoost training profile from train_model")
+    parser.add_argument("--xgb-params", type=json.loads, default=None,
+                        help='JSON overrides for the classifier, e.g. \'{"max_depth": 4}\'')
+    parser.add_argument("--clusters", type=int, default=3, help="RFM clusters used for labelling")
+    parser.add_argument("--cv-folds", type=int, default=0, help="Also run parallel CV with this many folds")
+    parser.add_argument("--cache-dir", default=DEFAULT_CACHE_DIR, help="Stage cache directory")
+    parser.add_argument("--cache-max-gb", type=float, default=5.0, help="Evict old cache entries beyond this size")
+    parser.add_argument("--force", nargs="*", default=(), help="Stage names to re-run even if cached")
+    args = parser.parse_args()
+    main(args.profile, args.xgb_params, args.clusters, args.cv_folds, args.cache_dir, args.cache_max_gb,
+         tuple(args.force))
@@ -1,30 +1,200 @@
+import argparse
+import hashlib
+import io
+import json
 import os
 import sys
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
 import pandas as pd
+import pyarrow.parquet as pq
 
 # Add src to path
 sys.path.append(os.path.join(os.path.dirname(__file__), "src"))
 
-from src.models.predict_model import predict_from_csv
-from src.features.feature_engineering import build_feature_pipeline
+from src.data_processing import PROCESSED_DATA_PATH
+from src.models.predict_model import load_pipeline, load_model, predict_batch
+
+MODEL_PATH = "models/final_cv_model.pkl"
+PIPELINE_PATH = "models/fitted_pipeline.pkl"
+OUTPUT_DIR = "data/predictions/shards"
+MERGED_PATH = "data/predictions/predictions.csv"
+MANIFEST_NAME = "manifest.json"
+
+PREDICTION_COLUMNS = [
+    "TransactionId", "CustomerId", "TransactionStartTime", "Amount", "Value",
+    "ProductCategory", "ChannelId", "ProviderId"
+]
+
+# 🧠 Artifacts loaded once per worker process by the pool initializer
+_worker = {}
+
+# Each worker gets cpu_count // workers XGBoost threads, as in cross_validation.run_parallel_cv;
+# the default all-core threading in every worker oversubscribes the machine.
+def _init_worker(model_path: str, pipeline_path: str, n_threads: int):
+    _worker["model"] = load_model(model_path)
+    _worker["model"].set_params(n_jobs=n_threads)
+    _worker["pipeline"] = load_pipeline(pipeline_path)
+
+# 📏 Row count for Parquet or CSV inputs, and row-range reads for Parquet (via row groups)
+def count_rows(path: str) -> int:
+    if path.endswith(".parquet"):
+        return pq.ParquetFile(path).metadata.num_rows
+    with open(path, "rb") as f:
+        return sum(1 for _ in f) - 1
+
+# 🧭 One pass over a CSV: row count plus the byte offset where every shard starts (and the end
+# of the file), so each worker seeks straight to its rows. Assumes one record per line (no
+# quoted newlines), which holds for the processed transactions.
+def csv_shard_offsets(path: str, shard_rows: int):
+    offsets, rows = [], 0
+    with open(path, "rb") as f:
+        f.readline()
+        position = f.tell()
+        for line in f:
+            if rows % shard_rows == 0:
+                offsets.append(position)
+            position += len(line)
+            rows += 1
+    offsets.append(position)
+    return rows, offsets
+
+def read_csv_bytes(path: str, start_byte: int, stop_byte: int, columns=None) -> pd.DataFrame:
+    with open(path, "rb") as f:
+        header = f.readline()
+        f.seek(start_byte)
+        body = f.read(stop_byte - start_byte)
+    return pd.read_csv(io.BytesIO(header + body), usecols=columns)
+
+def read_rows(path: str, start: int, stop: int, columns=None) -> pd.DataFrame:
+    parquet = pq.ParquetFile(path, memory_map=True)
+    groups, offset, first_row = [], 0, None
+    for i in range(parquet.metadata.num_row_groups):
+        n = parquet.metadata.row_group(i).num_rows
+        if offset + n > start and offset < stop:
+            groups.append(i)
+            first_row = offset if first_row is None else first_row
+        offset += n
+    table = parquet.read_row_groups(groups, columns=columns)
+    return table.slice(start - first_row, stop - start).to_pandas()
+
+def _score_shard(input_path: str, shard_id: int, start: int, stop: int, output_dir: str, byte_range=None) -> dict:
+    started = time.perf_counter()
+    if byte_range is not None:
+        df = read_csv_bytes(input_path, *byte_range, PREDICTION_COLUMNS)
+    else:
+        df = read_rows(input_path, start, stop, PREDICTION_COLUMNS)
+    results = predict_batch(df, _worker["model"], _worker["pipeline"])
+    # Keyed by transaction so scores join back to the input
+    results.insert(0, "TransactionId", df["TransactionId"].astype(str).to_numpy())
+
+    path = os.path.join(output_dir, f"part-{shard_id:05d}.parquet")
+    results.to_parquet(path + ".tmp", index=False)
+    os.replace(path + ".tmp", path)
+    return {
+        "shard": shard_id, "start": start, "stop": stop, "rows": len(results),
+        "path": os.path.basename(path), "seconds": round(time.perf_counter() - started, 3)
+    }
+
+# 📒 Manifest: run parameters plus one entry per completed shard (rewritten atomically).
+# Files are identified by size and mtime, artifacts also by content hash, so retraining in place
+# (even within one mtime tick) invalidates every shard.
+def _file_fingerprint(path: str, content_hash: bool = False) -> dict:
+    stat = os.stat(path)
+    fingerprint = {"path": os.path.abspath(path), "size": stat.st_size, "mtime_ns": stat.st_mtime_ns}
+    if content_hash:
+        h = hashlib.sha256()
+        with open(path, "rb") as f:
+            for block in iter(lambda: f.read(1 << 20), b""):
+                h.update(block)
+        fingerprint["sha256"] = h.hexdigest()
+    return fingerprint
+
+def load_manifest(output_dir: str):
+    path = os.path.join(output_dir, MANIFEST_NAME)
+    if not os.path.exists(path):
+        return None
+    with open(path) as f:
+        return json.load(f)
+
+def save_manifest(output_dir: str, manifest: dict):
+    path = os.path.join(output_dir, MANIFEST_NAME)
+    with open(path + ".tmp", "w") as f:
+        json.dump(manifest, f, indent=2)
+    os.replace(path + ".tmp", path)
+
+def score_sharded(input_path: str = PROCESSED_DATA_PATH, output_dir: str = OUTPUT_DIR,
+                  model_path: str = MODEL_PATH, pipeline_path: str = PIPELINE_PATH,
+                  shard_rows: int = 250_000, workers: int = None) -> dict:
+    os.makedirs(output_dir, exist_ok=True)
+    if input_path.endswith(".parquet"):
+        total_rows, offsets = count_rows(input_path), None
+    else:
+        total_rows, offsets = csv_shard_offsets(input_path, shard_rows)
+    params = {
+        "input": _file_fingerprint(input_path), "shard_rows": shard_rows,
+        "model": _file_fingerprint(model_path, content_hash=True),
+        "pipeline": _file_fingerprint(pipeline_path, content_hash=True),
+        "columns": PREDICTION_COLUMNS
+    }
+
+    manifest = load_manifest(output_dir)
+    if manifest is None or manifest["params"] != params:
+        if manifest is not None:
+            print("⚠️ Input, shard size or artifacts changed since the last run; rescoring every shard")
+        manifest = {"params": params, "total_rows": total_rows, "shards": {}}
+
+    ranges = [(i, start, min(start + shard_rows, total_rows))
+              for i, start in enumerate(range(0, total_rows, shard_rows))]
+    done = {int(k) for k, entry in manifest["shards"].items()
+            if os.path.exists(os.path.join(output_dir, entry["path"]))}
+    pending = [r for r in ranges if r[0] not in done]
+    print(f"🧮 {total_rows} rows in {len(ranges)} shards; {len(done)} already complete, {len(pending)} to score")
+
+    started = time.perf_counter()
+    workers = workers or os.cpu_count() or 1
+    n_threads = max(1, (os.cpu_count() or 1) // workers)
+    with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker,
+                             initargs=(model_path, pipeline_path, n_threads)) as pool:
+        futures = [pool.submit(_score_shard, input_path, shard_id, start, stop, output_dir,
+                               offsets[shard_id:shard_id + 2] if offsets is not None else None)
+                   for shard_id, start, stop in pending]
+        for future in as_completed(futures):
+            entry = future.result()
+            manifest["shards"][str(entry["shard"])] = entry
+            save_manifest(output_dir, manifest)
+            print(f"✅ Shard {entry['shard']} ({entry['rows']} rows) scored in {entry['seconds']}s")
 
-def main():
-    df = pd.read_csv("data/processed/cleaned_transactions.csv")
+    manifest["completed"] = len(manifest["shards"]) == len(ranges)
+    save_manifest(output_dir, manifest)
+    print(f"🏁 Scoring finished in {time.perf_counter() - started:.1f}s; manifest at {os.path.join(output_dir, MANIFEST_NAME)}")
+    return manifest
 
-    # Build and fit the pipeline on the full dataset
-    pipeline = build_feature_pipeline()
-    pipeline.fit(df.drop(columns=["is_high_risk", "TransactionId"], errors="ignore"))
+# 🧷 Optional single-file export for tools that still read predictions.csv
+def merge_shards(output_dir: str = OUTPUT_DIR, merged_path: str = MERGED_PATH):
+    manifest = load_manifest(output_dir)
+    shards = sorted(manifest["shards"].values(), key=lambda entry: entry["shard"])
+    os.makedirs(os.path.dirname(merged_path), exist_ok=True)
+    for i, entry in enumerate(shards):
+        df = pd.read_parquet(os.path.join(output_dir, entry["path"]))
+        df.to_csv(merged_path, mode="w" if i == 0 else "a", header=i == 0, index=False)
+    print(f"✅ Predictions saved to {merged_path}")
 
-    # Run predictions
-    results = predict_from_csv(
-        input_csv="data/processed/cleaned_transactions.csv",
-        model_path="models/final_cv_model.pkl",
-        pipeline=pipeline
-    )
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Score transactions in parallel, sharded, resumable batches")
+    parser.add_argument("--input", default=PROCESSED_DATA_PATH, help="Parquet or CSV file to score")
+    parser.add_argument("--output-dir", default=OUTPUT_DIR, help="Directory for shard files and manifest")
+    parser.add_argument("--model", default=MODEL_PATH, help="Persisted classifier")
+    parser.add_argument("--pipeline", default=PIPELINE_PATH, help="Persisted fitted feature pipeline")
+    parser.add_argument("--shard-rows", type=int, default=250_000, help="Rows per shard")
+    parser.add_argument("--workers", type=int, default=None, help="Worker processes (default: all cores)")
+    parser.add_argument("--merge", action="store_true", help=f"Also concatenate shards into {MERGED_PATH}")
+    args = parser.parse_args(argv)
 
-    print(results.head())
-    results.to_csv("data/predictions/predictions.csv", index=False)
-    print("✅ Predictions saved to data/predictions.csv")
+    score_sharded(args.input, args.output_dir, args.model, args.pipeline, args.shard_rows, args.workers)
+    if args.merge:
+        merge_shards(args.output_dir)
 
 if __name__ == "__main__":
     main()
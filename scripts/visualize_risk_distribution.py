@@ -4,7 +4,7 @@ import seaborn as sns
 import os
 
 def main():
-    df = pd.read_csv("data/predictions/predictions.csv")
+    df = pd.read_csv("data/predictions/predictions.csv", usecols=["risk_probability"])
 
     plt.figure(figsize=(8, 5))
     sns.histplot(df["risk_probability"], bins=30, kde=True, color="darkred")
@@ -0,0 +1,126 @@
+import asyncio
+from typing import TYPE_CHECKING
+
+if TYPE_CHECKING:
+    import pandas as pd
+
+# 🧺 Dynamic micro-batching: concurrent requests queue up for at most max_wait_ms
+# (or until max_batch_size rows are waiting), get scored as one frame in a worker
+# thread, and each caller receives its own slice of the result. Up to max_in_flight
+# batches are scored at once; while every slot is busy the queue keeps filling, so the
+# next batch is larger. When a batch fails, its requests are re-scored one by one so only
+# the caller whose record is at fault gets the error.
+class MicroBatcher:
+    def __init__(self, score_fn, max_batch_size: int = 64, max_wait_ms: float = 5.0, max_in_flight: int = 2):
+        self.score_fn = score_fn
+        self.max_batch_size = max_batch_size
+        self.max_wait_ms = max_wait_ms
+        self.max_in_flight = max_in_flight
+        self.batches = 0
+        self.rows = 0
+        self._queue = None
+        self._task = None
+        self._slots = None
+        self._in_flight = {}
+
+    @property
+    def queue_depth(self) -> int:
+        return self._queue.qsize() if self._queue is not None else 0
+
+    async def start(self):
+        self._queue = asyncio.Queue()
+        self._slots = asyncio.Semaphore(self.max_in_flight)
+        self._task = asyncio.create_task(self._run())
+
+    async def stop(self):
+        tasks = [self._task] if self._task is not None else []
+        tasks += list(self._in_flight)
+        # Taken before cancelling: finished tasks remove their batch from _in_flight
+        pending = [item for batch in self._in_flight.values() for item in batch]
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+        self._task = None
+
+        while self._queue is not None and not self._queue.empty():
+            pending.append(self._queue.get_nowait())
+        for _, future in pending:
+            if not future.done():
+                future.set_exception(RuntimeError("Batcher stopped before the request was scored"))
+
+    async def submit(self, df: "pd.DataFrame") -> "pd.DataFrame":
+        if self._task is None:
+            raise RuntimeError("MicroBatcher.start() must be awaited before submitting requests")
+        future = asyncio.get_running_loop().create_future()
+        await self._queue.put((df, future))
+        return await future
+
+    async def _collect(self):
+        loop = asyncio.get_running_loop()
+        batch = [await self._queue.get()]
+        rows = len(batch[0][0])
+        deadline = loop.time() + self.max_wait_ms / 1000
+        while rows < self.max_batch_size:
+            if self._queue.empty():
+                timeout = deadline - loop.time()
+                if timeout <= 0:
+                    break
+                try:
+                    item = await asyncio.wait_for(self._queue.get(), timeout)
+                except asyncio.TimeoutError:
+                    break
+            else:
+                item = self._queue.get_nowait()
+            batch.append(item)
+            rows += len(item[0])
+        return batch
+
+    async def _run(self):
+        while True:
+            await self._slots.acquire()
+            try:
+                batch = await self._collect()
+            except BaseException:
+                self._slots.release()
+                raise
+            task = asyncio.create_task(self._score(batch))
+            self._in_flight[task] = batch
+            task.add_done_callback(self._finished)
+
+    def _finished(self, task):
+        self._in_flight.pop(task, None)
+        self._slots.release()
+
+    async def _score_frame(self, df: "pd.DataFrame") -> "pd.DataFrame":
+        results = await asyncio.get_running_loop().run_in_executor(None, self.score_fn, df)
+        self.batches += 1
+        self.rows += len(df)
+        return results
+
+    async def _score(self, batch):
+        import pandas as pd
+        try:
+            results = await self._score_frame(pd.concat([df for df, _ in batch], ignore_index=True))
+        except Exception as e:
+            if len(batch) == 1:
+                _, future = batch[0]
+                if not future.done():
+                    future.set_exception(e)
+                return
+            # One bad record must not fail its neighbours: re-score each request on its own
+            for df, future in batch:
+                try:
+                    result = await self._score_frame(df)
+                except Exception as single_error:
+                    if not future.done():
+                        future.set_exception(single_error)
+                else:
+                    if not future.done():
+                        future.set_result(result.reset_index(drop=True))
+            return
+
+        start = 0
+        for df, future in batch:
+            if not future.done():
+                future.set_result(results.iloc[start:start + len(df)].reset_index(drop=True))
+            start += len(df)
@@ -1,27 +1,134 @@
-from fastapi import FastAPI, APIRouter, HTTPException, UploadFile, File, Header
-from fastapi.responses import JSONResponse
+import time
+
+IMPORT_STARTED = time.perf_counter()  # ⏱️ import-to-ready is measured from here
+
+import asyncio
+import itertools
+from contextlib import asynccontextmanager
+from fastapi import FastAPI, APIRouter, HTTPException, UploadFile, File, Header, Query, Response
+from fastapi.concurrency import run_in_threadpool
+from fastapi.responses import JSONResponse, StreamingResponse
 import os
+import signal
 import sys
-import pandas as pd
-import joblib
-from src.api.pydantic_models import CustomerInput, RiskPrediction
-from src.models.predict_model import load_model, predict_risk, predict_batch
+from typing import TYPE_CHECKING, Optional
+from src.api.batching import MicroBatcher
+from src.api.memory import PARENT_PID_ENV, worker_memory
+from src.api.model_registry import ModelRegistry
+from src.api.prediction_logger import PredictionLogger
+from src.api.pydantic_models import CustomerInput, ModelSpec, RiskPrediction
+from src.api.server_timing import RequestMetricsMiddleware, StageTimer
+from src import metrics
+
+if TYPE_CHECKING:
+    import pandas as pd
 
 # 📦 Add the project root directory to the Python path
 project_root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
 sys.path.insert(0, project_root)
 
-# ✅ Load trained model and pipeline
-MODEL_PATH = "models/final_cv_model.pkl"
-PIPELINE_PATH = "models/fitted_pipeline.pkl"
-LOG_PATH = "logs/predictions_log.csv"
+# ✅ Trained model and pipeline, loaded in the app lifespan (not at import)
+MODEL_PATH = os.getenv("MODEL_PATH", "models/final_cv_model.pkl")
+PIPELINE_PATH = os.getenv("PIPELINE_PATH", "models/fitted_pipeline.pkl")
+# 🗂️ Optional manifest naming the artifact version to serve; rewriting it hot-reloads the model
+MODEL_MANIFEST = os.getenv("MODEL_MANIFEST", "models/manifest.json")
+MODEL_VERSION = os.getenv("MODEL_VERSION")
+MANIFEST_POLL_S = float(os.getenv("MODEL_MANIFEST_POLL_S", "5"))
+LOG_DIR = os.getenv("PREDICTION_LOG_DIR", "logs/predictions")
 API_KEY = "supersecretkey"  # 🔐 Replace with env var in production
 
-if not os.path.exists(MODEL_PATH) or not os.path.exists(PIPELINE_PATH):
-    raise FileNotFoundError("Model or pipeline not found. Please run training first.")
+# 🧺 Optional micro-batching of concurrent /predict calls
+BATCHING_ENABLED = os.getenv("PREDICT_BATCHING", "0") == "1"
+BATCH_MAX_SIZE = int(os.getenv("PREDICT_BATCH_MAX_SIZE", "64"))
+BATCH_MAX_WAIT_MS = float(os.getenv("PREDICT_BATCH_MAX_WAIT_MS", "5"))
+BATCH_MAX_IN_FLIGHT = int(os.getenv("PREDICT_BATCH_MAX_IN_FLIGHT", "2"))
+
+# 🔥 Representative request scored once before readiness (JIT, caches, first-call allocations)
+WARMUP_RECORD = {
+    "Amount": 1000.0,
+    "Value": 1000.0,
+    "ProductCategory": "airtime",
+    "ChannelId": "ChannelId_3",
+    "ProviderId": "ProviderId_6",
+    "CustomerId": "CustomerId_0",
+    "TransactionStartTime": "2018-11-15 03:12:00+00:00"
+}
+
+registry = ModelRegistry(MODEL_PATH, PIPELINE_PATH, MODEL_MANIFEST, WARMUP_RECORD, MODEL_VERSION)
+readiness = {"ready": False, "error": None, "load_seconds": None, "warmup_seconds": None, "import_to_ready_seconds": None}
+
+# 🔮 Score on whichever version is active when the call starts, even if a reload swaps it meanwhile
+def score_frame(df: "pd.DataFrame", timings: dict = None) -> "pd.DataFrame":
+    return registry.active.score(df, timings)
+
+async def load_and_warm():
+    try:
+        active = await registry.reload()
+    except Exception as e:
+        readiness["error"] = f"{type(e).__name__}: {e}"
+        print(f"❌ Model loading failed: {readiness['error']}")
+        return
+    mark_ready(active)
+
+def mark_ready(active):
+    readiness["error"] = None
+    readiness["load_seconds"] = active.load_seconds
+    readiness["warmup_seconds"] = active.warmup_seconds
+    readiness["import_to_ready_seconds"] = time.perf_counter() - IMPORT_STARTED
+    readiness["ready"] = True
+    print(f"✅ Ready in {readiness['import_to_ready_seconds']:.2f}s from import "
+          f"(load {readiness['load_seconds']:.2f}s, warm-up {readiness['warmup_seconds']:.2f}s)")
+
+def require_ready():
+    if not readiness["ready"]:
+        raise HTTPException(status_code=503, detail="Model is not loaded yet" if readiness["error"] is None
+                            else f"Model failed to load: {readiness['error']}")
+
+batcher = MicroBatcher(score_frame, BATCH_MAX_SIZE, BATCH_MAX_WAIT_MS, BATCH_MAX_IN_FLIGHT) if BATCHING_ENABLED else None
+
+# 📝 Background prediction log (drop or block when the buffer is full)
+prediction_logger = PredictionLogger(
+    LOG_DIR,
+    max_buffer_rows=int(os.getenv("PREDICTION_LOG_MAX_ROWS", "100000")),
+    when_full=os.getenv("PREDICTION_LOG_WHEN_FULL", "drop")
+)
+
+# 📈 Gauges mirroring state owned by the registry, batcher and logger, refreshed on every scrape.
+# Metrics are per process: under src.api.serve each worker reports its own.
+MODEL_INFO = metrics.Gauge("credit_risk_model_info", "Model version being served (always 1)", ("version",))
+READY = metrics.Gauge("credit_risk_ready", "1 once the model is loaded and warmed up")
+BATCHER_QUEUE_DEPTH = metrics.Gauge("credit_risk_batcher_queue_depth", "Requests waiting for a micro-batch")
+BATCHER_BATCHES = metrics.Counter("credit_risk_batcher_batches_total", "Micro-batches scored")
+BATCHER_ROWS = metrics.Counter("credit_risk_batcher_rows_total", "Rows scored in micro-batches")
+LOG_BUFFERED_ROWS = metrics.Gauge("credit_risk_prediction_log_buffered_rows", "Prediction log rows not yet written")
+LOG_WRITTEN_ROWS = metrics.Counter("credit_risk_prediction_log_written_rows_total", "Prediction log rows written")
+LOG_DROPPED_ROWS = metrics.Counter("credit_risk_prediction_log_dropped_rows_total",
+                                   "Prediction log rows dropped because the buffer was full")
+LOG_FAILED_ROWS = metrics.Counter("credit_risk_prediction_log_failed_rows_total",
+                                  "Prediction log rows lost because writing them failed")
+
+READY.labels().set_function(lambda: float(readiness["ready"]))
+BATCHER_QUEUE_DEPTH.labels().set_function(lambda: batcher.queue_depth if batcher is not None else 0)
+BATCHER_BATCHES.labels().set_function(lambda: batcher.batches if batcher is not None else 0)
+BATCHER_ROWS.labels().set_function(lambda: batcher.rows if batcher is not None else 0)
+LOG_BUFFERED_ROWS.labels().set_function(lambda: prediction_logger.buffered_rows)
+LOG_WRITTEN_ROWS.labels().set_function(lambda: prediction_logger.written_rows)
+LOG_DROPPED_ROWS.labels().set_function(lambda: prediction_logger.dropped_rows)
+LOG_FAILED_ROWS.labels().set_function(lambda: prediction_logger.failed_rows)
+
+def collect_model_info():
+    MODEL_INFO.clear()
+    if registry.active is not None:
+        MODEL_INFO.labels(registry.active.version).set(1)
 
-model = load_model(MODEL_PATH)
-pipeline = joblib.load(PIPELINE_PATH)
+metrics.REGISTRY.on_collect(collect_model_info)
+
+# 📝 Log from async handlers: the "block" policy may wait for buffer space, which must never
+# happen on the event loop (it would stall every in-flight request and the micro-batcher)
+async def log_predictions(df: "pd.DataFrame") -> bool:
+    if prediction_logger.when_full == "block":
+        return await run_in_threadpool(prediction_logger.log, df)
+    return prediction_logger.log(df)
 
 # 🔀 Create API router
 router = APIRouter()
@@ -31,6 +138,23 @@ def verify_api_key(x_api_key: str = Header(...)):
     if x_api_key != API_KEY:
         raise HTTPException(status_code=401, detail="Invalid API Key")
 
+# 💓 Liveness: the process is up (no auth, for orchestrator probes)
+@router.get("/health")
+def health():
+    return {"status": "ok"}
+
+# 🚦 Readiness: artifacts loaded and warmed up; includes startup timings
+@router.get("/ready")
+def ready():
+    active = registry.active
+    return JSONResponse(status_code=200 if readiness["ready"] else 503,
+                        content={**readiness, "model_version": active.version if active is not None else None})
+
+# 📈 Prometheus scrape target (no auth, like the probes)
+@router.get("/metrics")
+def metrics_endpoint():
+    return Response(metrics.REGISTRY.render(), media_type=metrics.CONTENT_TYPE)
+
 # 🏠 Root endpoint
 @router.get("/")
 def root(x_api_key: str = Header(...)):
@@ -39,43 +163,156 @@ def root(x_api_key: str = Header(...)):
 
 # 🔮 Single prediction
 @router.post("/predict", response_model=RiskPrediction)
-def predict(data: CustomerInput, x_api_key: str = Header(...)):
+async def predict(data: CustomerInput, response: Response, x_api_key: str = Header(...)):
     verify_api_key(x_api_key)
+    require_ready()
+    timer = StageTimer()
     try:
-        df = data.to_df()
-        X = pipeline.transform(df)
-        _, proba = predict_risk(model, X)
+        with timer.stage("parse"):
+            df = data.to_df()
+        # ⏱️ "score" includes the wait for a worker thread (or for the micro-batch to fill)
+        with timer.stage("score"):
+            if batcher is not None:
+                result = await batcher.submit(df)
+            else:
+                stages = {}
+                result = await run_in_threadpool(score_frame, df, stages)
+                for name, seconds in stages.items():
+                    timer.record(name, seconds)
+        proba = float(result["risk_probability"].iloc[0])
+        model_version = result["model_version"].iloc[0]
 
         # 📝 Log prediction
-        log_df = df.copy()
-        log_df["risk_probability"] = proba[0]
-        os.makedirs(os.path.dirname(LOG_PATH), exist_ok=True)
-        log_df.to_csv(LOG_PATH, mode="a", header=not os.path.exists(LOG_PATH), index=False)
+        with timer.stage("log"):
+            await log_predictions(df.assign(risk_probability=proba, model_version=model_version))
+        response.headers["Server-Timing"] = timer.header()
 
-        return RiskPrediction(risk_probability=proba[0])
+        return RiskPrediction(predicted_label=int(result["predicted_label"].iloc[0]), risk_probability=proba,
+                              model_version=model_version)
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Prediction failed: {str(e)}")
 
+# 🌊 Stream scored chunks back as CSV or NDJSON while the rest of the upload is processed
+STREAM_MEDIA_TYPES = {"csv": "text/csv", "ndjson": "application/x-ndjson"}
+
+def score_upload_chunks(upload, active, chunksize: int):
+    import pandas as pd
+    from src.models.predict_model import predict_batch_chunks
+    reader = pd.read_csv(upload, chunksize=chunksize)
+    for results in predict_batch_chunks(reader, active.model, active.pipeline):
+        yield results.assign(model_version=active.version)
+
+def stream_batch_predictions(chunks, output_format: str):
+    for i, results in enumerate(chunks):
+        prediction_logger.log(results)
+        if output_format == "csv":
+            yield results.to_csv(index=False, header=i == 0)
+        else:
+            # to_json(lines=True) already ends every chunk with a newline
+            yield results.to_json(orient="records", lines=True)
+
 # 📂 Batch prediction
 @router.post("/predict_batch")
-def predict_batch_endpoint(file: UploadFile = File(...), x_api_key: str = Header(...)):
+def predict_batch_endpoint(
+    response: Response,
+    file: UploadFile = File(...),
+    x_api_key: str = Header(...),
+    stream: bool = Query(False, description="Stream scores back chunk by chunk"),
+    output_format: str = Query("csv", alias="format", description="Streaming output format: csv or ndjson"),
+    chunksize: int = Query(10_000, gt=0, description="Rows parsed and scored per chunk when streaming")
+):
     verify_api_key(x_api_key)
+    require_ready()
+    if stream:
+        if output_format not in STREAM_MEDIA_TYPES:
+            raise HTTPException(status_code=400, detail=f"Unsupported format '{output_format}', use csv or ndjson")
+        # The whole stream is scored by the version active when it started
+        active = registry.active
+        chunks = score_upload_chunks(file.file, active, chunksize)
+        # Score the first chunk before sending headers, so a malformed upload (missing columns,
+        # unparsable CSV) gets a 400 instead of a 200 with a silently truncated body
+        try:
+            first = next(chunks, None)
+        except Exception as e:
+            raise HTTPException(status_code=400, detail=f"Invalid batch upload: {type(e).__name__}: {e}")
+        return StreamingResponse(
+            stream_batch_predictions(itertools.chain([first] if first is not None else [], chunks), output_format),
+            media_type=STREAM_MEDIA_TYPES[output_format],
+            headers={"X-Model-Version": active.version}
+        )
+    import pandas as pd
+    timer = StageTimer()
     try:
-        df = pd.read_csv(file.file)
-        results = predict_batch(df, model, pipeline)
+        with timer.stage("parse"):
+            df = pd.read_csv(file.file)
+        stages = {}
+        results = score_frame(df, stages)
+        for name, seconds in stages.items():
+            timer.record(name, seconds)
 
         # 📝 Log batch predictions
-        os.makedirs(os.path.dirname(LOG_PATH), exist_ok=True)
-        results.to_csv(LOG_PATH, mode="a", header=not os.path.exists(LOG_PATH), index=False)
+        with timer.stage("log"):
+            prediction_logger.log(results)
+        response.headers["Server-Timing"] = timer.header()
 
         return {
             "message": "✅ Batch predictions completed",
             "rows": len(results),
-            "columns": list(results.columns)
+            "columns": list(results.columns),
+            "model_version": results["model_version"].iloc[0] if len(results) else registry.active.version
         }
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Batch prediction failed: {str(e)}")
 
+# 🗂️ Admin: show the active model version and reload history
+@router.get("/admin/models")
+def list_models(x_api_key: str = Header(...)):
+    verify_api_key(x_api_key)
+    return registry.describe()
+
+# 🔄 Admin: load and warm a new version in the background, then swap it in. The body may name
+# version/model_path/pipeline_path explicitly; without one the manifest (or default paths) is re-read.
+@router.post("/admin/reload")
+async def reload_model(spec: Optional[ModelSpec] = None, force: bool = Query(False), x_api_key: str = Header(...)):
+    verify_api_key(x_api_key)
+    if os.environ.get(PARENT_PID_ENV) == str(os.getppid()):
+        # 🍴 Under src.api.serve the parent loads the manifest version once and rolls every worker
+        if spec is not None:
+            raise HTTPException(status_code=409, detail="Prefork workers reload from the manifest; update it instead")
+        os.kill(os.getppid(), signal.SIGHUP)
+        return JSONResponse(status_code=202, content={"message": "🔄 Reload requested from the prefork parent"})
+    try:
+        active = await registry.reload(spec.model_dump() if spec is not None else None, force=force)
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Reload failed, still serving the previous model: {e}")
+    if not readiness["ready"]:
+        mark_ready(active)
+    return {"message": "✅ Model reloaded", "active": active.describe()}
+
+# 🧠 Admin: resident memory (RSS/PSS) of this worker and, under src.api.serve, of every worker
+@router.get("/admin/memory")
+def memory(x_api_key: str = Header(...)):
+    verify_api_key(x_api_key)
+    return worker_memory()
+
+# 🔁 Start/stop background workers with the app
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    prediction_logger.start()
+    if batcher is not None:
+        await batcher.start()
+    # Load in the background so the server answers /health at once and /ready once warm
+    loader = asyncio.create_task(load_and_warm())
+    watcher = asyncio.create_task(registry.watch(MANIFEST_POLL_S)) if MANIFEST_POLL_S > 0 else None
+    yield
+    if watcher is not None:
+        watcher.cancel()
+    await loader
+    if batcher is not None:
+        await batcher.stop()
+    prediction_logger.close()
+
 # 🚀 Create FastAPI app and mount router
-app = FastAPI(title="Credit Risk API", version="1.0")
+app = FastAPI(title="Credit Risk API", version="1.0", lifespan=lifespan)
 app.include_router(router, prefix="/api")
+app.add_middleware(RequestMetricsMiddleware)
@@ -0,0 +1,52 @@
+import os
+import resource
+
+# Set by src.api.serve in the prefork parent, so workers can find their siblings
+PARENT_PID_ENV = "PREFORK_PARENT_PID"
+
+SMAPS_FIELDS = {
+    "Rss": "rss_mb",
+    "Pss": "pss_mb",
+    "Shared_Clean": "shared_clean_mb",
+    "Shared_Dirty": "shared_dirty_mb",
+    "Private_Clean": "private_clean_mb",
+    "Private_Dirty": "private_dirty_mb",
+}
+
+# 🧠 Resident memory of one process. PSS charges each shared page 1/N to each of the N processes
+# mapping it, so summing PSS over workers gives the real footprint and RSS alone overcounts.
+def process_memory(pid="self") -> dict:
+    usage = {"pid": os.getpid() if pid == "self" else int(pid)}
+    try:
+        with open(f"/proc/{pid}/smaps_rollup") as f:
+            for line in f:
+                name, _, rest = line.partition(":")
+                if name in SMAPS_FIELDS:
+                    usage[SMAPS_FIELDS[name]] = int(rest.split()[0]) / 1024
+    except OSError:
+        # No smaps_rollup (non-Linux): peak RSS of this process only
+        usage["rss_mb"] = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024 if pid == "self" else None
+    return usage
+
+def _children(pid):
+    try:
+        with open(f"/proc/{pid}/task/{pid}/children") as f:
+            return [int(child) for child in f.read().split()]
+    except OSError:
+        return []
+
+# 📊 This worker plus, under the prefork server, the parent and every sibling worker
+def worker_memory() -> dict:
+    parent = os.environ.get(PARENT_PID_ENV)
+    if parent is None or int(parent) != os.getppid():
+        processes = [process_memory()]
+    else:
+        processes = [{**process_memory(parent), "role": "parent"}]
+        processes += [{**process_memory(child), "role": "worker"} for child in _children(parent)]
+    for usage in processes:
+        usage["current"] = usage["pid"] == os.getpid()
+    report = {"processes": processes}
+    if all(usage.get("pss_mb") is not None for usage in processes):
+        report["total_pss_mb"] = sum(usage["pss_mb"] for usage in processes)
+        report["total_rss_mb"] = sum(usage["rss_mb"] for usage in processes)
+    return report
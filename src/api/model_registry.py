@@ -0,0 +1,185 @@
+import asyncio
+import hashlib
+import json
+import os
+import time
+from typing import TYPE_CHECKING
+
+from fastapi.concurrency import run_in_threadpool
+
+if TYPE_CHECKING:
+    import pandas as pd
+
+# 🏷️ One loaded, warmed artifact pair. Never mutated after load, so a request that grabbed
+# it keeps scoring on it even if a newer version is activated mid-request.
+class ModelVersion:
+    def __init__(self, version, model, pipeline, model_path, pipeline_path, load_seconds, warmup_seconds,
+                 forest_path=None):
+        self.version = version
+        self.model = model
+        self.pipeline = pipeline
+        self.model_path = model_path
+        self.pipeline_path = pipeline_path
+        self.forest_path = forest_path
+        self.load_seconds = load_seconds
+        self.warmup_seconds = warmup_seconds
+        self.activated_at = None
+
+    def score(self, df: "pd.DataFrame", timings: dict = None) -> "pd.DataFrame":
+        from src.models.predict_model import predict_batch
+        return predict_batch(df, self.model, self.pipeline, timings).assign(model_version=self.version)
+
+    def describe(self) -> dict:
+        return {
+            "version": self.version,
+            "model_path": self.model_path,
+            "pipeline_path": self.pipeline_path,
+            "forest_path": self.forest_path,
+            "load_seconds": self.load_seconds,
+            "warmup_seconds": self.warmup_seconds,
+            "activated_at": self.activated_at,
+        }
+
+# Without a manifest the version is derived from the artifact files, so replacing them changes it
+def artifact_version(*paths) -> str:
+    h = hashlib.sha256()
+    for path in paths:
+        stat = os.stat(path)
+        h.update(f"{os.path.abspath(path)}:{stat.st_size}:{stat.st_mtime_ns}".encode("utf-8"))
+    return h.hexdigest()[:12]
+
+# 📦 Unpickle with mmap_mode so large numpy arrays are paged in on demand, then warm up
+# (forest compilation, JIT, first-call allocations) before anyone is routed to it.
+# forest_path points at a FlatForest saved by serving_artifacts, memory-mapped instead of rebuilt.
+def load_version(version, model_path, pipeline_path, warmup_record=None, forest_path=None) -> ModelVersion:
+    import joblib
+    import pandas as pd
+    from src.models.predict_model import get_compiled_forest, set_compiled_forest
+    from src.models.tree_compiler import FlatForest
+
+    for path in (model_path, pipeline_path):
+        if not os.path.exists(path):
+            raise FileNotFoundError(f"{path} not found. Please run training first.")
+
+    start = time.perf_counter()
+    model = joblib.load(model_path, mmap_mode="r")
+    pipeline = joblib.load(pipeline_path, mmap_mode="r")
+    if forest_path is not None:
+        set_compiled_forest(model, FlatForest.load(forest_path, mmap_mode="r"))
+    load_seconds = time.perf_counter() - start
+
+    candidate = ModelVersion(version or artifact_version(model_path, pipeline_path), model, pipeline,
+                             model_path, pipeline_path, load_seconds, None, forest_path)
+    start = time.perf_counter()
+    get_compiled_forest(model)
+    if warmup_record is not None:
+        candidate.score(pd.DataFrame([warmup_record]))
+    candidate.warmup_seconds = time.perf_counter() - start
+    return candidate
+
+# 🗂️ Serving registry: new versions are loaded and warmed in a worker thread while the active
+# one keeps serving, then swapped in with a single reference assignment.
+#
+# The manifest is a JSON file {"version": ..., "model_path": ..., "pipeline_path": ..., "forest_path": ...}
+# (forest_path optional); relative paths are resolved against the manifest's directory. Without a
+# manifest the default paths are served.
+class ModelRegistry:
+    def __init__(self, model_path, pipeline_path, manifest_path=None, warmup_record=None, version=None):
+        self.model_path = model_path
+        self.pipeline_path = pipeline_path
+        self.manifest_path = manifest_path
+        self.warmup_record = warmup_record
+        self.version = version
+        self.history = []
+        self.last_error = None
+        self._active = None
+        self._lock = None
+        self._manifest_mtime = None
+
+    @property
+    def active(self):
+        return self._active
+
+    def read_manifest(self):
+        if not self.manifest_path or not os.path.exists(self.manifest_path):
+            return None
+        with open(self.manifest_path) as f:
+            spec = json.load(f)
+        base = os.path.dirname(os.path.abspath(self.manifest_path))
+        for key in ("model_path", "pipeline_path"):
+            if key not in spec:
+                raise ValueError(f"Manifest {self.manifest_path} has no '{key}'")
+            spec[key] = os.path.join(base, spec[key])
+        if spec.get("forest_path"):
+            spec["forest_path"] = os.path.join(base, spec["forest_path"])
+        return spec
+
+    # Spec to load (default: manifest, else the default paths) with its version filled in
+    def resolve(self, spec=None) -> dict:
+        spec = dict(spec or self.read_manifest()
+                    or {"version": self.version, "model_path": self.model_path, "pipeline_path": self.pipeline_path})
+        if spec.get("version") is None:
+            spec["version"] = artifact_version(spec["model_path"], spec["pipeline_path"])
+        return spec
+
+    # Swap the active version; the previous one is freed once its in-flight requests finish
+    def activate(self, candidate: ModelVersion):
+        candidate.activated_at = time.time()
+        previous, self._active = self._active, candidate
+        self.history.append({"version": candidate.version, "activated_at": candidate.activated_at})
+        return previous
+
+    # Blocking load + warm + swap, for callers without an event loop (e.g. the prefork parent).
+    # The already active version is returned as is unless force is set.
+    def load(self, spec=None, force=False) -> ModelVersion:
+        try:
+            spec = self.resolve(spec)
+            if not force and self._active is not None and spec["version"] == self._active.version:
+                return self._active
+            candidate = load_version(spec["version"], spec["model_path"], spec["pipeline_path"],
+                                     self.warmup_record, spec.get("forest_path"))
+        except Exception as e:
+            self.last_error = f"{type(e).__name__}: {e}"
+            raise
+        self.last_error = None
+        previous = self.activate(candidate)
+        print(f"🔄 Model {candidate.version} active (load {candidate.load_seconds:.2f}s, "
+              f"warm-up {candidate.warmup_seconds:.2f}s)"
+              + (f", replacing {previous.version}" if previous is not None else ""))
+        return candidate
+
+    # 🔄 Same as load(), with loading and warm-up in a worker thread while the active version keeps
+    # serving. A failed load leaves the active version in place and is re-raised.
+    async def reload(self, spec=None, force=False):
+        if self._lock is None:
+            self._lock = asyncio.Lock()
+        async with self._lock:
+            return await run_in_threadpool(self.load, spec, force)
+
+    # Whether the manifest was rewritten since the last call
+    def manifest_changed(self) -> bool:
+        try:
+            mtime = os.stat(self.manifest_path).st_mtime_ns
+        except (OSError, TypeError):
+            return False
+        changed, self._manifest_mtime = mtime != self._manifest_mtime, mtime
+        return changed
+
+    # 👀 Poll the manifest and reload whenever it is rewritten with a new version
+    async def watch(self, interval_s: float = 5.0):
+        while True:
+            await asyncio.sleep(interval_s)
+            if not self.manifest_changed():
+                continue
+            try:
+                await self.reload()
+            except Exception as e:
+                print(f"❌ Reload from {self.manifest_path} failed, keeping the active model: {e}")
+
+    def describe(self) -> dict:
+        return {
+            "active": self._active.describe() if self._active is not None else None,
+            "manifest_path": self.manifest_path,
+            "last_error": self.last_error,
+            "history": self.history,
+        }
@@ -0,0 +1,179 @@
+import atexit
+import os
+import threading
+import time
+from collections import deque
+from datetime import datetime, timezone
+from typing import TYPE_CHECKING
+
+if TYPE_CHECKING:
+    import pandas as pd
+    import pyarrow as pa
+
+WHEN_FULL_POLICIES = ("drop", "block")
+
+# 📝 Off-request-path prediction logging: handlers append frames to a bounded
+# in-memory buffer, a single writer thread drains it in batches into Parquet files
+# rotated by row count or age, and close() flushes whatever is left.
+# A failed write (dtype drift, full disk, ...) loses only the frames involved: they are
+# counted in failed_rows, the file being written is abandoned and the thread keeps draining.
+class PredictionLogger:
+    def __init__(self, log_dir: str = "logs/predictions", max_buffer_rows: int = 100_000,
+                 flush_rows: int = 5_000, flush_interval_s: float = 2.0,
+                 rotate_rows: int = 1_000_000, rotate_seconds: float = 3600.0,
+                 when_full: str = "drop", block_timeout_s: float = 1.0):
+        if when_full not in WHEN_FULL_POLICIES:
+            raise ValueError(f"when_full must be one of {WHEN_FULL_POLICIES}, got '{when_full}'")
+        self.log_dir = log_dir
+        self.max_buffer_rows = max_buffer_rows
+        self.flush_rows = flush_rows
+        self.flush_interval_s = flush_interval_s
+        self.rotate_rows = rotate_rows
+        self.rotate_seconds = rotate_seconds
+        self.when_full = when_full
+        self.block_timeout_s = block_timeout_s
+
+        self.dropped_rows = 0
+        self.written_rows = 0
+        self.failed_rows = 0
+        self.last_error = None
+        self._buffer = deque()
+        self._buffered_rows = 0
+        self._cond = threading.Condition()
+        self._closed = False
+        self._thread = None
+        self._files = {}
+        self._file_seq = 0
+
+    @property
+    def buffered_rows(self) -> int:
+        return self._buffered_rows
+
+    def start(self):
+        if self._thread is None:
+            self._closed = False
+            self._thread = threading.Thread(target=self._run, name="prediction-logger", daemon=True)
+            self._thread.start()
+            atexit.register(self.close)
+        return self
+
+    # Returns False when the rows were dropped because the buffer was full
+    def log(self, df: "pd.DataFrame") -> bool:
+        rows = len(df)
+        with self._cond:
+            if self._closed:
+                self.dropped_rows += rows
+                return False
+            if self._buffered_rows + rows > self.max_buffer_rows:
+                if self.when_full == "block":
+                    self._cond.wait_for(
+                        lambda: self._buffered_rows + rows <= self.max_buffer_rows or self._closed,
+                        timeout=self.block_timeout_s
+                    )
+                if self._buffered_rows + rows > self.max_buffer_rows or self._closed:
+                    self.dropped_rows += rows
+                    return False
+            self._buffer.append(df.assign(logged_at=datetime.now(timezone.utc)))
+            self._buffered_rows += rows
+            if self._buffered_rows >= self.flush_rows:
+                self._cond.notify_all()
+        return True
+
+    def close(self):
+        with self._cond:
+            self._closed = True
+            self._cond.notify_all()
+        if self._thread is not None:
+            self._thread.join()
+            self._thread = None
+        self._drain()
+        self._close_files()
+
+    def _take(self):
+        with self._cond:
+            frames = list(self._buffer)
+            self._buffer.clear()
+            self._buffered_rows = 0
+            self._cond.notify_all()
+        return frames
+
+    def _run(self):
+        while True:
+            with self._cond:
+                self._cond.wait_for(
+                    lambda: self._closed or self._buffered_rows >= self.flush_rows,
+                    timeout=self.flush_interval_s
+                )
+                closed = self._closed
+            self._drain()
+            now = time.monotonic()
+            self._close_files(lambda f: now - f["opened_at"] >= self.rotate_seconds)
+            if closed:
+                return
+
+    def _drain(self):
+        frames = self._take()
+        if not frames:
+            return
+        # pandas and pyarrow load on the writer thread, not when the API module is imported
+        import pandas as pd
+        import pyarrow as pa
+
+        # Frames with different columns (single vs batch predictions) go to separate files
+        groups = {}
+        for frame in frames:
+            groups.setdefault(tuple(frame.columns), []).append(frame)
+        for columns, group in groups.items():
+            try:
+                self._write(columns, pa.Table.from_pandas(pd.concat(group, ignore_index=True), preserve_index=False))
+            except Exception:
+                # Retry frame by frame so one bad frame does not cost the whole batch
+                for frame in group:
+                    try:
+                        self._write(columns, pa.Table.from_pandas(frame, preserve_index=False))
+                    except Exception as e:
+                        self._fail(columns, len(frame), e)
+
+    def _fail(self, columns, rows: int, error: Exception):
+        self.failed_rows += rows
+        self.last_error = repr(error)
+        print(f"⚠️ Prediction log write failed, {rows} rows lost: {error!r}")
+        # The writer may be half-written; the next write for these columns opens a new file
+        current = self._files.pop(columns, None)
+        if current is not None:
+            self._close_writer(current)
+
+    def _write(self, columns, table: "pa.Table"):
+        import pyarrow.parquet as pq
+
+        current = self._files.get(columns)
+        if current is not None and (
+            not table.schema.equals(current["writer"].schema) or current["rows"] >= self.rotate_rows
+        ):
+            self._close_writer(self._files.pop(columns))
+            current = None
+        if current is None:
+            os.makedirs(self.log_dir, exist_ok=True)
+            self._file_seq += 1
+            stamp = datetime.now(timezone.utc).strftime("%Y%m%d-%H%M%S")
+            path = os.path.join(self.log_dir, f"predictions-{stamp}-{os.getpid()}-{self._file_seq:04d}.parquet")
+            current = {
+                "writer": pq.ParquetWriter(path, table.schema, compression="zstd"),
+                "rows": 0,
+                "opened_at": time.monotonic()
+            }
+            self._files[columns] = current
+        current["writer"].write_table(table)
+        current["rows"] += table.num_rows
+        self.written_rows += table.num_rows
+
+    def _close_files(self, should_close=lambda f: True):
+        for columns in [c for c, f in self._files.items() if should_close(f)]:
+            self._close_writer(self._files.pop(columns))
+
+    def _close_writer(self, current):
+        try:
+            current["writer"].close()
+        except Exception as e:
+            self.last_error = repr(e)
+            print(f"⚠️ Closing a prediction log file failed: {e!r}")
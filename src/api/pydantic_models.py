@@ -1,5 +1,5 @@
+from typing import Optional
 from pydantic import BaseModel
-import pandas as pd
 
 class CustomerInput(BaseModel):
     Amount: float
@@ -11,8 +11,16 @@ class CustomerInput(BaseModel):
     TransactionStartTime: str
 
     def to_df(self):
+        import pandas as pd
         return pd.DataFrame([self.dict()])
 
 class RiskPrediction(BaseModel):
     predicted_label: int
     risk_probability: float
+    model_version: Optional[str] = None
+
+class ModelSpec(BaseModel):
+    version: Optional[str] = None
+    model_path: str
+    pipeline_path: str
+    forest_path: Optional[str] = None
@@ -0,0 +1,143 @@
+import argparse
+import gc
+import os
+import signal
+import socket
+import sys
+import time
+import traceback
+
+# 📦 Add the project root directory to the Python path
+project_root = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+sys.path.insert(0, project_root)
+
+from src.api.memory import PARENT_PID_ENV
+
+# 🍴 Prefork serving: the parent imports the app, loads and warms the model once, freezes the
+# heap and forks workers that accept on one shared socket. Workers inherit the model through
+# copy-on-write pages instead of unpickling their own copy; memory-mapped artifacts (see
+# src.models.serving_artifacts) are shared through the page cache on top of that.
+#
+# SIGHUP (or a rewritten manifest) loads the new version in the parent and replaces the workers
+# one at a time, so the new version is shared as well and the socket never stops accepting.
+# SIGTERM/SIGINT stop the workers gracefully.
+
+def _bind(host, port, backlog=2048):
+    sock = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+    sock.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
+    sock.bind((host, port))
+    sock.listen(backlog)
+    sock.set_inheritable(True)
+    return sock
+
+def _run_worker(app, sock, log_level):
+    import uvicorn
+
+    for signum in (signal.SIGTERM, signal.SIGINT, signal.SIGHUP):
+        signal.signal(signum, signal.SIG_DFL)
+    uvicorn.Server(uvicorn.Config(app, log_level=log_level)).run(sockets=[sock])
+
+def _spawn(app, sock, log_level):
+    pid = os.fork()
+    if pid == 0:
+        code = 0
+        try:
+            _run_worker(app, sock, log_level)
+        except BaseException:
+            traceback.print_exc()
+            code = 1
+        finally:
+            os._exit(code)
+    return pid
+
+# Everything allocated so far (modules, model, pipeline, caches built by warm-up) goes to the
+# permanent generation, so the collector never writes to those pages in the workers
+def _freeze_heap():
+    gc.unfreeze()
+    gc.collect()
+    gc.freeze()
+
+def serve(host="0.0.0.0", port=8000, workers=2, log_level="info", poll_s=None):
+    import src.api.main as main
+
+    poll_s = main.MANIFEST_POLL_S if poll_s is None else poll_s
+    # The parent watches the manifest and rolls the workers; workers must not reload on their own
+    main.MANIFEST_POLL_S = 0
+    main.mark_ready(main.registry.load())
+    main.registry.manifest_changed()
+    _freeze_heap()
+
+    sock = _bind(host, port)
+    os.environ[PARENT_PID_ENV] = str(os.getpid())
+    children = {_spawn(main.app, sock, log_level) for _ in range(workers)}
+    print(f"🍴 Serving model {main.registry.active.version} on {host}:{port} with {workers} workers "
+          f"(parent {os.getpid()})")
+
+    signals = {"stop": False, "reload": False}
+
+    def on_stop(signum, frame):
+        signals["stop"] = True
+
+    def on_reload(signum, frame):
+        signals["reload"] = True
+
+    signal.signal(signal.SIGTERM, on_stop)
+    signal.signal(signal.SIGINT, on_stop)
+    signal.signal(signal.SIGHUP, on_reload)
+
+    last_poll = time.monotonic()
+    while not signals["stop"]:
+        time.sleep(0.2)
+
+        # ♻️ Replace workers that died
+        while children:
+            pid, status = os.waitpid(-1, os.WNOHANG)
+            if pid == 0:
+                break
+            if pid in children:
+                children.discard(pid)
+                if not signals["stop"]:
+                    print(f"⚠️ Worker {pid} exited with status {status}, starting a new one")
+                    children.add(_spawn(main.app, sock, log_level))
+
+        if poll_s > 0 and time.monotonic() - last_poll >= poll_s:
+            last_poll = time.monotonic()
+            signals["reload"] = signals["reload"] or main.registry.manifest_changed()
+        if not signals["reload"]:
+            continue
+        signals["reload"] = False
+
+        # 🔄 Load and warm the new version here, then roll the workers one by one
+        previous = main.registry.active
+        try:
+            active = main.registry.load()
+        except Exception as e:
+            print(f"❌ Reload failed, workers keep serving {previous.version}: {e}")
+            continue
+        if active is previous:
+            continue
+        _freeze_heap()
+        for pid in list(children):
+            children.add(_spawn(main.app, sock, log_level))
+            os.kill(pid, signal.SIGTERM)
+            os.waitpid(pid, 0)
+            children.discard(pid)
+        print(f"🔄 Workers now serve model {active.version}")
+
+    for pid in children:
+        os.kill(pid, signal.SIGTERM)
+    for pid in children:
+        os.waitpid(pid, 0)
+    sock.close()
+    print("👋 All workers stopped")
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Serve the API from forked workers sharing one loaded model")
+    parser.add_argument("--host", default="0.0.0.0")
+    parser.add_argument("--port", type=int, default=8000)
+    parser.add_argument("--workers", type=int, default=int(os.getenv("API_WORKERS", "2")))
+    parser.add_argument("--log-level", default="info")
+    parser.add_argument("--poll", type=float, default=None,
+                        help="Manifest poll interval in seconds (default: MODEL_MANIFEST_POLL_S, 0 disables)")
+    args = parser.parse_args()
+    serve(args.host, args.port, args.workers, args.log_level, args.poll)
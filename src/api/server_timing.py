@@ -0,0 +1,86 @@
+import time
+from contextlib import contextmanager
+
+from src.metrics import Counter, Histogram
+
+# ⏱️ Per-request stage durations, reported in a Server-Timing header (milliseconds) so clients
+# and load tests can see where server time goes without access to server logs
+class StageTimer:
+    def __init__(self):
+        self.started = time.perf_counter()
+        self.stages = {}
+
+    @contextmanager
+    def stage(self, name):
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.record(name, time.perf_counter() - start)
+
+    def record(self, name, seconds):
+        self.stages[name] = self.stages.get(name, 0.0) + seconds
+
+    def header(self) -> str:
+        stages = {**self.stages, "total": time.perf_counter() - self.started}
+        return ", ".join(f"{name};dur={seconds * 1000:.3f}" for name, seconds in stages.items())
+
+# Inverse of StageTimer.header: {"stage": milliseconds}
+def parse_server_timing(header: str) -> dict:
+    stages = {}
+    for entry in (header or "").split(","):
+        name, _, params = entry.strip().partition(";")
+        for param in params.split(";"):
+            key, _, value = param.strip().partition("=")
+            if name and key == "dur":
+                stages[name] = float(value)
+    return stages
+
+REQUEST_SECONDS = Histogram("credit_risk_request_seconds", "Time from request start to last response byte",
+                            ("endpoint",))
+REQUESTS = Counter("credit_risk_requests_total", "Requests served, by status code", ("endpoint", "status"))
+API_STAGE_SECONDS = Histogram("credit_risk_api_stage_seconds", "Server-Timing stages of API requests; "
+                              "framework is routing, body reading, validation and serialization",
+                              ("endpoint", "stage"))
+
+# 📈 ASGI middleware feeding the request metrics. Handlers only set a Server-Timing header; this
+# turns it into per-stage histograms, and whatever the request took outside the handler's timer
+# (routing, reading the body, pydantic validation, response serialization) becomes "framework".
+class RequestMetricsMiddleware:
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            return await self.app(scope, receive, send)
+        start = time.perf_counter()
+        response = {"status": 500, "server_timing": None}
+
+        async def send_and_record(message):
+            if message["type"] == "http.response.start":
+                response["status"] = message["status"]
+                for key, value in message.get("headers", ()):
+                    if key == b"server-timing":
+                        response["server_timing"] = value.decode("latin-1")
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_and_record)
+        finally:
+            self._observe(scope, time.perf_counter() - start, response)
+
+    def _observe(self, scope, elapsed, response):
+        # Label by endpoint function name, not raw path, so cardinality stays bounded (route
+        # paths exclude the router prefix on some FastAPI versions, names are stable)
+        route = scope.get("route")
+        endpoint = route.name if route is not None else "unmatched"
+        REQUESTS.labels(endpoint, str(response["status"])).inc()
+        REQUEST_SECONDS.labels(endpoint).observe(elapsed)
+        if response["server_timing"] is None:
+            return
+        stages = parse_server_timing(response["server_timing"])
+        handler_ms = stages.pop("total", None)
+        for stage, ms in stages.items():
+            API_STAGE_SECONDS.labels(endpoint, stage).observe(ms / 1000)
+        if handler_ms is not None:
+            API_STAGE_SECONDS.labels(endpoint, "framework").observe(max(elapsed - handler_ms / 1000, 0.0))
@@ -1,16 +1,66 @@
+import argparse
 import pandas as pd
 import numpy as np
 import os
+import pyarrow as pa
+import pyarrow.parquet as pq
 
 RAW_DATA_PATH = "data/raw/data.csv"
 RAW_DEFINITIONS_PATH = "data/raw/Xente_Variable_Definitions.csv"
-PROCESSED_DATA_PATH = "data/processed/cleaned_transactions.csv"
+PROCESSED_DATA_PATH = "data/processed/cleaned_transactions.parquet"
+PROCESSED_CSV_PATH = "data/processed/cleaned_transactions.csv"
 PROCESSED_DEFINITIONS_PATH = "data/processed/cleaned_variable_definitions.csv"
 
+CATEGORICAL_COLS = [
+    'BatchId', 'CurrencyCode', 'CountryCode', 'ProviderId',
+    'ProductId', 'ProductCategory', 'ChannelId', 'PricingStrategy'
+]
+NUMERIC_COLS = ['Amount', 'Value']
+DEFAULT_CHUNKSIZE = 100_000
+UNKNOWN_CODE = -1
+
+# 📐 Compact dtypes for the columns named in Xente_Variable_Definitions. The (near-)unique
+# TransactionId and BatchId are Arrow strings: a category would store every value once as a
+# category plus a code per row, larger than plain object strings.
+SCHEMA_DTYPES = {
+    'TransactionId': 'string[pyarrow]',
+    'BatchId': 'string[pyarrow]',
+    'AccountId': 'category',
+    'SubscriptionId': 'category',
+    'CustomerId': 'category',
+    'CurrencyCode': 'category',
+    'CountryCode': 'Int16',
+    'ProviderId': 'category',
+    'ProductId': 'category',
+    'ProductCategory': 'category',
+    'ChannelId': 'category',
+    'Amount': 'float32',
+    'Value': 'float32',
+    'TransactionStartTime': 'object',
+    'PricingStrategy': 'Int8',
+    'FraudResult': 'Int8'
+}
+
+# 🗂️ Columnar layout of the processed dataset shared by training, scoring and the UI
+CATEGORY_COLS = ['ProductCategory', 'ChannelId', 'ProviderId', 'CustomerId']
+PROCESSED_COLUMNS = [
+    'TransactionId', 'BatchId', 'AccountId', 'SubscriptionId', 'CustomerId',
+    'ProviderId', 'ProductId', 'ProductCategory', 'ChannelId', 'PricingStrategy',
+    'Amount', 'Value', 'TransactionStartTime',
+    'TransactionHour', 'TransactionDay', 'TransactionWeekday', 'FraudResult'
+]
+
 def load_data(data_path: str, definitions_path: str):
+    definitions = load_definitions(definitions_path)
+    schema = build_schema(definitions)
+
     print(f"📥 Loading transaction data from {data_path}")
-    df = pd.read_csv(data_path)
+    df = pd.read_csv(data_path, **read_csv_options(data_path, schema))
+    print(f"📦 Loaded {len(df)} rows, {df.memory_usage(deep=True).sum() / 1e6:.1f} MB in memory")
+
+    return df, definitions
 
+def load_definitions(definitions_path: str) -> pd.DataFrame:
     print(f"📘 Loading variable definitions from {definitions_path}")
     definitions = pd.read_csv(definitions_path)
 
@@ -18,15 +68,74 @@ def load_data(data_path: str, definitions_path: str):
     definitions['Column Name'] = definitions['Column Name'].astype(str).str.encode('utf-8', 'ignore').str.decode('utf-8')
     definitions['Definition'] = definitions['Definition'].astype(str).str.encode('utf-8', 'ignore').str.decode('utf-8')
 
-    return df, definitions
+    return definitions
+
+# 🧾 Column -> dtype for every defined column (unlisted *Id columns default to category)
+def build_schema(definitions: pd.DataFrame) -> dict:
+    schema = {}
+    for col in definitions['Column Name'].str.strip():
+        if col in SCHEMA_DTYPES:
+            schema[col] = SCHEMA_DTYPES[col]
+        elif col.endswith('Id'):
+            schema[col] = 'category'
+        else:
+            schema[col] = 'object'
+    return schema
+
+# 📑 usecols/dtype arguments for pd.read_csv, restricted to columns present in the file header
+def read_csv_options(data_path: str, schema: dict) -> dict:
+    header = pd.read_csv(data_path, nrows=0).columns
+    usecols = [col for col in schema if col in header]
+    return {'usecols': usecols, 'dtype': {col: schema[col] for col in usecols}}
 
-def validate_schema(df: pd.DataFrame, definitions: pd.DataFrame):
-    expected_columns = definitions['Column Name'].tolist()
-    missing_cols = [col for col in expected_columns if col not in df.columns]
-    if missing_cols:
-        print(f"⚠️ Warning: Missing columns in dataset: {missing_cols}")
+def validate_schema(df: pd.DataFrame, definitions: pd.DataFrame, strict: bool = False) -> dict:
+    schema = build_schema(definitions)
+    report = {
+        'missing': [col for col in schema if col not in df.columns],
+        'unexpected': [col for col in df.columns if col not in schema],
+        'dtype_mismatch': {
+            col: str(df[col].dtype) for col in schema
+            if col in df.columns and df[col].dtype != schema[col]
+        },
+        'null_counts': {col: int(n) for col, n in df.isna().sum().items() if n > 0}
+    }
+
+    if report['missing']:
+        print(f"⚠️ Warning: Missing columns in dataset: {report['missing']}")
     else:
         print("✅ All expected columns are present.")
+    if report['unexpected']:
+        print(f"ℹ️ Columns not in the variable definitions: {report['unexpected']}")
+    for col, dtype in report['dtype_mismatch'].items():
+        print(f"⚠️ {col} has dtype {dtype}, schema expects {schema[col]}")
+    for col, n in report['null_counts'].items():
+        print(f"🕳️ {col}: {n} missing values")
+
+    if strict and (report['missing'] or report['dtype_mismatch']):
+        raise ValueError(f"❌ Schema validation failed: {report}")
+    return report
+
+# 🔤 'Unknown' for string/categorical columns, UNKNOWN_CODE for integer-coded ones
+def fill_unknown(series: pd.Series) -> pd.Series:
+    if not series.isna().any():
+        return series
+    if isinstance(series.dtype, pd.CategoricalDtype):
+        if 'Unknown' not in series.cat.categories:
+            series = series.cat.add_categories('Unknown')
+        return series.fillna('Unknown')
+    if pd.api.types.is_numeric_dtype(series.dtype):
+        dtype = series.dtype if pd.api.types.is_extension_array_dtype(series.dtype) else 'Int64'
+        return series.fillna(UNKNOWN_CODE).astype(dtype)
+    return series.fillna('Unknown')
+
+# 🕒 Vectorized datetime features (-1 marks unparseable timestamps)
+def extract_datetime_features(df: pd.DataFrame) -> pd.DataFrame:
+    ts = pd.to_datetime(df['TransactionStartTime'], errors='coerce')
+    df['TransactionStartTime'] = ts
+    df['TransactionHour'] = ts.dt.hour.fillna(-1).astype('int8')
+    df['TransactionDay'] = ts.dt.day.fillna(-1).astype('int8')
+    df['TransactionWeekday'] = ts.dt.weekday.fillna(-1).astype('int8')
+    return df
 
 def preprocess_data(df: pd.DataFrame) -> pd.DataFrame:
     print("🧹 Starting preprocessing...")
@@ -34,29 +143,18 @@ def preprocess_data(df: pd.DataFrame) -> pd.DataFrame:
     df = df.drop_duplicates()
     print("✅ Dropped duplicate rows")
 
-    # Convert TransactionStartTime to datetime
-    df.loc[:, 'TransactionStartTime'] = pd.to_datetime(df['TransactionStartTime'], errors='coerce')
+    df = extract_datetime_features(df)
     print("🕒 Converted TransactionStartTime to datetime")
-
-    # Extract datetime features safely and cast to integer
-    df.loc[:, 'TransactionHour'] = df['TransactionStartTime'].apply(lambda x: x.hour if pd.notnull(x) else -1).astype(int)
-    df.loc[:, 'TransactionDay'] = df['TransactionStartTime'].apply(lambda x: x.day if pd.notnull(x) else -1).astype(int)
-    df.loc[:, 'TransactionWeekday'] = df['TransactionStartTime'].apply(lambda x: x.weekday() if pd.notnull(x) else -1).astype(int)
     print("📆 Extracted hour, day, and weekday from TransactionStartTime")
 
     # Fill missing categorical values
-    categorical_cols = [
-        'BatchId', 'CurrencyCode', 'CountryCode', 'ProviderId',
-        'ProductId', 'ProductCategory', 'ChannelId', 'PricingStrategy'
-    ]
-    for col in categorical_cols:
+    for col in CATEGORICAL_COLS:
         if col in df.columns:
-            df.loc[:, col] = df[col].fillna('Unknown')
+            df[col] = fill_unknown(df[col])
             print(f"🔤 Filled missing values in {col} with 'Unknown'")
 
     # Fill missing numerical values and cap outliers
-    numeric_cols = ['Amount', 'Value']
-    for col in numeric_cols:
+    for col in NUMERIC_COLS:
         if col in df.columns:
             median_val = df[col].median()
             df.loc[:, col] = df[col].fillna(median_val)
@@ -80,18 +178,259 @@ def preprocess_data(df: pd.DataFrame) -> pd.DataFrame:
     print("✅ Preprocessing complete")
     return df
 
-def save_outputs(df: pd.DataFrame, definitions: pd.DataFrame):
+# 🗜️ Prune to the shared columns and give ID-like columns stable categorical dtypes
+def to_processed_frame(df: pd.DataFrame) -> pd.DataFrame:
+    df = df[[col for col in PROCESSED_COLUMNS if col in df.columns]].copy()
+    for col in CATEGORY_COLS:
+        if col in df.columns:
+            values = df[col] if isinstance(df[col].dtype, pd.CategoricalDtype) else df[col].astype(str)
+            df[col] = values.astype('category')
+            df[col] = df[col].cat.set_categories(sorted(df[col].cat.categories))
+    return df
+
+def _arrow_table(df: pd.DataFrame, schema: pa.Schema = None) -> pa.Table:
+    table = pa.Table.from_pandas(df, preserve_index=False)
+    if schema is None:
+        # Fixed int32 dictionary indices so chunks with more categories still fit the schema
+        schema = pa.schema([
+            pa.field(f.name, pa.dictionary(pa.int32(), pa.string())) if pa.types.is_dictionary(f.type) else f
+            for f in table.schema
+        ], metadata=table.schema.metadata)
+    return table.cast(schema)
+
+def save_outputs(df: pd.DataFrame, definitions: pd.DataFrame, write_csv: bool = False):
     os.makedirs(os.path.dirname(PROCESSED_DATA_PATH), exist_ok=True)
-    df.to_csv(PROCESSED_DATA_PATH, index=False)
+    pq.write_table(_arrow_table(to_processed_frame(df)), PROCESSED_DATA_PATH, compression="zstd")
     definitions.to_csv(PROCESSED_DEFINITIONS_PATH, index=False)
     print(f"💾 Cleaned transactions saved to {PROCESSED_DATA_PATH}")
+    if write_csv:
+        df.to_csv(PROCESSED_CSV_PATH, index=False)
+        print(f"💾 Full-width CSV copy saved to {PROCESSED_CSV_PATH}")
     print(f"📘 Cleaned variable definitions saved to {PROCESSED_DEFINITIONS_PATH}")
 
-def main():
+# 📤 Load only the requested columns of the processed dataset (memory-mapped Parquet,
+# with a CSV fallback for trees that only have the legacy export)
+def load_processed_data(columns=None, path: str = PROCESSED_DATA_PATH) -> pd.DataFrame:
+    if path.endswith(".parquet") and not os.path.exists(path) and os.path.exists(PROCESSED_CSV_PATH):
+        path = PROCESSED_CSV_PATH
+    if path.endswith(".parquet"):
+        return pq.read_table(path, columns=columns, memory_map=True).to_pandas()
+    df = pd.read_csv(path, usecols=columns)
+    for col in CATEGORY_COLS:
+        if col in df.columns:
+            df[col] = df[col].astype(str).astype('category')
+    return df
+
+# 📐 Mergeable quantile sketch: exact (value, count) pairs while the number of
+# distinct values fits in max_bins, weighted-centroid compression beyond that.
+class QuantileSketch:
+    def __init__(self, max_bins: int = 200_000):
+        self.max_bins = max_bins
+        self.values = np.empty(0, dtype=float)
+        self.weights = np.empty(0, dtype=float)
+        self.exact = True
+
+    @property
+    def count(self) -> float:
+        return float(self.weights.sum())
+
+    def update(self, values, weight: float = 1.0):
+        values = np.asarray(values, dtype=float)
+        values = values[~np.isnan(values)]
+        if values.size == 0:
+            return self
+        uniq, counts = np.unique(values, return_counts=True)
+        return self._merge_arrays(uniq, counts * float(weight))
+
+    def add(self, value: float, weight: float):
+        if weight > 0:
+            self._merge_arrays(np.array([value], dtype=float), np.array([weight], dtype=float))
+        return self
+
+    def merge(self, other: "QuantileSketch"):
+        self.exact = self.exact and other.exact
+        return self._merge_arrays(other.values, other.weights)
+
+    def _merge_arrays(self, values, weights):
+        values = np.concatenate([self.values, values])
+        weights = np.concatenate([self.weights, weights])
+        uniq, inverse = np.unique(values, return_inverse=True)
+        self.values = uniq
+        self.weights = np.bincount(inverse, weights=weights)
+        if len(self.values) > self.max_bins:
+            self._compress()
+        return self
+
+    def _compress(self):
+        # Collapse neighbouring values into max_bins equal-weight centroids
+        cum = np.cumsum(self.weights)
+        bins = np.minimum((cum - self.weights / 2) / cum[-1] * self.max_bins, self.max_bins - 1).astype(int)
+        weights = np.bincount(bins, weights=self.weights)
+        sums = np.bincount(bins, weights=self.values * self.weights)
+        keep = weights > 0
+        self.values = sums[keep] / weights[keep]
+        self.weights = weights[keep]
+        self.exact = False
+
+    def _value_at_rank(self, rank: int) -> float:
+        cum = np.cumsum(self.weights)
+        return float(self.values[np.searchsorted(cum, rank, side='right')])
+
+    # Same linear interpolation as pandas.Series.quantile
+    def quantile(self, q: float) -> float:
+        n = self.count
+        if n == 0:
+            return float('nan')
+        pos = q * (n - 1)
+        lo, hi = int(np.floor(pos)), int(np.ceil(pos))
+        v_lo, v_hi = self._value_at_rank(lo), self._value_at_rank(hi)
+        return v_lo + (v_hi - v_lo) * (pos - lo)
+
+# 🔑 Same rule as preprocess_data's drop_duplicates(): a row is a duplicate when every column
+# equals an earlier row's. Numbers are hashed as float64 so a column read as int in one chunk and
+# as float in another (e.g. once NaNs appear) still hashes alike.
+def _row_hashes(chunk: pd.DataFrame) -> np.ndarray:
+    numeric = [col for col in chunk.columns
+               if pd.api.types.is_numeric_dtype(chunk[col]) and not pd.api.types.is_bool_dtype(chunk[col])]
+    return pd.util.hash_pandas_object(chunk.astype({col: 'float64' for col in numeric}), index=False).to_numpy()
+
+# 🗂️ Row hashes seen so far, kept as sorted runs merged like a binary counter: each hash is
+# re-merged O(log n) times, instead of re-sorting the whole set on every chunk
+class _SeenHashes:
+    def __init__(self):
+        self.runs = []
+
+    def contains(self, hashes: np.ndarray) -> np.ndarray:
+        found = np.zeros(len(hashes), dtype=bool)
+        for run in self.runs:
+            idx = np.minimum(np.searchsorted(run, hashes), run.size - 1)
+            found |= run[idx] == hashes
+        return found
+
+    def add(self, hashes: np.ndarray):
+        run = np.unique(hashes)
+        while self.runs and self.runs[-1].size <= run.size:
+            run = np.union1d(self.runs.pop(), run)
+        if run.size:
+            self.runs.append(run)
+
+def _dedupe_chunk(chunk: pd.DataFrame, seen: _SeenHashes) -> pd.DataFrame:
+    hashes = _row_hashes(chunk)
+    first = ~pd.Series(hashes).duplicated().to_numpy() & ~seen.contains(hashes)
+    seen.add(hashes[first])
+    return chunk if first.all() else chunk[first].copy()
+
+def _iter_deduped_chunks(data_path: str, chunksize: int, schema: dict = None):
+    seen = _SeenHashes()
+    options = read_csv_options(data_path, schema) if schema else {}
+    for chunk in pd.read_csv(data_path, chunksize=chunksize, **options):
+        yield _dedupe_chunk(chunk, seen)
+
+# 📊 Pass 1: sketch Amount/Value and count FraudResult labels, chunk by chunk
+def compute_streaming_stats(data_path: str, chunksize: int = DEFAULT_CHUNKSIZE, max_bins: int = 200_000,
+                            schema: dict = None):
+    sketches = {col: QuantileSketch(max_bins) for col in NUMERIC_COLS}
+    missing = {col: 0 for col in NUMERIC_COLS}
+    fraud_counts = pd.Series(dtype=float)
+    fraud_missing = 0
+    rows = 0
+    # Without a schema a chunk where a text column is all NaN is read as float; remember which
+    # columns hold text anywhere so pass 2 treats them like the whole-file read does
+    text_cols = set()
+
+    for chunk in _iter_deduped_chunks(data_path, chunksize, schema):
+        rows += len(chunk)
+        text_cols |= {col for col in CATEGORICAL_COLS if col in chunk.columns and chunk[col].dtype == object}
+        for col in NUMERIC_COLS:
+            if col in chunk.columns:
+                sketches[col].update(chunk[col].to_numpy())
+                missing[col] += int(chunk[col].isnull().sum())
+        if 'FraudResult' in chunk.columns:
+            fraud_counts = fraud_counts.add(chunk['FraudResult'].value_counts(), fill_value=0)
+            fraud_missing += int(chunk['FraudResult'].isnull().sum())
+
+    stats = {'rows': rows, 'fill': {}, 'bounds': {}, 'text_cols': sorted(text_cols)}
+    for col, sketch in sketches.items():
+        if sketch.count == 0 and missing[col] == 0:
+            continue
+        median_val = sketch.quantile(0.5)
+        # Mirror the in-memory path: quantiles are taken after the median fill
+        sketch.add(median_val, missing[col])
+        Q1, Q3 = sketch.quantile(0.25), sketch.quantile(0.75)
+        IQR = Q3 - Q1
+        stats['fill'][col] = median_val
+        stats['bounds'][col] = (Q1 - 1.5 * IQR, Q3 + 1.5 * IQR)
+        if not sketch.exact:
+            print(f"⚠️ {col} sketch exceeded {max_bins} bins; capping bounds are approximate")
+
+    if fraud_missing > 0 and not fraud_counts.empty:
+        stats['fraud_mode'] = fraud_counts[fraud_counts == fraud_counts.max()].index.min()
+    return stats
+
+def _apply_stats(chunk: pd.DataFrame, stats: dict) -> pd.DataFrame:
+    chunk = extract_datetime_features(chunk)
+    for col in stats.get('text_cols', ()):
+        if chunk[col].dtype != object:
+            chunk[col] = chunk[col].astype(object)
+    for col in CATEGORICAL_COLS:
+        if col in chunk.columns:
+            chunk[col] = fill_unknown(chunk[col])
+    for col, median_val in stats['fill'].items():
+        lower, upper = stats['bounds'][col]
+        chunk.loc[:, col] = np.clip(chunk[col].fillna(median_val), lower, upper)
+    if 'fraud_mode' in stats:
+        chunk.loc[:, 'FraudResult'] = chunk['FraudResult'].fillna(stats['fraud_mode'])
+    return chunk
+
+# 🌊 Pass 2: clean each chunk with the global bounds and append it to output_path
+def preprocess_data_streaming(data_path: str, output_path: str, chunksize: int = DEFAULT_CHUNKSIZE,
+                              max_bins: int = 200_000, schema: dict = None) -> dict:
+    print(f"🌊 Streaming preprocessing of {data_path} in chunks of {chunksize} rows...")
+    stats = compute_streaming_stats(data_path, chunksize, max_bins, schema)
+    for col, (lower, upper) in stats['bounds'].items():
+        print(f"🔢 {col}: median fill {stats['fill'][col]}, capped to [{lower:.2f}, {upper:.2f}]")
+
+    os.makedirs(os.path.dirname(output_path) or ".", exist_ok=True)
+    to_parquet = output_path.endswith(".parquet")
+    writer = None
+    written = 0
+    for chunk in _iter_deduped_chunks(data_path, chunksize, schema):
+        chunk = _apply_stats(chunk, stats)
+        if to_parquet:
+            table = _arrow_table(to_processed_frame(chunk), writer.schema if writer else None)
+            if writer is None:
+                writer = pq.ParquetWriter(output_path, table.schema, compression="zstd")
+            writer.write_table(table)
+        else:
+            chunk.to_csv(output_path, mode="w" if written == 0 else "a", header=written == 0, index=False)
+        written += len(chunk)
+    if writer is not None:
+        writer.close()
+
+    print(f"✅ Streaming preprocessing complete: {written} unique rows written to {output_path}")
+    return stats
+
+def main(chunksize: int = None, write_csv: bool = False):
+    if chunksize:
+        definitions = load_definitions(RAW_DEFINITIONS_PATH)
+        schema = build_schema(definitions)
+        # Same checks as the in-memory path, on the first chunk
+        first = pd.read_csv(RAW_DATA_PATH, nrows=chunksize, **read_csv_options(RAW_DATA_PATH, schema))
+        validate_schema(first, definitions)
+        preprocess_data_streaming(RAW_DATA_PATH, PROCESSED_DATA_PATH, chunksize, schema=schema)
+        definitions.to_csv(PROCESSED_DEFINITIONS_PATH, index=False)
+        return
+
     df, definitions = load_data(RAW_DATA_PATH, RAW_DEFINITIONS_PATH)
     validate_schema(df, definitions)
     df_cleaned = preprocess_data(df)
-    save_outputs(df_cleaned, definitions)
+    save_outputs(df_cleaned, definitions, write_csv=write_csv)
 
 if __name__ == "__main__":
-    main()
+    parser = argparse.ArgumentParser(description="Clean raw Xente transactions")
+    parser.add_argument("--chunksize", type=int, default=None,
+                        help="Stream the raw file in chunks of this many rows instead of loading it whole")
+    parser.add_argument("--csv", action="store_true",
+                        help=f"Also write a full-width CSV copy to {PROCESSED_CSV_PATH}")
+    args = parser.parse_args()
+    main(chunksize=args.chunksize, write_csv=args.csv)
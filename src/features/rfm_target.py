@@ -1,30 +1,130 @@
+import numpy as np
 import pandas as pd
-from sklearn.cluster import KMeans
+from sklearn.cluster import KMeans, MiniBatchKMeans
 from sklearn.preprocessing import StandardScaler
 
+RFM_STATE_COLUMNS = ["LastTransaction", "Frequency", "Monetary"]
+
+# 🧮 Per-customer last timestamp, transaction count and amount sum (vectorized reductions)
+def _rfm_partials(df):
+    last = pd.to_datetime(df["TransactionStartTime"]).dt.tz_localize(None)
+    return pd.DataFrame({
+        "CustomerId": df["CustomerId"].to_numpy(),
+        "LastTransaction": last.to_numpy(),
+        "TransactionId": df["TransactionId"].to_numpy(),
+        "Amount": df["Amount"].to_numpy()
+    }).groupby("CustomerId", sort=True).agg(
+        LastTransaction=("LastTransaction", "max"),
+        Frequency=("TransactionId", "count"),
+        Monetary=("Amount", "sum")
+    )
+
+def _rfm_from_state(state, snapshot_date):
+    return pd.DataFrame({
+        "CustomerId": state.index.to_numpy(),
+        "Recency": (snapshot_date - state["LastTransaction"]).dt.days.to_numpy(),
+        "Frequency": state["Frequency"].to_numpy(),
+        "Monetary": state["Monetary"].to_numpy()
+    })
+
 def create_rfm_features(df, snapshot_date):
-    df = df.copy()
-    df["TransactionStartTime"] = pd.to_datetime(df["TransactionStartTime"]).dt.tz_localize(None)
+    return _rfm_from_state(_rfm_partials(df), snapshot_date)
 
-    rfm = df.groupby("CustomerId").agg({
-        "TransactionStartTime": lambda x: (snapshot_date - x.max()).days,
-        "TransactionId": "count",
-        "Amount": "sum"
-    }).reset_index()
+# 🔁 Keeps per-customer RFM state so new days of transactions (or a later snapshot
+# date) only cost work proportional to the new data and the customer count.
+class IncrementalRFM:
+    def __init__(self):
+        self.state = pd.DataFrame({
+            "LastTransaction": pd.Series(dtype="datetime64[ns]"),
+            "Frequency": pd.Series(dtype="int64"),
+            "Monetary": pd.Series(dtype="float64")
+        }, index=pd.Index([], name="CustomerId"))
 
-    rfm.columns = ["CustomerId", "Recency", "Frequency", "Monetary"]
-    return rfm
+    def update(self, df):
+        partials = _rfm_partials(df)
+        if self.state.empty:
+            self.state = partials
+            return self
+        combined = pd.concat([self.state, partials])
+        self.state = combined.groupby(level=0, sort=True).agg(
+            LastTransaction=("LastTransaction", "max"),
+            Frequency=("Frequency", "sum"),
+            Monetary=("Monetary", "sum")
+        )
+        return self
 
-def assign_risk_label(rfm_df, n_clusters=3):
-    rfm_df = rfm_df.copy()
-    scaler = StandardScaler()
-    rfm_scaled = scaler.fit_transform(rfm_df[["Recency", "Frequency", "Monetary"]])
+    @property
+    def latest_transaction(self):
+        return self.state["LastTransaction"].max()
+
+    def compute(self, snapshot_date=None):
+        if snapshot_date is None:
+            snapshot_date = self.latest_transaction
+        return _rfm_from_state(self.state, snapshot_date)
+
+    def save(self, path):
+        self.state.reset_index().to_parquet(path, index=False)
+
+    @classmethod
+    def load(cls, path):
+        rfm = cls()
+        rfm.state = pd.read_parquet(path).set_index("CustomerId")[RFM_STATE_COLUMNS]
+        return rfm
 
-    kmeans = KMeans(n_clusters=n_clusters, random_state=42)
-    rfm_df["Cluster"] = kmeans.fit_predict(rfm_scaled)
+RFM_FEATURES = ["Recency", "Frequency", "Monetary"]
+CLUSTER_BACKENDS = ("kmeans", "minibatch")
+
+# 🧭 Fit RFM clusters; centroids are kept in raw RFM units so they can seed the
+# next run even though that run fits its own scaler.
+def fit_risk_clusters(rfm_df, n_clusters=3, backend="kmeans", sample_size=None,
+                      init_centroids=None, batch_size=4096, random_state=42):
+    if backend not in CLUSTER_BACKENDS:
+        raise ValueError(f"Unknown clustering backend '{backend}', expected one of {CLUSTER_BACKENDS}")
+
+    features = rfm_df[RFM_FEATURES].to_numpy(dtype=float)
+    scaler = StandardScaler().fit(features)
+    rfm_scaled = scaler.transform(features)
+    if sample_size is not None and sample_size < len(rfm_scaled):
+        rng = np.random.default_rng(random_state)
+        rfm_scaled = rfm_scaled[rng.choice(len(rfm_scaled), size=sample_size, replace=False)]
+
+    params = {"n_clusters": n_clusters, "random_state": random_state}
+    if init_centroids is not None:
+        params.update(init=scaler.transform(np.asarray(init_centroids, dtype=float)), n_init=1)
+    if backend == "minibatch":
+        kmeans = MiniBatchKMeans(batch_size=batch_size, **params)
+    else:
+        kmeans = KMeans(**params)
+    kmeans.fit(rfm_scaled)
+
+    return {"scaler": scaler, "centroids": scaler.inverse_transform(kmeans.cluster_centers_)}
+
+# 📍 Vectorized nearest-centroid assignment, chunked to bound the distance matrix
+def assign_clusters(rfm_df, clusters, chunk_size=1_000_000):
+    scaler = clusters["scaler"]
+    centroids = scaler.transform(clusters["centroids"])
+    features = rfm_df[RFM_FEATURES].to_numpy(dtype=float)
+    labels = np.empty(len(features), dtype=np.int32)
+    for start in range(0, len(features), chunk_size):
+        block = scaler.transform(features[start:start + chunk_size])
+        distances = ((block[:, None, :] - centroids[None, :, :]) ** 2).sum(axis=2)
+        labels[start:start + chunk_size] = distances.argmin(axis=1)
+    return labels
+
+def assign_risk_label(rfm_df, n_clusters=3, backend="kmeans", sample_size=None,
+                      init_centroids=None, return_clusters=False):
+    rfm_df = rfm_df.copy()
+    clusters = fit_risk_clusters(
+        rfm_df, n_clusters=n_clusters, backend=backend,
+        sample_size=sample_size, init_centroids=init_centroids
+    )
+    rfm_df["Cluster"] = assign_clusters(rfm_df, clusters)
 
     cluster_stats = rfm_df.groupby("Cluster")[["Frequency", "Monetary"]].mean()
     risk_cluster = cluster_stats.mean(axis=1).idxmin()
+    clusters["risk_cluster"] = int(risk_cluster)
 
     rfm_df["is_high_risk"] = (rfm_df["Cluster"] == risk_cluster).astype(int)
+    if return_clusters:
+        return rfm_df[["CustomerId", "is_high_risk"]], clusters
     return rfm_df[["CustomerId", "is_high_risk"]]
@@ -1,4 +1,7 @@
 from sklearn.base import BaseEstimator, TransformerMixin
+from sklearn.feature_extraction import FeatureHasher
+from sklearn.utils import murmurhash3_32
+import numpy as np
 import pandas as pd
 
 class DateFeatureExtractor(BaseEstimator, TransformerMixin):
@@ -17,17 +20,145 @@ class DateFeatureExtractor(BaseEstimator, TransformerMixin):
         return X
 
 class AggregateCustomerFeatures(BaseEstimator, TransformerMixin):
+    # Per-customer running sum, count, mean and sum of squared deviations (m2) of Amount, fitted
+    # once and looked up per row at transform time; unseen customers get fallback_ values.
+    # Batches are merged with Chan et al.'s pairwise update, so the variance stays accurate for
+    # large amounts where sum-of-squares minus squared-sum would cancel catastrophically.
+    def __init__(self, customer_col="CustomerId", amount_col="Amount"):
+        self.customer_col = customer_col
+        self.amount_col = amount_col
+
+    def _check_columns(self, X):
+        if self.customer_col not in X.columns or self.amount_col not in X.columns:
+            raise ValueError(f"Required columns '{self.customer_col}' and '{self.amount_col}' not found in input.")
+
     def fit(self, X, y=None):
+        self._check_columns(X)
+        self.customer_index_ = pd.Index([], dtype=object)
+        self.sum_ = np.zeros(0, dtype=np.float64)
+        self.count_ = np.zeros(0, dtype=np.int64)
+        self.mean_ = np.zeros(0, dtype=np.float64)
+        self.m2_ = np.zeros(0, dtype=np.float64)
+        self.update(X)
+
+        amounts = pd.to_numeric(X[self.amount_col], errors="coerce")
+        self.fallback_ = {
+            "TotalAmount": 0.0,
+            "AvgAmount": float(amounts.mean()),
+            "TxnCount": 0,
+            "AmountStd": float(amounts.std())
+        }
+        return self
+
+    # Fold new transactions into the running aggregates without recomputing history
+    def update(self, X):
+        self._check_columns(X)
+        amounts = pd.to_numeric(X[self.amount_col], errors="coerce").to_numpy(dtype=np.float64)
+        valid = ~np.isnan(amounts)
+        codes, uniques = pd.factorize(X[self.customer_col].astype(str))
+        codes, amounts = codes[valid], amounts[valid]
+
+        n = len(uniques)
+        batch_sum = np.bincount(codes, weights=amounts, minlength=n)
+        batch_count = np.bincount(codes, minlength=n)
+        with np.errstate(divide="ignore", invalid="ignore"):
+            batch_mean = np.where(batch_count > 0, batch_sum / batch_count, 0.0)
+        batch_m2 = np.bincount(codes, weights=(amounts - batch_mean[codes]) ** 2, minlength=n)
+
+        positions = self.customer_index_.get_indexer(uniques)
+        new = positions == -1
+        if new.any():
+            start = len(self.customer_index_)
+            self.customer_index_ = self.customer_index_.append(pd.Index(uniques[new], dtype=object))
+            self.sum_ = np.concatenate([self.sum_, np.zeros(new.sum())])
+            self.count_ = np.concatenate([self.count_, np.zeros(new.sum(), dtype=np.int64)])
+            self.mean_ = np.concatenate([self.mean_, np.zeros(new.sum())])
+            self.m2_ = np.concatenate([self.m2_, np.zeros(new.sum())])
+            positions[new] = np.arange(start, start + new.sum())
+
+        # positions are unique per batch, so plain fancy-index updates are safe
+        count_a = self.count_[positions]
+        count = count_a + batch_count
+        with np.errstate(divide="ignore", invalid="ignore"):
+            share = np.where(count > 0, batch_count / count, 0.0)
+        delta = batch_mean - self.mean_[positions]
+        self.mean_[positions] += delta * share
+        self.m2_[positions] += batch_m2 + delta * delta * count_a * share
+        self.sum_[positions] += batch_sum
+        self.count_[positions] = count
         return self
 
     def transform(self, X):
         X = X.copy()
-        if "CustomerId" not in X.columns or "Amount" not in X.columns:
-            raise ValueError("Required columns 'CustomerId' and 'Amount' not found in input.")
+        self._check_columns(X)
+
+        positions = self.customer_index_.get_indexer(X[self.customer_col].astype(str))
+        seen = positions != -1
+        if len(self.customer_index_):
+            # Unseen rows read position 0; np.where replaces them with fallback_ values below
+            lookup = np.where(seen, positions, 0)
+            total, count, mean, m2 = self.sum_[lookup], self.count_[lookup], self.mean_[lookup], self.m2_[lookup]
+        else:
+            # Fitted on no rows: every customer is unseen
+            total = count = mean = m2 = np.zeros(len(X))
+
+        with np.errstate(divide="ignore", invalid="ignore"):
+            mean = np.where(count > 0, mean, np.nan)
+            std = np.where(count > 1, np.sqrt(m2 / (count - 1)), np.nan)
+
+        X["TotalAmount"] = np.where(seen, total, self.fallback_["TotalAmount"])
+        X["AvgAmount"] = np.where(seen, mean, self.fallback_["AvgAmount"])
+        X["TxnCount"] = np.where(seen, count, self.fallback_["TxnCount"])
+        X["AmountStd"] = np.where(seen, std, self.fallback_["AmountStd"])
+        return X
+
+def _as_frame(X):
+    return X if isinstance(X, pd.DataFrame) else pd.DataFrame(X)
 
-        agg = X.groupby("CustomerId").agg({
-            "Amount": ["sum", "mean", "count", "std"]
-        }).reset_index()
-        agg.columns = ["CustomerId", "TotalAmount", "AvgAmount", "TxnCount", "AmountStd"]
+class HashingEncoder(BaseEstimator, TransformerMixin):
+    # Hashes "column=value" tokens into a fixed number of sparse columns, so memory no longer
+    # grows with the number of distinct IDs; unseen IDs need no special handling.
+    def __init__(self, n_features=2 ** 12):
+        self.n_features = n_features
+
+    def fit(self, X, y=None):
+        X = _as_frame(X)
+        self.feature_names_in_ = np.asarray([str(c) for c in X.columns], dtype=object)
+        self.n_features_in_ = X.shape[1]
+        return self
+
+    def _tokens(self, X):
+        columns = [f"{name}=" + X.iloc[:, i].astype(str) for i, name in enumerate(self.feature_names_in_)]
+        return zip(*columns)
+
+    def transform(self, X):
+        hasher = FeatureHasher(n_features=self.n_features, input_type="string", alternate_sign=False)
+        return hasher.transform(self._tokens(_as_frame(X))).tocsr()
+
+    # Same bucket FeatureHasher picks for a single token (used by the single-record fast path)
+    def bucket(self, column, value):
+        h = murmurhash3_32(f"{column}={value}", seed=0)
+        return (2 ** 31 if h == -2 ** 31 else abs(h)) % self.n_features
+
+    def get_feature_names_out(self, input_features=None):
+        return np.asarray([f"hash_{i}" for i in range(self.n_features)], dtype=object)
+
+class FrequencyEncoder(BaseEstimator, TransformerMixin):
+    # Replaces each ID with its share of the fitted rows; one dense column per input column.
+    def fit(self, X, y=None):
+        X = _as_frame(X)
+        self.feature_names_in_ = np.asarray([str(c) for c in X.columns], dtype=object)
+        self.n_features_in_ = X.shape[1]
+        self.frequencies_ = [X.iloc[:, i].astype(str).value_counts(normalize=True) for i in range(X.shape[1])]
+        return self
+
+    def transform(self, X):
+        X = _as_frame(X)
+        out = np.zeros((len(X), len(self.frequencies_)), dtype=np.float64)
+        for i, freq in enumerate(self.frequencies_):
+            positions = freq.index.get_indexer(X.iloc[:, i].astype(str))
+            out[:, i] = np.where(positions != -1, freq.to_numpy()[positions], 0.0)
+        return out
 
-        return X.merge(agg, on="CustomerId", how="left")
+    def get_feature_names_out(self, input_features=None):
+        return np.asarray([f"{name}_frequency" for name in self.feature_names_in_], dtype=object)
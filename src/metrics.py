@@ -0,0 +1,164 @@
+import bisect
+import math
+import os
+import threading
+
+# 📈 Minimal in-process metrics (counters, gauges, fixed-bucket histograms) rendered in the
+# Prometheus text exposition format. Observing is a dict lookup, a bisect over the bucket
+# bounds and two additions under a lock, about a microsecond, so it can sit on the scoring
+# path; benchmarks/run_benchmarks.py measures it as "metrics_observe".
+# CREDIT_RISK_METRICS=0 turns every observation into a no-op.
+
+ENABLED = os.getenv("CREDIT_RISK_METRICS", "1") != "0"
+
+# Seconds: 100µs to 10s, roughly 2.5x apart
+LATENCY_BUCKETS = (0.0001, 0.00025, 0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0,
+                   2.5, 5.0, 10.0)
+# Rows per scored frame: single records up to large uploads
+ROW_BUCKETS = (1, 2, 4, 8, 16, 32, 64, 128, 256, 512, 1024, 4096, 16384, 65536, 262144)
+
+def _escape(value) -> str:
+    return str(value).replace("\\", "\\\\").replace("\"", "\\\"").replace("\n", "\\n")
+
+def _format_labels(names, values, extra=()) -> str:
+    pairs = [f'{name}="{_escape(value)}"' for name, value in (*zip(names, values), *extra)]
+    return "{" + ",".join(pairs) + "}" if pairs else ""
+
+def _format_value(value) -> str:
+    if value == math.inf:
+        return "+Inf"
+    return repr(float(value)) if not float(value).is_integer() else str(int(value))
+
+class _Metric:
+    kind = None
+
+    def __init__(self, name: str, documentation: str, labelnames=(), registry=None):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self._children = {}
+        self._lock = threading.Lock()
+        (REGISTRY if registry is None else registry).register(self)
+
+    # Keys are normalised to strings first, so e.g. status code 200 and "200" share one child
+    # and non-string labels still hit the lock-free lookup
+    def labels(self, *values):
+        key = tuple(value if type(value) is str else str(value) for value in values)
+        child = self._children.get(key)
+        if child is None:
+            if len(key) != len(self.labelnames):
+                raise ValueError(f"{self.name} takes labels {self.labelnames}, got {values}")
+            with self._lock:
+                child = self._children.setdefault(key, self._new_child())
+        return child
+
+    def clear(self):
+        with self._lock:
+            self._children = {}
+
+    def render(self) -> list:
+        lines = [f"# HELP {self.name} {self.documentation}", f"# TYPE {self.name} {self.kind}"]
+        for values, child in sorted(self._children.items()):
+            lines.extend(self._render_child(values, child))
+        return lines
+
+class _Value:
+    def __init__(self):
+        self.value = 0.0
+        self.function = None
+        self._lock = threading.Lock()
+
+    def inc(self, amount: float = 1.0):
+        if ENABLED:
+            with self._lock:
+                self.value += amount
+
+    def set(self, value: float):
+        self.value = value
+
+    # Read at scrape time instead, e.g. a queue length owned by another object
+    def set_function(self, function):
+        self.function = function
+
+    def get(self) -> float:
+        return self.function() if self.function is not None else self.value
+
+class Counter(_Metric):
+    kind = "counter"
+    _new_child = _Value
+
+    def _render_child(self, values, child):
+        return [f"{self.name}{_format_labels(self.labelnames, values)} {_format_value(child.get())}"]
+
+class Gauge(Counter):
+    kind = "gauge"
+
+class _Buckets:
+    def __init__(self, bounds):
+        self.bounds = bounds
+        self.counts = [0] * (len(bounds) + 1)
+        self.sum = 0.0
+        self._lock = threading.Lock()
+
+    def observe(self, value: float):
+        if ENABLED:
+            index = bisect.bisect_left(self.bounds, value)
+            with self._lock:
+                self.counts[index] += 1
+                self.sum += value
+
+class Histogram(_Metric):
+    kind = "histogram"
+
+    def __init__(self, name: str, documentation: str, labelnames=(), buckets=LATENCY_BUCKETS, registry=None):
+        self.buckets = tuple(sorted(buckets))
+        super().__init__(name, documentation, labelnames, registry)
+
+    def _new_child(self):
+        return _Buckets(self.buckets)
+
+    def _render_child(self, values, child):
+        with child._lock:
+            counts, total = list(child.counts), child.sum
+        lines, cumulative = [], 0
+        for bound, count in zip((*self.buckets, math.inf), counts):
+            cumulative += count
+            le = (("le", _format_value(bound)),)
+            lines.append(f"{self.name}_bucket{_format_labels(self.labelnames, values, le)} {cumulative}")
+        labels = _format_labels(self.labelnames, values)
+        lines.append(f"{self.name}_sum{labels} {_format_value(total)}")
+        lines.append(f"{self.name}_count{labels} {cumulative}")
+        return lines
+
+class MetricsRegistry:
+    def __init__(self):
+        self._metrics = {}
+        self._collect_hooks = []
+
+    def register(self, metric):
+        if metric.name in self._metrics:
+            raise ValueError(f"Metric {metric.name} is already registered")
+        self._metrics[metric.name] = metric
+
+    def get(self, name: str):
+        return self._metrics[name]
+
+    # Called before every render, to refresh gauges that mirror state held elsewhere
+    def on_collect(self, hook):
+        self._collect_hooks.append(hook)
+
+    def render(self) -> str:
+        for hook in self._collect_hooks:
+            hook()
+        lines = []
+        for metric in self._metrics.values():
+            lines.extend(metric.render())
+        return "\n".join(lines) + "\n"
+
+REGISTRY = MetricsRegistry()
+CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+# 🧮 Scoring-path metrics shared by src.models.predict_model and the API
+STAGE_SECONDS = Histogram("credit_risk_stage_seconds", "Time spent per scoring stage",
+                          ("function", "stage"))
+SCORED_ROWS = Histogram("credit_risk_scored_rows", "Rows per scored frame", ("function",), ROW_BUCKETS)
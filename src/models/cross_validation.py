@@ -0,0 +1,129 @@
+import multiprocessing as mp
+import os
+import resource
+import shutil
+import tempfile
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+import joblib
+import numpy as np
+import pandas as pd
+from sklearn.base import clone
+from sklearn.metrics import accuracy_score, f1_score, roc_auc_score
+from sklearn.model_selection import StratifiedKFold, train_test_split
+
+FOLD_METRICS = ["roc_auc", "f1", "accuracy", "fit_seconds", "score_seconds", "n_trees", "worker_maxrss_mb"]
+
+# Per-process handles onto the shared arrays, opened once by the pool initializer
+_shared = {}
+
+# 💾 Write each array once; joblib stores the (CSR or dense) buffers so workers can memory-map them
+def share_arrays(directory, **arrays):
+    paths = {}
+    for name, value in arrays.items():
+        paths[name] = os.path.join(directory, f"{name}.joblib")
+        joblib.dump(value, paths[name])
+    return paths
+
+def _open_shared(paths, n_threads):
+    for name, path in paths.items():
+        _shared[name] = joblib.load(path, mmap_mode="r")
+    _shared["n_threads"] = n_threads
+
+# Read-only view of the arrays opened by this worker process
+def shared_arrays():
+    return _shared
+
+def release_shared():
+    _shared.clear()
+
+# 🏊 Worker pool whose processes open the shared arrays zero-copy on start-up (or None for in-process)
+def open_worker_pool(paths, n_workers, n_threads):
+    if n_workers == 1:
+        _open_shared(paths, n_threads)
+        return None
+    # spawn, not fork: forking after OpenMP has started in the parent can deadlock
+    return ProcessPoolExecutor(max_workers=n_workers, mp_context=mp.get_context("spawn"),
+                               initializer=_open_shared, initargs=(paths, n_threads))
+
+def _maxrss_mb():
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+
+# 🧪 Fit and score one fold against the memory-mapped matrix; only the fold's rows are copied
+def _run_fold(fold, train_idx, val_idx, model):
+    X, y = _shared["X"], _shared["y"]
+    model = clone(model)
+    if model.get_params().get("n_jobs") is None:
+        model.set_params(n_jobs=_shared["n_threads"])
+
+    start = time.perf_counter()
+    X_train, y_train = X[train_idx], np.asarray(y[train_idx])
+    if model.get_params().get("early_stopping_rounds") is not None:
+        # Early stopping watches a slice of the training fold, never the fold being scored
+        fit_idx, es_idx = train_test_split(
+            np.arange(len(train_idx)), test_size=0.1, stratify=y_train, random_state=42
+        )
+        model.fit(X_train[fit_idx], y_train[fit_idx],
+                  eval_set=[(X_train[es_idx], y_train[es_idx])], verbose=False)
+    else:
+        model.fit(X_train, y_train)
+    fit_seconds = time.perf_counter() - start
+
+    start = time.perf_counter()
+    y_val = np.asarray(y[val_idx])
+    proba = model.predict_proba(X[val_idx])[:, 1]
+    score_seconds = time.perf_counter() - start
+
+    best_iteration = getattr(model, "best_iteration", None)
+    return {
+        "fold": fold,
+        "n_train": len(train_idx),
+        "n_val": len(val_idx),
+        "roc_auc": roc_auc_score(y_val, proba),
+        "f1": f1_score(y_val, (proba > 0.5).astype(int)),
+        "accuracy": accuracy_score(y_val, (proba > 0.5).astype(int)),
+        "fit_seconds": fit_seconds,
+        "score_seconds": score_seconds,
+        "n_trees": best_iteration + 1 if best_iteration is not None
+        else model.get_booster().num_boosted_rounds(),
+        "worker_pid": os.getpid(),
+        "worker_maxrss_mb": _maxrss_mb()
+    }
+
+# 📊 One row per fold plus mean/std across folds
+def summarize_folds(fold_results) -> pd.DataFrame:
+    folds = pd.DataFrame(fold_results).sort_values("fold").set_index("fold")
+    summary = folds[FOLD_METRICS].agg(["mean", "std"])
+    return pd.concat([folds, summary])
+
+# 🚀 Stratified K-fold CV with folds running in a process pool over one shared matrix.
+# Each worker gets cpu_count // n_workers XGBoost threads unless the model sets n_jobs.
+def run_parallel_cv(X, y, model, n_splits=5, n_workers=None, random_state=42, tmp_dir=None):
+    y = np.asarray(y)
+    splits = list(StratifiedKFold(n_splits=n_splits, shuffle=True, random_state=random_state).split(
+        np.zeros(len(y)), y
+    ))
+    n_workers = min(n_splits, n_workers or os.cpu_count() or 1)
+    n_threads = max(1, (os.cpu_count() or 1) // n_workers)
+
+    directory = tempfile.mkdtemp(prefix="cv_shared_", dir=tmp_dir)
+    start = time.perf_counter()
+    try:
+        pool = open_worker_pool(share_arrays(directory, X=X, y=y), n_workers, n_threads)
+        if pool is None:
+            results = [_run_fold(i, tr, va, model) for i, (tr, va) in enumerate(splits)]
+        else:
+            with pool:
+                futures = [pool.submit(_run_fold, i, tr, va, model) for i, (tr, va) in enumerate(splits)]
+                results = [f.result() for f in futures]
+    finally:
+        release_shared()
+        shutil.rmtree(directory, ignore_errors=True)
+
+    return {
+        "folds": summarize_folds(results),
+        "wall_seconds": time.perf_counter() - start,
+        "n_workers": n_workers,
+        "threads_per_worker": n_threads
+    }
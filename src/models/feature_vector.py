@@ -0,0 +1,171 @@
+import math
+from datetime import datetime
+
+import numpy as np
+from sklearn.impute import SimpleImputer
+from sklearn.pipeline import Pipeline
+from sklearn.preprocessing import OneHotEncoder, StandardScaler, TargetEncoder
+
+from src.features.transformers import FrequencyEncoder, HashingEncoder
+
+RAW_NUMERIC_FIELDS = ["Amount", "Value"]
+
+# 🕒 Timestamp parsing equivalent to pd.to_datetime(..., errors="coerce") for ISO strings
+def _parse_timestamp(value):
+    if value is None:
+        return None
+    if isinstance(value, datetime):
+        return value
+    try:
+        return datetime.fromisoformat(str(value))
+    except ValueError:
+        import pandas as pd  # rare non-ISO formats keep pandas' parsing rules
+        ts = pd.to_datetime(value, errors="coerce")
+        return None if ts is pd.NaT else ts.to_pydatetime()
+
+# 🧮 Same derived fields as predict_model.engineer_features, computed on plain Python values
+def derive_fields(record: dict) -> dict:
+    fields = dict(record)
+    for name in RAW_NUMERIC_FIELDS:
+        try:
+            fields[name] = float(record[name])
+        except KeyError:
+            raise ValueError(f"Missing required field '{name}'")
+        except (TypeError, ValueError):
+            raise ValueError(f"Field '{name}' must be numeric, got {record[name]!r}")
+
+    ts = _parse_timestamp(record.get("TransactionStartTime"))
+    hour = float(ts.hour) if ts is not None else math.nan
+    fields["Hour"] = hour
+    fields["DayOfWeek"] = float(ts.weekday()) if ts is not None else math.nan
+    fields["AmountToValueRatio"] = fields["Amount"] / (fields["Value"] + 1)
+    fields["IsNightTransaction"] = 1.0 if hour < 5 else 0.0
+    return fields
+
+def _unwrap(transformer):
+    steps = transformer.steps if isinstance(transformer, Pipeline) else [(None, transformer)]
+    imputer = None
+    for _, step in steps[:-1]:
+        if not isinstance(step, SimpleImputer):
+            raise TypeError(f"Unsupported step {type(step).__name__} in column pipeline")
+        imputer = step
+    return imputer, steps[-1][1]
+
+# ⚡ Flat-array compilation of a fitted ColumnTransformer (StandardScaler | OneHotEncoder |
+# HashingEncoder | FrequencyEncoder | TargetEncoder) that writes one record straight into a
+# feature vector identical to pipeline.transform.
+class FeatureVectorBuilder:
+    def __init__(self, numeric_blocks, categorical_blocks, n_features, sparse_output,
+                 hash_blocks=(), lookup_blocks=()):
+        self.numeric_blocks = numeric_blocks
+        self.categorical_blocks = categorical_blocks
+        self.hash_blocks = list(hash_blocks)
+        self.lookup_blocks = list(lookup_blocks)
+        self.n_features = n_features
+        self.sparse_output = sparse_output
+
+    @classmethod
+    def from_pipeline(cls, pipeline):
+        preprocessor = pipeline.named_steps["preprocessor"]
+        numeric_blocks, categorical_blocks, offset = [], [], 0
+        hash_blocks, lookup_blocks = [], []
+        for name, transformer, columns in preprocessor.transformers_:
+            if transformer == "drop" or len(columns) == 0:
+                continue
+            columns = list(columns)
+            imputer, encoder = _unwrap(transformer)
+            fill = None if imputer is None else list(imputer.statistics_)
+
+            if transformer == "passthrough" or isinstance(encoder, StandardScaler):
+                n = len(columns)
+                scaler = None if transformer == "passthrough" else encoder
+                means = scaler.mean_ if scaler is not None and scaler.with_mean else np.zeros(n)
+                scales = scaler.scale_ if scaler is not None and scaler.with_std else np.ones(n)
+                numeric_blocks.append({
+                    "columns": columns, "offset": offset,
+                    "fill": np.asarray(fill if fill is not None else [math.nan] * n, dtype=np.float64),
+                    "mean": np.asarray(means, dtype=np.float64),
+                    "scale": np.asarray(scales, dtype=np.float64)
+                })
+                offset += n
+            elif isinstance(encoder, OneHotEncoder):
+                if encoder.drop is not None or getattr(encoder, "infrequent_categories_", None) is not None:
+                    raise NotImplementedError("OneHotEncoder with drop or infrequent categories is not supported")
+                vocabularies, col_offset = [], offset
+                for categories in encoder.categories_:
+                    vocabularies.append({value: col_offset + i for i, value in enumerate(categories.tolist())})
+                    col_offset += len(categories)
+                categorical_blocks.append({
+                    "columns": columns, "fill": fill, "vocabularies": vocabularies,
+                    "handle_unknown": encoder.handle_unknown
+                })
+                offset = col_offset
+            elif isinstance(encoder, HashingEncoder):
+                hash_blocks.append({"columns": columns, "fill": fill, "offset": offset, "encoder": encoder})
+                offset += encoder.n_features
+            elif isinstance(encoder, FrequencyEncoder):
+                lookup_blocks.append({
+                    "columns": columns, "fill": fill, "offset": offset, "stringify": True,
+                    "tables": [freq.to_dict() for freq in encoder.frequencies_],
+                    "defaults": [0.0] * len(columns)
+                })
+                offset += len(columns)
+            elif isinstance(encoder, TargetEncoder):
+                if len(encoder.encodings_) != len(columns):
+                    raise NotImplementedError("Multiclass TargetEncoder is not supported")
+                lookup_blocks.append({
+                    "columns": columns, "fill": fill, "offset": offset, "stringify": False,
+                    "tables": [dict(zip(categories.tolist(), encodings.tolist()))
+                               for categories, encodings in zip(encoder.categories_, encoder.encodings_)],
+                    "defaults": [float(encoder.target_mean_)] * len(columns)
+                })
+                offset += len(columns)
+            else:
+                raise TypeError(f"Unsupported transformer {type(encoder).__name__} for columns {columns}")
+
+        return cls(numeric_blocks, categorical_blocks, offset, bool(getattr(preprocessor, "sparse_output_", False)),
+                   hash_blocks, lookup_blocks)
+
+    @staticmethod
+    def _field(fields, block, i, col):
+        value = fields.get(col)
+        if value is None and block["fill"] is not None:
+            value = block["fill"][i]
+        return value
+
+    def build(self, record: dict, out: np.ndarray = None) -> np.ndarray:
+        fields = derive_fields(record)
+        if out is None:
+            out = np.zeros(self.n_features, dtype=np.float64)
+        else:
+            out[:] = 0.0
+
+        for block in self.numeric_blocks:
+            values = np.array([fields.get(col, math.nan) for col in block["columns"]], dtype=np.float64)
+            missing = np.isnan(values)
+            if missing.any():
+                values[missing] = block["fill"][missing]
+            out[block["offset"]:block["offset"] + len(values)] = (values - block["mean"]) / block["scale"]
+
+        for block in self.categorical_blocks:
+            for i, col in enumerate(block["columns"]):
+                value = self._field(fields, block, i, col)
+                position = block["vocabularies"][i].get(value)
+                if position is None:
+                    if block["handle_unknown"] == "error":
+                        raise ValueError(f"Unknown category {value!r} in column '{col}'")
+                    continue
+                out[position] = 1.0
+
+        for block in self.hash_blocks:
+            encoder = block["encoder"]
+            for i, col in enumerate(block["columns"]):
+                value = self._field(fields, block, i, col)
+                out[block["offset"] + encoder.bucket(col, value)] += 1.0
+
+        for block in self.lookup_blocks:
+            for i, col in enumerate(block["columns"]):
+                value = self._field(fields, block, i, col)
+                key = str(value) if block["stringify"] else value
+                out[block["offset"] + i] = block["tables"][i].get(key, block["defaults"][i])
+        return out
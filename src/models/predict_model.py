@@ -1,16 +1,27 @@
 import os
 import sys
+import time
+import weakref
 import pandas as pd
 import joblib
-import shap
+from scipy import sparse
 
 # ✅ Add project root to sys.path for import compatibility
 sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "../..")))
+from src.metrics import SCORED_ROWS, STAGE_SECONDS
+from src.models.feature_vector import FeatureVectorBuilder
+
+# Batches up to this size are scored by the compiled forest instead of the DMatrix path
+COMPILED_BATCH_MAX_ROWS = 1024
 
 # 🔧 Load the trained pipeline
 def load_pipeline(path: str = "models/fitted_pipeline.pkl"):
     return joblib.load(path)
 
+# 🔧 Load a standalone classifier (scored on top of a fitted feature pipeline)
+def load_model(path: str = "models/final_cv_model.pkl"):
+    return joblib.load(path)
+
 # 🧠 Classify risk level based on probability
 def classify_risk_band(probability: float) -> str:
     if probability >= 0.6:
@@ -32,35 +43,139 @@ def engineer_features(df: pd.DataFrame) -> pd.DataFrame:
     df["IsNightTransaction"] = df["Hour"].apply(lambda h: 1 if h < 5 else 0)
     return df
 
-# 🔮 Predict risk and explain with SHAP
-def predict_risk(pipeline, input_df: pd.DataFrame):
-    df = engineer_features(input_df)
-    proba = pipeline.predict_proba(df)[:, 1]
-    label = int(proba[0] > 0.5)
-    risk_band = classify_risk_band(proba[0])
+# 🗃️ Per-pipeline cache of resolved feature names and the (lazily built) SHAP explainer
+_explanation_cache = weakref.WeakKeyDictionary()
+
+def _cache_entry(pipeline):
+    entry = _explanation_cache.get(pipeline)
+    if entry is None:
+        entry = {"feature_names": None, "explainer": None, "feature_builder": None}
+        _explanation_cache[pipeline] = entry
+    return entry
+
+def get_feature_names(pipeline):
+    entry = _cache_entry(pipeline)
+    if entry["feature_names"] is None:
+        names = []
+        for _, transformer, columns in pipeline.named_steps["preprocessor"].transformers_:
+            if transformer == "drop" or len(columns) == 0:
+                continue
+            names.extend(columns if transformer == "passthrough" else transformer.get_feature_names_out(columns))
+        entry["feature_names"] = list(names)
+    return entry["feature_names"]
+
+def get_explainer(pipeline):
+    entry = _cache_entry(pipeline)
+    if entry["explainer"] is None:
+        import shap  # heavy import, only paid by callers that want explanations
+        model = pipeline.named_steps["classifier"]
+        entry["explainer"] = shap.Explainer(model, feature_names=get_feature_names(pipeline))
+    return entry["explainer"]
+
+def get_feature_builder(pipeline):
+    entry = _cache_entry(pipeline)
+    if entry["feature_builder"] is None:
+        entry["feature_builder"] = FeatureVectorBuilder.from_pipeline(pipeline)
+    return entry["feature_builder"]
+
+# 🌲 Per-classifier cache of the flattened, numba-evaluated forest (None when unsupported)
+_forest_cache = weakref.WeakKeyDictionary()
 
-    model = pipeline.named_steps["classifier"]
-    preprocessor = pipeline.named_steps["preprocessor"]
-    X_transformed = preprocessor.transform(df)
+def get_compiled_forest(model):
+    if model not in _forest_cache:
+        from src.models.tree_compiler import export_booster  # numba import, paid on first scoring call
+        try:
+            _forest_cache[model] = export_booster(model) if hasattr(model, "get_booster") else None
+        except NotImplementedError:
+            _forest_cache[model] = None
+    return _forest_cache[model]
 
-    # ✅ Recover feature names
-    num_features = preprocessor.transformers_[0][2]
-    cat_encoder = preprocessor.transformers_[1][1]
-    cat_features = cat_encoder.get_feature_names_out(preprocessor.transformers_[1][2])
-    feature_names = list(num_features) + list(cat_features)
+# Use a forest loaded elsewhere (e.g. memory-mapped from serving artifacts) for this classifier
+def set_compiled_forest(model, forest):
+    _forest_cache[model] = forest
 
-    explainer = shap.Explainer(model, feature_names=feature_names)
-    shap_values = explainer(X_transformed)
+def _predict_positive(model, X):
+    forest = get_compiled_forest(model)
+    if forest is not None and X.shape[0] <= COMPILED_BATCH_MAX_ROWS:
+        return forest.predict_proba(X)[:, 1]
+    return model.predict_proba(X)[:, 1]
 
-    shap_array = shap_values[0].values
+def explain_prediction(pipeline, X_transformed, top_n: int = 3):
+    shap_values = get_explainer(pipeline)(X_transformed)
     shap_df = pd.DataFrame({
-        "feature": feature_names,
-        "shap_value": shap_array
+        "feature": get_feature_names(pipeline),
+        "shap_value": shap_values[0].values
     }).sort_values(by="shap_value", key=abs, ascending=False)
+    return shap_df.head(top_n).to_dict(orient="records")
 
-    top_features = shap_df.head(3).to_dict(orient="records")
+# ⏱️ Feed consecutive perf_counter marks into the per-stage histograms
+def _observe_stages(function, start, **marks):
+    for stage, mark in marks.items():
+        STAGE_SECONDS.labels(function, stage).observe(mark - start)
+        start = mark
+
+# 🔮 Predict risk, optionally explaining it with a cached SHAP explainer
+def predict_risk(pipeline, input_df: pd.DataFrame, explain: bool = True):
+    start = time.perf_counter()
+    df = engineer_features(input_df)
+    engineered = time.perf_counter()
+
+    # ✅ Transform once; the same matrix feeds the classifier and SHAP
+    X_transformed = pipeline[:-1].transform(df)
+    transformed = time.perf_counter()
+    proba = _predict_positive(pipeline[-1], X_transformed)
+    predicted = time.perf_counter()
+    label = int(proba[0] > 0.5)
+    risk_band = classify_risk_band(proba[0])
+
+    top_features = explain_prediction(pipeline, X_transformed) if explain else None
+    _observe_stages("predict_risk", start, engineer=engineered, transform=transformed, predict=predicted,
+                    **({"explain": time.perf_counter()} if explain else {}))
+    SCORED_ROWS.labels("predict_risk").observe(len(input_df))
     return label, proba[0], risk_band, top_features
 
+# ⚡ Single-record fast path: no DataFrame, no ColumnTransformer dispatch
+def predict_risk_record(pipeline, record: dict, explain: bool = False):
+    start = time.perf_counter()
+    builder = get_feature_builder(pipeline)
+    features = builder.build(record)[None, :]
+    # Sparse pipelines hand XGBoost CSR input, where absent entries mean "missing"
+    X_transformed = sparse.csr_matrix(features) if builder.sparse_output else features
+    transformed = time.perf_counter()
+    proba = _predict_positive(pipeline[-1], X_transformed)[0]
+    predicted = time.perf_counter()
+
+    top_features = explain_prediction(pipeline, X_transformed) if explain else None
+    _observe_stages("predict_risk_record", start, transform=transformed, predict=predicted,
+                    **({"explain": time.perf_counter()} if explain else {}))
+    return int(proba > 0.5), proba, classify_risk_band(proba), top_features
+
+# 📦 Score a frame of transactions with a feature pipeline + classifier; timings (if given)
+# receives the seconds spent in "transform" and "predict"
+def predict_batch(df: pd.DataFrame, model, pipeline, timings: dict = None) -> pd.DataFrame:
+    start = time.perf_counter()
+    X = pipeline.transform(df.drop(columns=["is_high_risk", "TransactionId"], errors="ignore"))
+    transformed = time.perf_counter()
+    proba = _predict_positive(model, X)
+    predicted = time.perf_counter()
+    _observe_stages("predict_batch", start, transform=transformed, predict=predicted)
+    SCORED_ROWS.labels("predict_batch").observe(len(df))
+    if timings is not None:
+        timings["transform"] = transformed - start
+        timings["predict"] = predicted - transformed
+    results = pd.DataFrame({
+        "predicted_label": (proba > 0.5).astype(int),
+        "risk_probability": proba
+    }, index=df.index)
+    if "CustomerId" in df.columns:
+        results.insert(0, "CustomerId", df["CustomerId"].astype(str))
+    return results
+
+# 🌊 Score an iterable of frames (e.g. pd.read_csv(..., chunksize=N)) one chunk at a time
+def predict_batch_chunks(chunks, model, pipeline):
+    for chunk in chunks:
+        yield predict_batch(chunk, model, pipeline)
+
 # ▶️ CLI test entry point
 if __name__ == "__main__":
     print("🔍 Loading pipeline and running test prediction...")
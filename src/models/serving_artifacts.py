@@ -0,0 +1,66 @@
+import argparse
+import json
+import os
+import sys
+
+import joblib
+from sklearn.compose import ColumnTransformer
+from sklearn.preprocessing import OneHotEncoder
+
+# ✅ Add project root to sys.path for import compatibility
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "../..")))
+from src.models.tree_compiler import export_booster
+
+def _estimators(estimator):
+    yield estimator
+    if isinstance(estimator, ColumnTransformer):
+        for _, transformer, _ in getattr(estimator, "transformers_", estimator.transformers):
+            if not isinstance(transformer, str):
+                yield from _estimators(transformer)
+    for _, step in getattr(estimator, "steps", []):
+        if step is not None and not isinstance(step, str):
+            yield from _estimators(step)
+
+# 🔤 Object arrays of str are pickled as Python objects, which every process unpickles into its own
+# heap; fixed-width unicode arrays are plain buffers that joblib can memory-map instead
+def compact_categories(pipeline):
+    for estimator in _estimators(pipeline):
+        if isinstance(estimator, OneHotEncoder) and hasattr(estimator, "categories_"):
+            estimator.categories_ = [
+                categories.astype(str) if categories.dtype == object
+                and all(isinstance(value, str) for value in categories) else categories
+                for categories in estimator.categories_
+            ]
+    return pipeline
+
+# 📦 Write a serving bundle: uncompressed joblib pickles (numeric arrays memory-mappable with
+# mmap_mode="r"), the flattened forest as .npy files, and a manifest the API registry can serve
+def export_serving_artifacts(model_path, pipeline_path, out_dir, version=None):
+    model = joblib.load(model_path)
+    pipeline = compact_categories(joblib.load(pipeline_path))
+    os.makedirs(out_dir, exist_ok=True)
+
+    joblib.dump(model, os.path.join(out_dir, "final_cv_model.pkl"))
+    joblib.dump(pipeline, os.path.join(out_dir, "fitted_pipeline.pkl"))
+    manifest = {"model_path": "final_cv_model.pkl", "pipeline_path": "fitted_pipeline.pkl"}
+    try:
+        export_booster(model).save(os.path.join(out_dir, "forest"))
+        manifest["forest_path"] = "forest"
+    except NotImplementedError as e:
+        print(f"⚠️ Forest not exported, workers will flatten the booster themselves: {e}")
+    if version is not None:
+        manifest["version"] = version
+
+    with open(os.path.join(out_dir, "manifest.json"), "w") as f:
+        json.dump(manifest, f, indent=2)
+    print(f"✅ Serving artifacts written to {out_dir}")
+    return manifest
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Export memory-mappable serving artifacts")
+    parser.add_argument("--model", default="models/final_cv_model.pkl", help="Persisted classifier")
+    parser.add_argument("--pipeline", default="models/fitted_pipeline.pkl", help="Fitted feature pipeline")
+    parser.add_argument("--out", default="models/serving", help="Output directory (with manifest.json)")
+    parser.add_argument("--version", default=None, help="Version recorded in the manifest")
+    args = parser.parse_args()
+    export_serving_artifacts(args.model, args.pipeline, args.out, args.version)
@@ -1,4 +1,9 @@
+import argparse
+import json
 import os
+import sys
+import time
+import tracemalloc
 import joblib
 import pandas as pd
 import matplotlib.pyplot as plt
@@ -9,45 +14,257 @@ import numpy as np
 from sklearn.model_selection import train_test_split
 from sklearn.pipeline import Pipeline
 from sklearn.compose import ColumnTransformer
-from sklearn.preprocessing import StandardScaler, OneHotEncoder
+from sklearn.preprocessing import StandardScaler, OneHotEncoder, TargetEncoder
 from sklearn.metrics import (
     f1_score, roc_auc_score, accuracy_score,
     confusion_matrix, roc_curve
 )
 from xgboost import XGBClassifier
-from imblearn.over_sampling import SMOTE
+
+# ✅ Add project root to sys.path for import compatibility
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "../..")))
+from src.data_processing import PROCESSED_DATA_PATH, load_processed_data
+from src.features.transformers import FrequencyEncoder, HashingEncoder
+from src.models.cross_validation import run_parallel_cv
+
+TRAINING_COLUMNS = [
+    "FraudResult", "TransactionStartTime", "Amount", "Value",
+    "ProductCategory", "ChannelId", "ProviderId", "CustomerId"
+]
+
+NUMERIC_FEATURES = ["Amount", "Value", "Hour", "DayOfWeek", "AmountToValueRatio", "IsNightTransaction"]
+CATEGORICAL_FEATURES = ["ProductCategory", "ChannelId", "ProviderId", "CustomerId"]
+
+# High-cardinality ID columns get their own encoder; the rest stay one-hot
+ID_COLUMNS = ["CustomerId"]
+ID_ENCODINGS = ("onehot", "hash", "frequency", "target")
+DEFAULT_HASH_FEATURES = 2 ** 12
+
+def build_id_encoder(id_encoding: str, hash_features: int = DEFAULT_HASH_FEATURES):
+    if id_encoding == "onehot":
+        return OneHotEncoder(handle_unknown="ignore")
+    if id_encoding == "hash":
+        return HashingEncoder(n_features=hash_features)
+    if id_encoding == "frequency":
+        return FrequencyEncoder()
+    if id_encoding == "target":
+        # fit_transform cross-fits, so training rows only ever see out-of-fold encodings
+        return TargetEncoder(target_type="binary", random_state=42)
+    raise ValueError(f"Unknown id_encoding '{id_encoding}', expected one of {ID_ENCODINGS}")
+
+# Imbalance handling applied to the training rows only (never to validation/serving). The default
+# is "none": weighting and resampling shift predicted probabilities upwards, and the served risk
+# bands (classify_risk_band's 0.6 / 0.2 cut-offs) were set on an unweighted model.
+IMBALANCE_STRATEGIES = ("none", "weight", "undersample", "smote")
+DEFAULT_SAMPLING_RATIO = 0.1
+
+# Settings shared by every profile; profiles and explicit overrides (e.g. from tuning) win
+BASE_MODEL_PARAMS = {
+    "max_depth": 6,
+    "subsample": 0.9,
+    "colsample_bytree": 0.9,
+    "reg_alpha": 0,
+    "reg_lambda": 0,
+    "use_label_encoder": False,
+    "eval_metric": "logloss",
+    "random_state": 42,
+}
+
+# 🏎️ XGBoost training profiles: "full" is the original 1000-tree fit, "fast" uses histogram
+# splits and stops once the held-out logloss stops improving
+TRAINING_PROFILES = {
+    "full": {
+        "n_estimators": 1000,
+        "learning_rate": 0.01,
+    },
+    "fast": {
+        "n_estimators": 2000,
+        "learning_rate": 0.05,
+        "tree_method": "hist",
+        "max_bin": 256,
+        "early_stopping_rounds": 50,
+        "n_jobs": -1,
+    },
+}
+DEFAULT_EVAL_FRACTION = 0.1
+
+# 🎛️ Best parameters written by run_hyperparam_search.py, applied as XGBoost overrides. The file
+# also records the training settings the search scored trials with; train_and_evaluate trains
+# with those, so the tuned values land on the model they were picked for.
+TUNED_SETTINGS = ("profile", "imbalance", "sampling_ratio", "id_encoding")
+
+def load_tuned_params(path: str) -> dict:
+    with open(path) as f:
+        return json.load(f)
+
+# ⚖️ negatives / positives, the usual XGBoost scale_pos_weight for skewed labels
+def compute_scale_pos_weight(y) -> float:
+    y = np.asarray(y)
+    positives = int((y == 1).sum())
+    if positives == 0:
+        raise ValueError("❌ scale_pos_weight needs at least one positive sample")
+    return float((y == 0).sum()) / positives
+
+# Samplers run after the sparse preprocessor, so they resample CSR rows, not a dense frame
+def build_sampler(imbalance: str, sampling_ratio: float = DEFAULT_SAMPLING_RATIO):
+    if imbalance in ("none", "weight"):
+        return None
+    if imbalance == "undersample":
+        from imblearn.under_sampling import RandomUnderSampler
+        return RandomUnderSampler(sampling_strategy=sampling_ratio, random_state=42)
+    if imbalance == "smote":
+        from imblearn.over_sampling import SMOTE
+        return SMOTE(sampling_strategy=sampling_ratio, random_state=42)
+    raise ValueError(f"Unknown imbalance strategy '{imbalance}', expected one of {IMBALANCE_STRATEGIES}")
+
+# 📏 Rows the classifier actually saw after the (optional) sampler ran
+def resampled_rows(pipeline, y) -> int:
+    sampler = pipeline.named_steps.get("sampler")
+    counts = pd.Series(np.asarray(y)).value_counts().to_dict()
+    if sampler is not None:
+        from imblearn.under_sampling.base import BaseUnderSampler
+        for cls, n in sampler.sampling_strategy_.items():
+            # under-samplers report the target count, over-samplers the number of rows added
+            counts[cls] = n if isinstance(sampler, BaseUnderSampler) else counts[cls] + n
+    return int(sum(counts.values()))
+
+# ✂️ Keep only the trees up to best_iteration so persisted models stop scoring dead trees
+def truncate_to_best_iteration(model):
+    best_iteration = getattr(model, "best_iteration", None)
+    if best_iteration is None:
+        return model
+    booster = model.get_booster()[:best_iteration + 1]
+    model.load_model(bytearray(booster.save_raw("ubj")))
+    return model
+
+# 🏋️ Fit the pipeline; with early stopping, a stratified slice of the training rows becomes the
+# eval set (transformed by the fitted preprocessor, never resampled). Returns the labels fitted on.
+def fit_pipeline(pipeline, X, y, eval_fraction=DEFAULT_EVAL_FRACTION):
+    classifier = pipeline.named_steps["classifier"]
+    if classifier.get_params().get("early_stopping_rounds") is None:
+        pipeline.fit(X, y)
+        return y
+
+    X_fit, X_es, y_fit, y_es = train_test_split(
+        X, y, test_size=eval_fraction, stratify=y, random_state=42
+    )
+    preprocessor = pipeline.named_steps["preprocessor"]
+    X_fit_t = preprocessor.fit_transform(X_fit, y_fit)
+    y_fit_t = y_fit
+    sampler = pipeline.named_steps.get("sampler")
+    if sampler is not None:
+        X_fit_t, y_fit_t = sampler.fit_resample(X_fit_t, y_fit)
+    classifier.fit(X_fit_t, y_fit_t, eval_set=[(preprocessor.transform(X_es), y_es)], verbose=False)
+    truncate_to_best_iteration(classifier)
+    return y_fit
+
+# 🏋️ Fit a bare classifier on an already transformed matrix; with early stopping, a stratified
+# slice of the rows becomes the eval set
+def fit_classifier(model, X, y, eval_fraction=DEFAULT_EVAL_FRACTION):
+    if model.get_params().get("early_stopping_rounds") is None:
+        return model.fit(X, y)
+    y = np.asarray(y)
+    fit_idx, es_idx = train_test_split(
+        np.arange(len(y)), test_size=eval_fraction, stratify=y, random_state=42
+    )
+    model.fit(X[fit_idx], y[fit_idx], eval_set=[(X[es_idx], y[es_idx])], verbose=False)
+    return truncate_to_best_iteration(model)
+
+# ⏱️ Fit and record wall time plus peak traced (Python/NumPy) memory of the fit.
+# When a caller is already tracing (e.g. the benchmarks), its tracer is left running and the
+# fit's peak is taken relative to the memory traced when the fit started.
+# tracemalloc does not see XGBoost's native (C++) allocations, which are most of the training
+# memory, so fit_peak_mb covers the preprocessing/resampling side only; the record says so.
+def fit_with_cost(pipeline, X, y, eval_fraction=DEFAULT_EVAL_FRACTION):
+    owns_tracer = not tracemalloc.is_tracing()
+    if owns_tracer:
+        tracemalloc.start()
+    baseline, _ = tracemalloc.get_traced_memory()
+    start = time.perf_counter()
+    try:
+        y_fitted = fit_pipeline(pipeline, X, y, eval_fraction)
+        _, peak = tracemalloc.get_traced_memory()
+    finally:
+        if owns_tracer:
+            tracemalloc.stop()
+    return {
+        "fit_seconds": time.perf_counter() - start,
+        "fit_peak_mb": max(0, peak - baseline) / 1024 ** 2,
+        "fit_peak_mb_scope": "Python/NumPy allocations only; excludes XGBoost native memory",
+        "train_rows": resampled_rows(pipeline, y_fitted),
+        "n_trees": pipeline.named_steps["classifier"].get_booster().num_boosted_rounds()
+    }
+
+# Drop training-only steps so the saved artifact stays preprocessor -> classifier
+def to_serving_pipeline(pipeline):
+    return Pipeline([(name, step) for name, step in pipeline.steps if name != "sampler"])
+
+# 🤖 XGBoost classifier for a training profile; explicit overrides (max_bin, n_jobs,
+# early_stopping_rounds, ...) win over the profile
+def get_model(profile="full", **xgb_overrides):
+    if profile not in TRAINING_PROFILES:
+        raise ValueError(f"Unknown training profile '{profile}', expected one of {tuple(TRAINING_PROFILES)}")
+    profile_params = {**TRAINING_PROFILES[profile],
+                      **{k: v for k, v in xgb_overrides.items() if v is not None}}
+
+    return XGBClassifier(**{**BASE_MODEL_PARAMS, **profile_params})
+
+# 🔁 Cross-validate a classifier on an already transformed matrix, folds in parallel
+def evaluate_model(X, y, model, n_splits=5, n_workers=None):
+    result = run_parallel_cv(X, y, model, n_splits=n_splits, n_workers=n_workers)
+    folds = result["folds"]
+
+    print(f"\n📊 {n_splits}-fold CV on {result['n_workers']} workers "
+          f"({result['threads_per_worker']} threads each) took {result['wall_seconds']:.1f}s")
+    print(folds.to_string(float_format=lambda v: f"{v:.4f}"))
+    slowest_fold = folds.loc[list(range(n_splits)), "fit_seconds"].max()
+    print(f"⏱️ Slowest fold fit: {slowest_fold:.1f}s")
+    return result
 
 # 🔧 Build preprocessing + model pipeline
-def build_pipeline(numeric_features, categorical_features):
+def build_pipeline(numeric_features, categorical_features, id_encoding="onehot",
+                   hash_features=DEFAULT_HASH_FEATURES, imbalance="none", scale_pos_weight=None,
+                   sampling_ratio=DEFAULT_SAMPLING_RATIO, profile="full", **xgb_overrides):
     numeric_transformer = StandardScaler()
     categorical_transformer = OneHotEncoder(handle_unknown="ignore")
 
-    preprocessor = ColumnTransformer([
+    id_features = [col for col in categorical_features if col in ID_COLUMNS]
+    low_card_features = [col for col in categorical_features if col not in ID_COLUMNS]
+
+    transformers = [
         ("num", numeric_transformer, numeric_features),
-        ("cat", categorical_transformer, categorical_features)
-    ])
+        ("cat", categorical_transformer, low_card_features)
+    ]
+    if id_features:
+        transformers.append(("id", build_id_encoder(id_encoding, hash_features), id_features))
 
-    model = XGBClassifier(
-        n_estimators=1000,
-        max_depth=6,
-        learning_rate=0.01,
-        subsample=0.9,
-        colsample_bytree=0.9,
-        reg_alpha=0,
-        reg_lambda=0,
-        use_label_encoder=False,
-        eval_metric="logloss",
-        random_state=42
-    )
+    # ✅ sparse_threshold=1.0 keeps the output CSR end to end into XGBoost
+    preprocessor = ColumnTransformer(transformers, sparse_threshold=1.0)
+
+    model = get_model(profile, **xgb_overrides)
+    if imbalance == "weight":
+        if scale_pos_weight is None:
+            raise ValueError("❌ imbalance='weight' needs scale_pos_weight (see compute_scale_pos_weight)")
+        model.set_params(scale_pos_weight=scale_pos_weight)
 
-    return Pipeline([
+    sampler = build_sampler(imbalance, sampling_ratio)
+    if sampler is None:
+        return Pipeline([
+            ("preprocessor", preprocessor),
+            ("classifier", model)
+        ])
+
+    # imblearn's Pipeline only resamples during fit; transform/predict skip the sampler
+    from imblearn.pipeline import Pipeline as ImbPipeline
+    return ImbPipeline([
         ("preprocessor", preprocessor),
+        ("sampler", sampler),
         ("classifier", model)
     ])
 
-# 🧪 Train and evaluate
-def train_and_evaluate(data_path="data/processed/cleaned_transactions.csv"):
-    df = pd.read_csv(data_path)
+# 📥 Load processed transactions, label them and derive the model's raw feature frame
+def load_training_data(data_path=PROCESSED_DATA_PATH):
+    df = load_processed_data(TRAINING_COLUMNS, data_path)
 
     # ✅ Define binary target robustly
     if df["FraudResult"].dtype == object:
@@ -57,7 +274,7 @@ def train_and_evaluate(data_path="data/processed/cleaned_transactions.csv"):
 
     # 🔍 Confirm class distribution
     class_counts = df["is_high_risk"].value_counts()
-    print("📊 Class distribution before SMOTE:", class_counts.to_dict())
+    print("📊 Class distribution:", class_counts.to_dict())
 
     if class_counts.nunique() < 2:
         raise ValueError("❌ Not enough positive samples to train. Check your labels.")
@@ -70,9 +287,7 @@ def train_and_evaluate(data_path="data/processed/cleaned_transactions.csv"):
     df["IsNightTransaction"] = df["Hour"].apply(lambda h: 1 if h < 5 else 0)
     df = df.drop(columns=["TransactionStartTime"])
 
-    numeric_features = ["Amount", "Value", "Hour", "DayOfWeek", "AmountToValueRatio", "IsNightTransaction"]
-    categorical_features = ["ProductCategory", "ChannelId", "ProviderId", "CustomerId"]
-    features = numeric_features + categorical_features
+    features = NUMERIC_FEATURES + CATEGORICAL_FEATURES
     target = "is_high_risk"
 
     # Reset index to avoid alignment issues
@@ -80,23 +295,48 @@ def train_and_evaluate(data_path="data/processed/cleaned_transactions.csv"):
     X = df[features]
     y = df[target]
 
-    # One-hot encode for SMOTE
-    X_encoded = pd.get_dummies(X, columns=categorical_features)
+    return X, y
 
-    # Apply SMOTE
-    smote = SMOTE(random_state=42)
-    X_resampled, y_resampled = smote.fit_resample(X_encoded, y)
+# 🧪 Train and evaluate
+def train_and_evaluate(data_path=PROCESSED_DATA_PATH, id_encoding="onehot",
+                       hash_features=DEFAULT_HASH_FEATURES, imbalance="none",
+                       sampling_ratio=DEFAULT_SAMPLING_RATIO, profile="full", max_bin=None, n_jobs=None,
+                       early_stopping_rounds=None, eval_fraction=DEFAULT_EVAL_FRACTION, tuned_params=None):
+    tuned_params = dict(tuned_params or {})
+    settings = {key: tuned_params.pop(key) for key in TUNED_SETTINGS if key in tuned_params}
+    if settings:
+        print(f"🎛️ Training with the settings the parameters were tuned for: {settings}")
+        profile = settings.get("profile", profile)
+        imbalance = settings.get("imbalance", imbalance)
+        sampling_ratio = settings.get("sampling_ratio", sampling_ratio)
+        id_encoding = settings.get("id_encoding", id_encoding)
 
-    print("✅ Class distribution after SMOTE:", pd.Series(y_resampled).value_counts().to_dict())
+    X, y = load_training_data(data_path)
+    numeric_features, categorical_features = NUMERIC_FEATURES, CATEGORICAL_FEATURES
 
-    # Train-test split on resampled data
+    # Train-test split on the raw features; encoding happens inside the (sparse) pipeline
     X_train, X_val, y_train, y_val = train_test_split(
         X, y, test_size=0.2, stratify=y, random_state=42
     )
 
     # Train pipeline on original features
-    pipeline = build_pipeline(numeric_features, categorical_features)
-    pipeline.fit(X_train, y_train)
+    print(f"🧩 Encoding {ID_COLUMNS} with '{id_encoding}', imbalance handling '{imbalance}'")
+    scale_pos_weight = compute_scale_pos_weight(y_train) if imbalance == "weight" else None
+    # Tuned parameters win over the profile; explicit max_bin/n_jobs/early stopping win over both
+    explicit = {"max_bin": max_bin, "n_jobs": n_jobs, "early_stopping_rounds": early_stopping_rounds}
+    xgb_params = {**tuned_params, **{k: v for k, v in explicit.items() if v is not None}}
+    if tuned_params:
+        print(f"🎛️ Tuned parameters: {tuned_params}")
+    pipeline = build_pipeline(
+        numeric_features, categorical_features, id_encoding, hash_features,
+        imbalance=imbalance, scale_pos_weight=scale_pos_weight, sampling_ratio=sampling_ratio,
+        profile=profile, **xgb_params
+    )
+    fit_cost = fit_with_cost(pipeline, X_train, y_train, eval_fraction)
+    print(f"⏱️ Fit took {fit_cost['fit_seconds']:.1f}s, peak traced memory {fit_cost['fit_peak_mb']:.1f} MB "
+          f"(excludes XGBoost native allocations), "
+          f"{fit_cost['train_rows']} training rows after '{imbalance}', {fit_cost['n_trees']} trees kept")
+    pipeline = to_serving_pipeline(pipeline)
 
     # Evaluate
     y_pred = pipeline.predict(X_val)
@@ -108,12 +348,13 @@ def train_and_evaluate(data_path="data/processed/cleaned_transactions.csv"):
     metrics = {
         "roc_auc": roc_auc_score(y_val, y_proba),
         "f1": f1_score(y_val, y_pred),
-        "accuracy": accuracy_score(y_val, y_pred)
+        "accuracy": accuracy_score(y_val, y_pred),
+        **fit_cost
     }
 
     print("\n📊 Validation Metrics:")
     for k, v in metrics.items():
-        print(f"{k.upper()}: {v:.4f}")
+        print(f"{k.upper()}: {v:.4f}" if isinstance(v, (int, float)) else f"{k.upper()}: {v}")
 
     os.makedirs("models", exist_ok=True)
 
@@ -163,4 +404,31 @@ def train_and_evaluate(data_path="data/processed/cleaned_transactions.csv"):
 
 # 🏁 Run training
 if __name__ == "__main__":
-    train_and_evaluate()
+    parser = argparse.ArgumentParser(description="Train the credit-risk pipeline")
+    parser.add_argument("--id-encoding", choices=ID_ENCODINGS, default="onehot",
+                        help="How to encode high-cardinality ID columns such as CustomerId")
+    parser.add_argument("--hash-features", type=int, default=DEFAULT_HASH_FEATURES,
+                        help="Number of hashed columns when --id-encoding=hash")
+    parser.add_argument("--imbalance", choices=IMBALANCE_STRATEGIES, default="none",
+                        help="Class-imbalance handling applied to the training split only; anything but "
+                             "'none' inflates probabilities relative to the 0.6/0.2 risk bands")
+    parser.add_argument("--sampling-ratio", type=float, default=DEFAULT_SAMPLING_RATIO,
+                        help="Minority/majority ratio after resampling for undersample/smote")
+    parser.add_argument("--profile", choices=tuple(TRAINING_PROFILES), default="full",
+                        help="XGBoost training profile ('fast' = hist + early stopping)")
+    parser.add_argument("--max-bin", type=int, default=None, help="Histogram bins per feature (hist method)")
+    parser.add_argument("--n-jobs", type=int, default=None, help="XGBoost threads (-1 = all cores)")
+    parser.add_argument("--early-stopping-rounds", type=int, default=None,
+                        help="Stop after this many rounds without held-out improvement")
+    parser.add_argument("--eval-fraction", type=float, default=DEFAULT_EVAL_FRACTION,
+                        help="Share of the training split held out for early stopping")
+    parser.add_argument("--params", default=None,
+                        help="JSON of XGBoost parameters to apply, e.g. models/best_params.json "
+                             "from run_hyperparam_search.py; the profile, imbalance and ID encoding it "
+                             "was tuned with replace the flags")
+    args = parser.parse_args()
+    train_and_evaluate(id_encoding=args.id_encoding, hash_features=args.hash_features,
+                       imbalance=args.imbalance, sampling_ratio=args.sampling_ratio,
+                       profile=args.profile, max_bin=args.max_bin, n_jobs=args.n_jobs,
+                       early_stopping_rounds=args.early_stopping_rounds, eval_fraction=args.eval_fraction,
+                       tuned_params=load_tuned_params(args.params) if args.params else None)
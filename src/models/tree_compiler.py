@@ -0,0 +1,171 @@
+import json
+import math
+import os
+
+import numpy as np
+from numba import njit, prange
+from scipy import sparse
+
+SUPPORTED_OBJECTIVES = ("binary:logistic",)
+PARALLEL_MIN_ROWS = 256
+
+BLOCK_ROWS = 64
+
+# 🌲 Tree-outer / row-inner over a block of rows keeps each tree's nodes hot in cache;
+# NaN follows the default direction learned by XGBoost
+@njit(cache=True, nogil=True)
+def _block_margin(buf, n_rows, out, roots, feature, threshold, left, right, default_left, value):
+    for t in range(roots.shape[0]):
+        root = roots[t]
+        for i in range(n_rows):
+            node = root
+            while left[node] != -1:
+                v = buf[i, feature[node]]
+                if np.isnan(v):
+                    node = left[node] if default_left[node] else right[node]
+                elif v < threshold[node]:
+                    node = left[node]
+                else:
+                    node = right[node]
+            out[i] += value[node]
+
+def _dense_margin(X, roots, feature, threshold, left, right, default_left, value, base_margin):
+    n_rows = X.shape[0]
+    out = np.full(n_rows, base_margin, dtype=np.float64)
+    n_blocks = (n_rows + BLOCK_ROWS - 1) // BLOCK_ROWS
+    for b in prange(n_blocks):
+        start = b * BLOCK_ROWS
+        stop = min(n_rows, start + BLOCK_ROWS)
+        _block_margin(X[start:stop], stop - start, out[start:stop],
+                      roots, feature, threshold, left, right, default_left, value)
+    return out
+
+# CSR rows are scattered into a NaN-filled block buffer: absent entries are "missing", as in XGBoost
+def _csr_margin(indptr, indices, data, n_features, roots, feature, threshold, left, right,
+                default_left, value, base_margin):
+    n_rows = indptr.shape[0] - 1
+    out = np.full(n_rows, base_margin, dtype=np.float64)
+    n_blocks = (n_rows + BLOCK_ROWS - 1) // BLOCK_ROWS
+    for b in prange(n_blocks):
+        start = b * BLOCK_ROWS
+        stop = min(n_rows, start + BLOCK_ROWS)
+        buf = np.full((stop - start, n_features), np.nan, dtype=np.float32)
+        for i in range(start, stop):
+            for k in range(indptr[i], indptr[i + 1]):
+                buf[i - start, indices[k]] = data[k]
+        _block_margin(buf, stop - start, out[start:stop],
+                      roots, feature, threshold, left, right, default_left, value)
+    return out
+
+# Serial variants avoid thread-pool start-up cost for single rows and small batches.
+# Numba's on-disk cache keys entries by function bytecode, not by compile flags, so only the
+# serial variants are cached; a cached parallel build would be picked up by the serial one too.
+_dense_margin_serial = njit(cache=True, nogil=True)(_dense_margin)
+_dense_margin_parallel = njit(nogil=True, parallel=True)(_dense_margin)
+_csr_margin_serial = njit(cache=True, nogil=True)(_csr_margin)
+_csr_margin_parallel = njit(nogil=True, parallel=True)(_csr_margin)
+
+NODE_ARRAYS = ("roots", "feature", "threshold", "left", "right", "default_left", "value")
+
+# 🧱 All trees of a binary:logistic booster flattened into contiguous node arrays
+class FlatForest:
+    def __init__(self, roots, feature, threshold, left, right, default_left, value, base_margin, n_features):
+        self.roots = roots
+        self.feature = feature
+        self.threshold = threshold
+        self.left = left
+        self.right = right
+        self.default_left = default_left
+        self.value = value
+        self.base_margin = float(base_margin)
+        self.n_features = int(n_features)
+
+    @property
+    def n_trees(self) -> int:
+        return len(self.roots)
+
+    def _arrays(self):
+        return (self.roots, self.feature, self.threshold, self.left, self.right, self.default_left, self.value)
+
+    def predict_margin(self, X) -> np.ndarray:
+        if sparse.issparse(X):
+            X = sparse.csr_matrix(X)
+            if X.shape[1] != self.n_features:
+                raise ValueError(f"Expected {self.n_features} features, got {X.shape[1]}")
+            kernel = _csr_margin_parallel if X.shape[0] >= PARALLEL_MIN_ROWS else _csr_margin_serial
+            return kernel(X.indptr.astype(np.int64), X.indices.astype(np.int64), X.data.astype(np.float32),
+                          self.n_features, *self._arrays(), self.base_margin)
+
+        X = np.ascontiguousarray(np.atleast_2d(X), dtype=np.float32)
+        if X.shape[1] != self.n_features:
+            raise ValueError(f"Expected {self.n_features} features, got {X.shape[1]}")
+        kernel = _dense_margin_parallel if X.shape[0] >= PARALLEL_MIN_ROWS else _dense_margin_serial
+        return kernel(X, *self._arrays(), self.base_margin)
+
+    # Same (n, 2) layout as XGBClassifier.predict_proba
+    def predict_proba(self, X) -> np.ndarray:
+        positive = 1.0 / (1.0 + np.exp(-self.predict_margin(X)))
+        return np.column_stack([1.0 - positive, positive])
+
+    # 💾 One .npy per node array plus forest.json; load() memory-maps them read-only, so every
+    # process serving the same files shares one copy of the nodes through the page cache
+    def save(self, directory):
+        os.makedirs(directory, exist_ok=True)
+        for name, array in zip(NODE_ARRAYS, self._arrays()):
+            np.save(os.path.join(directory, f"{name}.npy"), array)
+        with open(os.path.join(directory, "forest.json"), "w") as f:
+            json.dump({"base_margin": self.base_margin, "n_features": self.n_features}, f)
+
+    @classmethod
+    def load(cls, directory, mmap_mode="r"):
+        with open(os.path.join(directory, "forest.json")) as f:
+            meta = json.load(f)
+        arrays = {name: np.load(os.path.join(directory, f"{name}.npy"), mmap_mode=mmap_mode) for name in NODE_ARRAYS}
+        return cls(**arrays, **meta)
+
+def _parse_base_score(raw: str) -> float:
+    return float(raw.strip("[]"))
+
+# 📤 Flatten a fitted XGBClassifier (or Booster); honours best_iteration when early stopping was used
+def export_booster(model) -> FlatForest:
+    booster = model.get_booster() if hasattr(model, "get_booster") else model
+    learner = json.loads(booster.save_raw("json"))["learner"]
+    objective = learner["objective"]["name"]
+    if objective not in SUPPORTED_OBJECTIVES:
+        raise NotImplementedError(f"Objective '{objective}' is not supported, expected one of {SUPPORTED_OBJECTIVES}")
+
+    trees = learner["gradient_booster"]["model"]["trees"]
+    best_iteration = getattr(model, "best_iteration", None) if hasattr(model, "get_booster") else None
+    if best_iteration is not None:
+        trees = trees[:best_iteration + 1]
+
+    roots, feature, threshold, left, right, default_left, value = [], [], [], [], [], [], []
+    offset = 0
+    for tree in trees:
+        if any(tree.get("split_type", [])):
+            raise NotImplementedError("Categorical splits are not supported")
+        lc = np.asarray(tree["left_children"], dtype=np.int32)
+        rc = np.asarray(tree["right_children"], dtype=np.int32)
+        is_leaf = lc == -1
+        roots.append(offset)
+        feature.append(np.asarray(tree["split_indices"], dtype=np.int32))
+        threshold.append(np.asarray(tree["split_conditions"], dtype=np.float32))
+        left.append(np.where(is_leaf, -1, lc + offset).astype(np.int32))
+        right.append(np.where(is_leaf, -1, rc + offset).astype(np.int32))
+        default_left.append(np.asarray(tree["default_left"], dtype=np.uint8))
+        # Leaf nodes store their (learning-rate scaled) weight in split_conditions
+        value.append(np.where(is_leaf, np.asarray(tree["split_conditions"], dtype=np.float32), 0).astype(np.float32))
+        offset += len(lc)
+
+    base_score = _parse_base_score(learner["learner_model_param"]["base_score"])
+    return FlatForest(
+        roots=np.asarray(roots, dtype=np.int32),
+        feature=np.concatenate(feature),
+        threshold=np.concatenate(threshold),
+        left=np.concatenate(left),
+        right=np.concatenate(right),
+        default_left=np.concatenate(default_left),
+        value=np.concatenate(value),
+        base_margin=math.log(base_score / (1.0 - base_score)),
+        n_features=int(learner["learner_model_param"]["num_feature"])
+    )
@@ -0,0 +1,160 @@
+import math
+import multiprocessing as mp
+import os
+import shutil
+import tempfile
+import time
+from concurrent.futures import FIRST_COMPLETED, wait
+
+import numpy as np
+from sklearn.metrics import log_loss, roc_auc_score
+
+from src.models.cross_validation import open_worker_pool, release_shared, share_arrays, shared_arrays
+
+# 🎛️ Search space: (kind, low, high); "int" and "float" are uniform, "log" is log-uniform
+SEARCH_SPACE = {
+    "max_depth": ("int", 3, 10),
+    "learning_rate": ("log", 0.01, 0.3),
+    "subsample": ("float", 0.6, 1.0),
+    "colsample_bytree": ("float", 0.5, 1.0),
+    "min_child_weight": ("log", 1.0, 20.0),
+    "reg_lambda": ("log", 1e-3, 10.0),
+}
+
+def sample_params(rng, space=SEARCH_SPACE) -> dict:
+    params = {}
+    for name, (kind, low, high) in space.items():
+        if kind == "int":
+            params[name] = int(rng.integers(low, high + 1))
+        elif kind == "log":
+            params[name] = float(math.exp(rng.uniform(math.log(low), math.log(high))))
+        else:
+            params[name] = float(rng.uniform(low, high))
+    return params
+
+# 🪜 Successive-halving rungs: n configs at min_trees, keep 1/eta each rung, eta x more trees
+def halving_schedule(n_trials, min_trees, max_trees, eta):
+    rungs = []
+    n, trees = n_trials, min_trees
+    while n >= 1 and trees <= max_trees:
+        rungs.append((n, trees))
+        if n == 1:
+            break
+        n, trees = max(1, n // eta), trees * eta
+    return rungs
+
+# 🧪 One trial on the shared, already transformed matrices: fit n_estimators trees, score the hold-out
+def _run_trial(trial_id, rung, params, n_estimators, base_params):
+    from src.models.train_model import get_model
+
+    data = shared_arrays()
+    model = get_model(**{**base_params, **params, "n_estimators": n_estimators, "n_jobs": data["n_threads"]})
+    # The rung's tree count is the trial budget, so profile early stopping is switched off
+    model.set_params(early_stopping_rounds=None)
+    start = time.perf_counter()
+    model.fit(data["X_train"], np.asarray(data["y_train"]))
+    fit_seconds = time.perf_counter() - start
+
+    start = time.perf_counter()
+    y_val = np.asarray(data["y_val"])
+    proba = model.predict_proba(data["X_val"])[:, 1]
+    score_seconds = time.perf_counter() - start
+
+    return {
+        "trial_id": trial_id,
+        "rung": rung,
+        "params": params,
+        "n_estimators": n_estimators,
+        "roc_auc": roc_auc_score(y_val, proba),
+        "logloss": log_loss(y_val, proba, labels=[0, 1]),
+        "fit_seconds": fit_seconds,
+        "score_seconds": score_seconds,
+    }
+
+# Trials still running at the deadline are killed rather than awaited, so the budget is a hard stop.
+# The pool's workers are the child processes that did not exist before it was opened.
+def _stop_pool(pool, kill, other_children):
+    if kill:
+        for process in set(mp.active_children()) - other_children:
+            process.terminate()
+    pool.shutdown(wait=True, cancel_futures=True)
+
+# ⏳ Run one rung's trials; returns the finished ones and whether the deadline cut the rung short
+def _run_rung(pool, jobs, deadline, log_trial):
+    results = []
+    if pool is None:
+        for job in jobs:
+            if deadline is not None and time.monotonic() >= deadline:
+                return results, True
+            results.append(_run_trial(*job))
+            if log_trial:
+                log_trial(results[-1])
+        return results, False
+
+    pending = {pool.submit(_run_trial, *job) for job in jobs}
+    while pending:
+        timeout = None if deadline is None else max(0.0, deadline - time.monotonic())
+        done, pending = wait(pending, timeout=timeout, return_when=FIRST_COMPLETED)
+        if not done:
+            for future in pending:
+                future.cancel()
+            return results, True
+        for future in done:
+            results.append(future.result())
+            if log_trial:
+                log_trial(results[-1])
+    return results, False
+
+# 🔎 Budgeted successive halving over SEARCH_SPACE. Features are transformed by the caller once;
+# trials run in parallel inside cpu_budget cores and stop being scheduled once time_budget_s is spent.
+# log_trial(record) is called in the parent process for every finished trial (e.g. to log to MLflow).
+def successive_halving(X_train, y_train, X_val, y_val, n_trials=27, min_trees=50, max_trees=1000, eta=3,
+                       cpu_budget=None, threads_per_trial=1, time_budget_s=None, base_params=None,
+                       space=SEARCH_SPACE, log_trial=None, random_state=42, tmp_dir=None):
+    rng = np.random.default_rng(random_state)
+    base_params = dict(base_params or {})
+    cpu_budget = cpu_budget or os.cpu_count() or 1
+    n_workers = max(1, cpu_budget // threads_per_trial)
+    deadline = None if time_budget_s is None else time.monotonic() + time_budget_s
+
+    configs = {trial_id: sample_params(rng, space) for trial_id in range(n_trials)}
+    schedule = halving_schedule(n_trials, min_trees, max_trees, eta)
+    trials, survivors, out_of_time = [], list(configs), False
+
+    directory = tempfile.mkdtemp(prefix="tuning_shared_", dir=tmp_dir)
+    start = time.monotonic()
+    try:
+        paths = share_arrays(directory, X_train=X_train, y_train=np.asarray(y_train),
+                             X_val=X_val, y_val=np.asarray(y_val))
+        other_children = set(mp.active_children())
+        pool = open_worker_pool(paths, min(n_workers, n_trials), threads_per_trial)
+        try:
+            for rung, (n_keep, n_estimators) in enumerate(schedule):
+                jobs = [(trial_id, rung, configs[trial_id], n_estimators, base_params)
+                        for trial_id in survivors[:n_keep]]
+                rung_results, out_of_time = _run_rung(pool, jobs, deadline, log_trial)
+                trials.extend(rung_results)
+                if not rung_results or out_of_time:
+                    break
+                # Rank by hold-out AUC; the top n_keep of the next rung go on with more trees
+                rung_results.sort(key=lambda r: r["roc_auc"], reverse=True)
+                survivors = [r["trial_id"] for r in rung_results]
+        finally:
+            if pool is not None:
+                _stop_pool(pool, out_of_time, other_children)
+    finally:
+        release_shared()
+        shutil.rmtree(directory, ignore_errors=True)
+
+    if not trials:
+        raise RuntimeError("❌ No trial finished inside the time budget")
+    # The best trial is the top of the deepest rung reached, not the best cheap low-budget score
+    deepest = max(t["rung"] for t in trials)
+    best = max((t for t in trials if t["rung"] == deepest), key=lambda t: t["roc_auc"])
+    return {
+        "best": best,
+        "trials": trials,
+        "wall_seconds": time.monotonic() - start,
+        "out_of_time": out_of_time,
+        "n_workers": n_workers,
+    }
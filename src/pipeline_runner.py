@@ -0,0 +1,210 @@
+import hashlib
+import inspect
+import json
+import os
+import shutil
+import time
+
+import joblib
+
+DEFAULT_CACHE_DIR = ".cache/pipeline"
+DEFAULT_CACHE_MAX_BYTES = 5 * 1024 ** 3
+HASH_CHUNK_BYTES = 1 << 20
+
+def _digest(*parts) -> str:
+    h = hashlib.sha256()
+    for part in parts:
+        h.update(str(part).encode("utf-8"))
+        h.update(b"\0")
+    return h.hexdigest()
+
+def _source(obj) -> str:
+    if isinstance(obj, (dict, list, tuple, str, int, float, bool)) or obj is None:
+        return json.dumps(obj, sort_keys=True, default=str)
+    try:
+        return inspect.getsource(obj)
+    except (OSError, TypeError):
+        return getattr(obj, "__qualname__", repr(obj))
+
+# 🧩 One step of the flow: fn(inputs: dict, **params) -> {output_name: value}.
+# Inputs are either file paths on disk or outputs of earlier stages; code_deps lists the
+# modules/functions the stage calls, so editing them invalidates the stage as well. Plain values
+# (e.g. module-level config dicts) may be listed too and are hashed by content.
+class Stage:
+    def __init__(self, name, fn, inputs=(), outputs=(), params=None, code_deps=()):
+        self.name = name
+        self.fn = fn
+        self.inputs = list(inputs)
+        self.outputs = list(outputs)
+        self.params = dict(params or {})
+        self.code_deps = list(code_deps)
+
+    def code_fingerprint(self) -> str:
+        return _digest(*(_source(obj) for obj in [self.fn, *self.code_deps]))
+
+# 🗄️ On-disk artifact cache keyed by stage fingerprint, evicting least recently used entries
+class ArtifactCache:
+    def __init__(self, root=DEFAULT_CACHE_DIR, max_bytes=DEFAULT_CACHE_MAX_BYTES):
+        self.root = root
+        self.max_bytes = max_bytes
+        os.makedirs(root, exist_ok=True)
+        self._hash_index_path = os.path.join(root, "file_hashes.json")
+        try:
+            with open(self._hash_index_path) as f:
+                self._hash_index = json.load(f)
+        except (OSError, ValueError):
+            self._hash_index = {}
+
+    def _entry_dir(self, key):
+        return os.path.join(self.root, key)
+
+    # Content hash of an input file, re-read only when its size or mtime changed
+    def file_fingerprint(self, path) -> str:
+        stat = os.stat(path)
+        abspath = os.path.abspath(path)
+        known = self._hash_index.get(abspath)
+        if known and known["size"] == stat.st_size and known["mtime_ns"] == stat.st_mtime_ns:
+            return known["sha256"]
+
+        h = hashlib.sha256()
+        with open(path, "rb") as f:
+            for block in iter(lambda: f.read(HASH_CHUNK_BYTES), b""):
+                h.update(block)
+        self._hash_index[abspath] = {"size": stat.st_size, "mtime_ns": stat.st_mtime_ns, "sha256": h.hexdigest()}
+        tmp_path = self._hash_index_path + ".tmp"
+        with open(tmp_path, "w") as f:
+            json.dump(self._hash_index, f)
+        os.replace(tmp_path, self._hash_index_path)
+        return h.hexdigest()
+
+    def has(self, key) -> bool:
+        return os.path.exists(os.path.join(self._entry_dir(key), "meta.json"))
+
+    def load(self, key, name):
+        self.touch(key)
+        return joblib.load(os.path.join(self._entry_dir(key), f"{name}.joblib"))
+
+    def touch(self, key):
+        os.utime(os.path.join(self._entry_dir(key), "meta.json"))
+
+    # Written to a temp directory and renamed, so a crash never leaves a half-written entry
+    def put(self, key, stage_name, outputs: dict):
+        final_dir = self._entry_dir(key)
+        tmp_dir = f"{final_dir}.tmp-{os.getpid()}"
+        shutil.rmtree(tmp_dir, ignore_errors=True)
+        os.makedirs(tmp_dir)
+        size = 0
+        for name, value in outputs.items():
+            path = os.path.join(tmp_dir, f"{name}.joblib")
+            joblib.dump(value, path)
+            size += os.path.getsize(path)
+        with open(os.path.join(tmp_dir, "meta.json"), "w") as f:
+            json.dump({"stage": stage_name, "outputs": list(outputs), "bytes": size, "created": time.time()}, f)
+        shutil.rmtree(final_dir, ignore_errors=True)
+        os.replace(tmp_dir, final_dir)
+
+    def entries(self):
+        found = []
+        for key in os.listdir(self.root):
+            meta_path = os.path.join(self._entry_dir(key), "meta.json")
+            if not os.path.exists(meta_path):
+                continue
+            with open(meta_path) as f:
+                meta = json.load(f)
+            found.append({"key": key, "last_used": os.path.getmtime(meta_path), **meta})
+        return found
+
+    def size_bytes(self) -> int:
+        return sum(entry["bytes"] for entry in self.entries())
+
+    # 🧹 Drop least recently used entries until the cache fits; entries in keep are never evicted
+    def evict(self, keep=()):
+        entries = sorted(self.entries(), key=lambda entry: entry["last_used"])
+        total = sum(entry["bytes"] for entry in entries)
+        evicted = []
+        for entry in entries:
+            if total <= self.max_bytes:
+                break
+            if entry["key"] in keep:
+                continue
+            shutil.rmtree(self._entry_dir(entry["key"]), ignore_errors=True)
+            total -= entry["bytes"]
+            evicted.append(entry["key"])
+        return evicted
+
+# A stage output that is only read from the cache if a downstream stage actually runs
+class _CachedOutput:
+    def __init__(self, cache, key, name):
+        self.cache, self.key, self.name = cache, key, name
+
+    def load(self):
+        return self.cache.load(self.key, self.name)
+
+# 🚦 Run stages in order, skipping every stage whose fingerprint (code + params + input
+# fingerprints) is already cached. Output fingerprints chain into downstream keys, so a
+# change to a raw file or parameter re-runs exactly the stages that depend on it.
+def run_stages(stages, cache: ArtifactCache, force=(), verbose=True):
+    producers, fingerprints, values, report = {}, {}, {}, []
+    for stage in stages:
+        for name in stage.outputs:
+            if name in producers:
+                raise ValueError(f"Output '{name}' is produced by both '{producers[name]}' and '{stage.name}'")
+            producers[name] = stage.name
+
+    for stage in stages:
+        input_fingerprints = []
+        for name in stage.inputs:
+            if name in fingerprints:
+                input_fingerprints.append(fingerprints[name])
+            elif name in producers:
+                raise ValueError(f"Stage '{stage.name}' needs '{name}' before '{producers[name]}' has run")
+            elif os.path.exists(name):
+                input_fingerprints.append(cache.file_fingerprint(name))
+            else:
+                raise FileNotFoundError(f"Stage '{stage.name}' input '{name}' is neither a file nor a stage output")
+
+        key = _digest(stage.name, stage.code_fingerprint(),
+                      json.dumps(stage.params, sort_keys=True, default=str), *input_fingerprints)
+        start = time.perf_counter()
+        if cache.has(key) and stage.name not in force:
+            status = "cached"
+            cache.touch(key)
+            for name in stage.outputs:
+                values[name] = _CachedOutput(cache, key, name)
+        else:
+            status = "ran"
+            inputs = {}
+            for name in stage.inputs:
+                value = values.get(name, name)
+                if isinstance(value, _CachedOutput):
+                    value = values[name] = value.load()
+                inputs[name] = value
+            outputs = stage.fn(inputs, **stage.params)
+            missing = set(stage.outputs) - set(outputs)
+            if missing:
+                raise ValueError(f"Stage '{stage.name}' did not return declared outputs {sorted(missing)}")
+            cache.put(key, stage.name, {name: outputs[name] for name in stage.outputs})
+            values.update({name: outputs[name] for name in stage.outputs})
+
+        for name in stage.outputs:
+            fingerprints[name] = _digest(key, name)
+        seconds = time.perf_counter() - start
+        report.append({"stage": stage.name, "status": status, "seconds": seconds, "key": key})
+        if verbose:
+            icon = "⏭️" if status == "cached" else "✅"
+            print(f"{icon} {stage.name}: {status} in {seconds:.2f}s ({key[:12]})")
+
+    evicted = cache.evict(keep={entry["key"] for entry in report})
+    if verbose and evicted:
+        print(f"🧹 Evicted {len(evicted)} cache entries to stay under {cache.max_bytes / 1024 ** 3:.1f} GB")
+
+    return Artifacts(values), report
+
+# Stage outputs by name; cached ones are read from disk on first access
+class Artifacts(dict):
+    def __getitem__(self, name):
+        value = super().__getitem__(name)
+        if isinstance(value, _CachedOutput):
+            value = value.load()
+            self[name] = value
+        return value
@@ -0,0 +1,158 @@
+import argparse
+import os
+
+import numpy as np
+import pandas as pd
+
+# 📐 Shape of the public Xente dataset (95,662 transactions over 90 days), used to scale
+# cardinalities and marginals to any row count
+XENTE_ROWS = 95_662
+XENTE_CUSTOMERS = 3_742
+XENTE_ACCOUNTS = 3_633
+XENTE_BATCHES = 94_809
+FRAUD_RATE = 193 / XENTE_ROWS
+START = "2018-11-15"
+DAYS = 90
+
+RAW_COLUMNS = [
+    "TransactionId", "BatchId", "AccountId", "SubscriptionId", "CustomerId", "CurrencyCode", "CountryCode",
+    "ProviderId", "ProductId", "ProductCategory", "ChannelId", "Amount", "Value", "TransactionStartTime",
+    "PricingStrategy", "FraudResult"
+]
+
+PRODUCT_CATEGORIES = {
+    "financial_services": 0.475, "airtime": 0.471, "utility_bill": 0.0188, "data_bundles": 0.0169,
+    "tv": 0.0142, "ticket": 0.0022, "movies": 0.0018, "transport": 0.0003, "other": 0.0001
+}
+# ProductIds nest inside categories, as in the source data
+CATEGORY_PRODUCTS = {
+    "financial_services": [1, 2, 3, 6, 7, 9, 11, 14, 15, 20],
+    "airtime": [4, 5, 10, 23],
+    "utility_bill": [8, 12, 16, 17, 18, 26],
+    "data_bundles": [21, 22, 27],
+    "tv": [13, 19, 24],
+    "ticket": [25],
+    "movies": [19],
+    "transport": [24],
+    "other": [3],
+}
+PROVIDERS = {
+    "ProviderId_4": 0.401, "ProviderId_6": 0.359, "ProviderId_5": 0.148, "ProviderId_1": 0.0589,
+    "ProviderId_3": 0.0331, "ProviderId_2": 0.0002
+}
+CHANNELS = {"ChannelId_3": 0.595, "ChannelId_2": 0.388, "ChannelId_5": 0.0117, "ChannelId_1": 0.0053}
+PRICING_STRATEGIES = {2: 0.835, 4: 0.142, 1: 0.0195, 0: 0.0035}
+# Median transaction size per category (UGX); amounts are log-normal around it
+CATEGORY_MEDIAN_AMOUNT = {
+    "financial_services": 1_500, "airtime": 1_000, "utility_bill": 10_000, "data_bundles": 5_000,
+    "tv": 30_000, "ticket": 50_000, "movies": 10_000, "transport": 20_000, "other": 5_000
+}
+# Share of transactions per hour of day: quiet nights, busy office hours
+HOURLY_PROFILE = np.array([1, 0.6, 0.4, 0.3, 0.3, 0.5, 1.5, 3, 5, 6, 6.5, 6.5, 6, 6, 6, 6, 6, 6,
+                           5.5, 5, 4, 3, 2, 1.5])
+
+def _draw(rng, marginals: dict, size):
+    keys = list(marginals)
+    p = np.array([marginals[key] for key in keys], dtype=float)
+    return np.asarray(keys, dtype=object)[rng.choice(len(keys), size=size, p=p / p.sum())]
+
+def _ids(rng, prefix, n, space):
+    return np.array([f"{prefix}_{i}" for i in rng.choice(np.arange(1, space + 1), size=n, replace=False)],
+                    dtype=object)
+
+# 🧪 Deterministic Xente-shaped transactions: heavy-tailed customer activity, nested
+# account/subscription/product IDs, diurnal timestamps and fraud concentrated on a few
+# customers and large amounts. The same (n_rows, seed) always yields the same frame.
+def generate_transactions(n_rows: int, seed: int = 42, n_customers: int = None, fraud_rate: float = FRAUD_RATE,
+                          start: str = START, days: int = DAYS) -> pd.DataFrame:
+    rng = np.random.default_rng(seed)
+    n_customers = n_customers or max(2, round(n_rows * XENTE_CUSTOMERS / XENTE_ROWS))
+
+    # 👥 Customers: Pareto activity, so a few customers make most of the transactions
+    customer_ids = _ids(rng, "CustomerId", n_customers, n_customers * 2)
+    activity = rng.pareto(1.2, n_customers) + 1
+    customer = rng.choice(n_customers, size=n_rows, p=activity / activity.sum())
+    # A few customers share an account; subscriptions follow accounts one to one
+    n_accounts = max(1, round(n_customers * XENTE_ACCOUNTS / XENTE_CUSTOMERS))
+    account_of_customer = np.where(np.arange(n_customers) < n_accounts, np.arange(n_customers),
+                                   rng.integers(0, n_accounts, n_customers))
+    account_ids = _ids(rng, "AccountId", n_accounts, n_accounts * 2)
+    subscription_ids = _ids(rng, "SubscriptionId", n_accounts, n_accounts * 2)
+    account = account_of_customer[customer]
+
+    # 🛒 Each customer mostly sticks to one category and channel
+    favourite_category = _draw(rng, PRODUCT_CATEGORIES, n_customers)
+    favourite_channel = _draw(rng, CHANNELS, n_customers)
+    category = np.where(rng.random(n_rows) < 0.8, favourite_category[customer], _draw(rng, PRODUCT_CATEGORIES, n_rows))
+    channel = np.where(rng.random(n_rows) < 0.9, favourite_channel[customer], _draw(rng, CHANNELS, n_rows))
+    product = np.empty(n_rows, dtype=object)
+    for name, products in CATEGORY_PRODUCTS.items():
+        rows = np.flatnonzero(category == name)
+        product[rows] = np.array([f"ProductId_{p}" for p in products], dtype=object)[
+            rng.integers(0, len(products), len(rows))]
+    provider = _draw(rng, PROVIDERS, n_rows)
+    pricing = _draw(rng, PRICING_STRATEGIES, n_rows).astype(np.int64)
+
+    # 💸 Debits are positive, credits (mostly financial services) negative; Value is the magnitude
+    median = pd.Series(category).map(CATEGORY_MEDIAN_AMOUNT).to_numpy(dtype=float)
+    magnitude = np.round(median * rng.lognormal(0.0, 1.0, n_rows), -1).clip(min=10)
+    credit = (category == "financial_services") & (rng.random(n_rows) < 0.8)
+
+    # 🕒 Uniform days, diurnal hours, sorted like the source file
+    hours = rng.choice(24, size=n_rows, p=HOURLY_PROFILE / HOURLY_PROFILE.sum())
+    seconds = rng.integers(0, days, n_rows) * 86_400 + hours * 3_600 + rng.integers(0, 3_600, n_rows)
+    order = np.argsort(seconds, kind="stable")
+
+    # 🚨 Fraud: a small set of customers plus large financial-services / provider 1 and 3 amounts
+    n_fraud = min(n_rows, max(2, round(n_rows * fraud_rate)))
+    fraud_customers = rng.random(n_customers) < 0.01
+    weight = (1 + 200 * fraud_customers[customer]
+              + 50 * ((category == "financial_services") | np.isin(provider, ["ProviderId_1", "ProviderId_3"])))
+    fraud = np.zeros(n_rows, dtype=np.int64)
+    fraud[rng.choice(n_rows, size=n_fraud, replace=False, p=weight / weight.sum())] = 1
+    magnitude = np.where(fraud == 1, np.round(rng.lognormal(np.log(700_000), 1.0, n_rows), -2), magnitude)
+    amount = np.where(credit & (fraud == 0), -magnitude, magnitude)
+
+    timestamps = pd.Timestamp(start) + pd.to_timedelta(seconds, unit="s")
+    df = pd.DataFrame({
+        "TransactionId": _ids(rng, "TransactionId", n_rows, n_rows * 2),
+        "BatchId": _ids(rng, "BatchId", n_rows, n_rows * 2),
+        "AccountId": account_ids[account],
+        "SubscriptionId": subscription_ids[account],
+        "CustomerId": customer_ids[customer],
+        "CurrencyCode": "UGX",
+        "CountryCode": 256,
+        "ProviderId": provider,
+        "ProductId": product,
+        "ProductCategory": category,
+        "ChannelId": channel,
+        "Amount": amount,
+        "Value": np.abs(amount),
+        "TransactionStartTime": timestamps.strftime("%Y-%m-%dT%H:%M:%SZ"),
+        "PricingStrategy": pricing,
+        "FraudResult": fraud,
+    })
+    df = df.iloc[order].reset_index(drop=True)
+    # Batches group ~1% of transactions with their predecessor, as in the source data
+    shared_batch = np.flatnonzero(rng.random(n_rows) < 1 - XENTE_BATCHES / XENTE_ROWS)
+    shared_batch = shared_batch[shared_batch > 0]
+    df.loc[shared_batch, "BatchId"] = df["BatchId"].to_numpy()[shared_batch - 1]
+    return df[RAW_COLUMNS]
+
+# 📥 Same dtypes data_processing.load_data gives the raw CSV
+def as_loaded(df: pd.DataFrame) -> pd.DataFrame:
+    from src.data_processing import SCHEMA_DTYPES
+    return df.astype({col: SCHEMA_DTYPES[col] for col in df.columns if col in SCHEMA_DTYPES})
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Generate synthetic Xente-shaped transactions")
+    parser.add_argument("--rows", type=int, default=XENTE_ROWS, help="Number of transactions")
+    parser.add_argument("--seed", type=int, default=42, help="Random seed")
+    parser.add_argument("--out", default="data/raw/synthetic_data.csv", help="Output CSV (raw data.csv layout)")
+    args = parser.parse_args()
+
+    os.makedirs(os.path.dirname(args.out) or ".", exist_ok=True)
+    df = generate_transactions(args.rows, args.seed)
+    df.to_csv(args.out, index=False)
+    print(f"✅ {len(df)} synthetic transactions ({df['CustomerId'].nunique()} customers, "
+          f"{int(df['FraudResult'].sum())} fraud) saved to {args.out}")
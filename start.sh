@@ -1,7 +1,11 @@
 #!/bin/bash
 
-# Start FastAPI backend in the background
-uvicorn api.main:app --host 0.0.0.0 --port 8000 &
+# Start FastAPI backend in the background; with API_WORKERS > 1, forked workers share one loaded model
+if [ "${API_WORKERS:-1}" -gt 1 ]; then
+    python -m src.api.serve --host 0.0.0.0 --port 8000 --workers "$API_WORKERS" &
+else
+    uvicorn api.main:app --host 0.0.0.0 --port 8000 &
+fi
 
 # Start Streamlit frontend
 streamlit run streamlit_app.py --server.port=10000 --server.address=0.0.0.0
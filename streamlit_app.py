@@ -7,17 +7,18 @@ from datetime import datetime
 # ✅ Ensure src/ is in the Python path
 sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), ".")))
 
-from src.models.predict_model import load_pipeline, predict_risk
+from src.data_processing import load_processed_data
+from src.models.predict_model import load_pipeline, predict_risk_record
 
 pipeline = load_pipeline("models/fitted_pipeline.pkl")
 
 @st.cache_data
 def load_dropdown_options():
-    df = pd.read_csv("data/processed/cleaned_transactions.csv")
+    df = load_processed_data(["CustomerId", "ChannelId", "ProviderId"])
     return {
-        "customers": sorted(df["CustomerId"].dropna().unique().tolist()),
-        "channels": sorted(df["ChannelId"].dropna().unique().tolist()),
-        "providers": sorted(df["ProviderId"].dropna().unique().tolist())
+        "customers": sorted(df["CustomerId"].dropna().unique().astype(str).tolist()),
+        "channels": sorted(df["ChannelId"].dropna().unique().astype(str).tolist()),
+        "providers": sorted(df["ProviderId"].dropna().unique().astype(str).tolist())
     }
 
 options = load_dropdown_options()
@@ -59,7 +60,8 @@ if submitted:
             st.error("❌ Invalid numeric input.")
         else:
             try:
-                label, proba, risk_band, top_features = predict_risk(pipeline, input_df)
+                record = input_df.iloc[0].to_dict()
+                label, proba, risk_band, top_features = predict_risk_record(pipeline, record, explain=True)
 
                 st.markdown("---")
                 st.subheader("📊 Prediction Summary")
@@ -0,0 +1,221 @@
+import asyncio
+import io
+import json
+import os
+import subprocess
+import sys
+import time
+import httpx
+import joblib
+import numpy as np
+import pandas as pd
+import pytest
+from fastapi.testclient import TestClient
+from xgboost import XGBClassifier
+
+# Add the project root directory to the Python path
+project_root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, project_root)
+
+import src.api.main as main
+from src.api.model_registry import ModelRegistry
+from src.api.prediction_logger import PredictionLogger
+from src.features.feature_engineering import build_feature_pipeline
+from src.models.predict_model import get_compiled_forest
+from src.models.serving_artifacts import export_serving_artifacts
+from src.synthetic_data import generate_transactions
+
+HEADERS = {"x-api-key": main.API_KEY}
+
+@pytest.fixture
+def api(tmp_path, monkeypatch):
+    """Point the app at temporary artifacts with fresh readiness state"""
+    monkeypatch.setattr(main, "registry", ModelRegistry(
+        str(tmp_path / "final_cv_model.pkl"), str(tmp_path / "fitted_pipeline.pkl"),
+        str(tmp_path / "manifest.json"), main.WARMUP_RECORD, version="v1"
+    ))
+    monkeypatch.setattr(main, "readiness", {"ready": False, "error": None, "load_seconds": None,
+                                            "warmup_seconds": None, "import_to_ready_seconds": None})
+    monkeypatch.setattr(main, "prediction_logger", PredictionLogger(str(tmp_path / "logs")))
+    return tmp_path
+
+def train_small_model(directory, threshold=1000):
+    df = generate_transactions(500, seed=0, n_customers=50)
+    pipeline = build_feature_pipeline()
+    X = pipeline.fit_transform(df)
+    model = XGBClassifier(n_estimators=10, max_depth=3).fit(X, (df["Amount"] > threshold).astype(int))
+    joblib.dump(pipeline, directory / "fitted_pipeline.pkl")
+    joblib.dump(model, directory / "final_cv_model.pkl")
+
+def wait_until_settled(client, timeout=60):
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        response = client.get("/api/ready")
+        if response.status_code == 200 or response.json()["error"]:
+            return response
+        time.sleep(0.05)
+    raise AssertionError("API never became ready")
+
+def test_ready_after_warmup(api):
+    """Test that /ready turns 200 with startup timings once artifacts are loaded and warmed"""
+    train_small_model(api)
+    with TestClient(main.app) as client:
+        assert client.get("/api/health").json() == {"status": "ok"}
+        response = wait_until_settled(client)
+        assert response.status_code == 200
+        assert response.json()["warmup_seconds"] is not None
+        assert response.json()["import_to_ready_seconds"] > 0
+
+        response = client.post("/api/predict", json=main.WARMUP_RECORD, headers=HEADERS)
+        assert response.status_code == 200
+        assert 0.0 <= response.json()["risk_probability"] <= 1.0
+        assert response.json()["model_version"] == "v1"
+
+    # Single predictions are logged with the version that scored them, like batches
+    logged = pd.read_parquet(api / "logs")
+    assert list(logged["model_version"]) == ["v1"]
+
+def test_reload_swaps_to_new_version(api):
+    """Test that a manifest reload warms the new version and swaps it in, and a bad one keeps it serving"""
+    train_small_model(api)
+    (api / "v2").mkdir()
+    train_small_model(api / "v2", threshold=500)
+    with TestClient(main.app) as client:
+        assert wait_until_settled(client).json()["model_version"] == "v1"
+
+        with open(api / "manifest.json", "w") as f:
+            json.dump({"version": "v2", "model_path": "v2/final_cv_model.pkl",
+                       "pipeline_path": "v2/fitted_pipeline.pkl"}, f)
+        response = client.post("/api/admin/reload", headers=HEADERS)
+        assert response.status_code == 200
+        assert response.json()["active"]["version"] == "v2"
+        assert response.json()["active"]["warmup_seconds"] is not None
+
+        response = client.post("/api/predict", json=main.WARMUP_RECORD, headers=HEADERS)
+        assert response.json()["model_version"] == "v2"
+
+        response = client.post("/api/admin/reload", headers=HEADERS, json={
+            "version": "v3", "model_path": str(api / "missing.pkl"), "pipeline_path": str(api / "missing.pkl")
+        })
+        assert response.status_code == 500
+        models = client.get("/api/admin/models", headers=HEADERS).json()
+        assert models["active"]["version"] == "v2"
+        assert "FileNotFoundError" in models["last_error"]
+        assert [entry["version"] for entry in models["history"]] == ["v1", "v2"]
+
+def test_missing_artifacts_keep_api_unready(api):
+    """Test that missing artifacts leave the API live but unready, and predictions return 503"""
+    with TestClient(main.app) as client:
+        assert client.get("/api/health").status_code == 200
+        response = wait_until_settled(client)
+        assert response.status_code == 503
+        assert "FileNotFoundError" in response.json()["error"]
+        assert client.post("/api/predict", json=main.WARMUP_RECORD, headers=HEADERS).status_code == 503
+
+def test_serving_bundle_is_memory_mapped(api):
+    """Test that an exported serving bundle is served with a memory-mapped forest and string categories"""
+    train_small_model(api)
+    export_serving_artifacts(str(api / "final_cv_model.pkl"), str(api / "fitted_pipeline.pkl"),
+                             str(api / "serving"), version="bundle")
+    registry = ModelRegistry("missing.pkl", "missing.pkl", str(api / "serving" / "manifest.json"), main.WARMUP_RECORD)
+    active = registry.load()
+
+    assert active.version == "bundle"
+    assert isinstance(get_compiled_forest(active.model).feature, np.memmap)
+    encoder = active.pipeline.named_steps["preprocessor"].named_transformers_["cat"].named_steps["encoder"]
+    assert all(categories.dtype.kind == "U" for categories in encoder.categories_)
+
+    original = ModelRegistry(str(api / "final_cv_model.pkl"), str(api / "fitted_pipeline.pkl")).load()
+    frame = pd.DataFrame([main.WARMUP_RECORD] * 3)
+    np.testing.assert_allclose(active.score(frame)["risk_probability"], original.score(frame)["risk_probability"])
+
+def test_memory_report(api):
+    """Test that the memory endpoint reports resident memory for the serving process"""
+    with TestClient(main.app) as client:
+        report = client.get("/api/admin/memory", headers=HEADERS).json()
+    current = [usage for usage in report["processes"] if usage["current"]]
+    assert len(current) == 1 and current[0]["rss_mb"] > 0
+
+def test_metrics_expose_stage_latency(api):
+    """Test that /metrics reports per-stage histograms, request counts and the model version"""
+    train_small_model(api)
+    with TestClient(main.app) as client:
+        assert wait_until_settled(client).status_code == 200
+        response = client.post("/api/predict", json=main.WARMUP_RECORD, headers=HEADERS)
+        assert "transform;dur=" in response.headers["server-timing"]
+        client.post("/api/predict_batch", files={"file": ("batch.csv", pd.DataFrame([main.WARMUP_RECORD] * 3)
+                                                          .to_csv(index=False), "text/csv")}, headers=HEADERS)
+        response = client.get("/api/metrics")
+
+    assert response.status_code == 200 and response.headers["content-type"].startswith("text/plain")
+    text = response.text
+    assert 'credit_risk_requests_total{endpoint="predict",status="200"}' in text
+    for stage in ("parse", "score", "transform", "predict", "log", "framework"):
+        assert f'credit_risk_api_stage_seconds_count{{endpoint="predict",stage="{stage}"}}' in text
+    assert 'credit_risk_stage_seconds_count{function="predict_batch",stage="predict"}' in text
+    assert 'credit_risk_scored_rows_bucket{function="predict_batch",le="4"}' in text
+    assert 'credit_risk_model_info{version="v1"} 1' in text
+    assert "credit_risk_ready 1" in text
+
+def test_blocking_log_does_not_stall_event_loop(api, monkeypatch):
+    """Test that a /predict waiting on a full "block" log buffer leaves other requests responsive"""
+    train_small_model(api)
+    logger = PredictionLogger(str(api / "logs"), max_buffer_rows=1, when_full="block", block_timeout_s=1.0)
+    logger.log(pd.DataFrame({"x": [1]}))  # buffer full and no writer thread to drain it
+    monkeypatch.setattr(main, "prediction_logger", logger)
+
+    async def run():
+        await main.load_and_warm()
+        transport = httpx.ASGITransport(app=main.app)
+        async with httpx.AsyncClient(transport=transport, base_url="http://test") as client:
+            start = time.perf_counter()
+            predict = asyncio.create_task(client.post("/api/predict", json=main.WARMUP_RECORD, headers=HEADERS))
+            await asyncio.sleep(0.05)
+            health = await client.get("/api/health")
+            health_seconds = time.perf_counter() - start
+            response = await predict
+        return health, health_seconds, response, time.perf_counter() - start
+
+    health, health_seconds, response, predict_seconds = asyncio.run(run())
+    assert health.status_code == 200 and response.status_code == 200
+    assert predict_seconds >= 0.9 and health_seconds < 0.5
+    assert logger.dropped_rows == 1
+
+@pytest.mark.parametrize("output_format", ["csv", "ndjson"])
+def test_streamed_batch_round_trips(api, output_format):
+    """Test that streamed CSV and NDJSON scores cover every uploaded row, chunk boundaries included"""
+    train_small_model(api)
+    upload = pd.DataFrame([{**main.WARMUP_RECORD, "CustomerId": f"CustomerId_{i}"} for i in range(25)])
+    with TestClient(main.app) as client:
+        assert wait_until_settled(client).status_code == 200
+        response = client.post("/api/predict_batch", params={"stream": True, "format": output_format, "chunksize": 10},
+                               files={"file": ("batch.csv", upload.to_csv(index=False), "text/csv")}, headers=HEADERS)
+
+    assert response.status_code == 200 and response.headers["x-model-version"] == "v1"
+    if output_format == "csv":
+        scores = pd.read_csv(io.StringIO(response.text))
+    else:
+        lines = response.text.split("\n")
+        assert lines[-1] == "" and all(lines[:-1])  # one record per line, no blank lines
+        scores = pd.DataFrame([json.loads(line) for line in lines[:-1]])
+    assert list(scores["CustomerId"]) == list(upload["CustomerId"])
+    assert scores["risk_probability"].between(0, 1).all() and set(scores["model_version"]) == {"v1"}
+
+def test_streamed_batch_rejects_malformed_upload(api):
+    """Test that an upload missing required columns fails with a 400 before any rows are streamed"""
+    train_small_model(api)
+    upload = pd.DataFrame([main.WARMUP_RECORD] * 3).drop(columns=["CustomerId", "Amount"])
+    with TestClient(main.app) as client:
+        assert wait_until_settled(client).status_code == 200
+        response = client.post("/api/predict_batch", params={"stream": True, "format": "ndjson"},
+                               files={"file": ("batch.csv", upload.to_csv(index=False), "text/csv")}, headers=HEADERS)
+
+    assert response.status_code == 400
+    assert "Invalid batch upload" in response.json()["detail"]
+
+def test_api_import_defers_heavy_libraries():
+    """Test that importing the API module does not load pandas, pyarrow or the model stack"""
+    code = ("import sys, src.api.main; "
+            "print(sorted(m for m in ('pandas', 'pyarrow', 'xgboost', 'joblib') if m in sys.modules))")
+    out = subprocess.run([sys.executable, "-c", code], cwd=project_root, capture_output=True, text=True, check=True)
+    assert out.stdout.strip() == "[]"
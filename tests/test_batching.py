@@ -0,0 +1,111 @@
+import asyncio
+import os
+import sys
+import threading
+import time
+import pandas as pd
+import pytest
+
+# Add the project root directory to the Python path
+project_root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, project_root)
+
+from src.api.batching import MicroBatcher
+
+def double_amount(df):
+    return pd.DataFrame({"risk_probability": df["Amount"] * 2})
+
+def test_concurrent_requests_share_batches():
+    """Test that concurrent callers are scored together and get their own rows back"""
+    async def scenario():
+        batcher = MicroBatcher(double_amount, max_batch_size=16, max_wait_ms=20)
+        await batcher.start()
+        results = await asyncio.gather(*[
+            batcher.submit(pd.DataFrame({"Amount": [float(i)]})) for i in range(40)
+        ])
+        await batcher.stop()
+        return batcher, results
+
+    batcher, results = asyncio.run(scenario())
+    assert [r["risk_probability"].iloc[0] for r in results] == [2.0 * i for i in range(40)]
+    assert batcher.rows == 40
+    assert batcher.batches < 40
+
+def test_scoring_errors_reach_every_caller():
+    """Test that a failing batch raises in each waiting request"""
+    def fail(df):
+        raise ValueError("boom")
+
+    async def scenario():
+        batcher = MicroBatcher(fail, max_wait_ms=5)
+        await batcher.start()
+        outcomes = await asyncio.gather(
+            batcher.submit(pd.DataFrame({"Amount": [1.0]})),
+            batcher.submit(pd.DataFrame({"Amount": [2.0]})),
+            return_exceptions=True
+        )
+        await batcher.stop()
+        return outcomes
+
+    outcomes = asyncio.run(scenario())
+    assert all(isinstance(o, ValueError) for o in outcomes)
+
+def test_bad_record_only_fails_its_own_request():
+    """Test that a failing batch is re-scored per request so only the offending caller errors"""
+    def reject_negative(df):
+        if (df["Amount"] < 0).any():
+            raise ValueError("negative amount")
+        return double_amount(df)
+
+    async def scenario():
+        batcher = MicroBatcher(reject_negative, max_batch_size=16, max_wait_ms=20)
+        await batcher.start()
+        outcomes = await asyncio.gather(*[
+            batcher.submit(pd.DataFrame({"Amount": [float(i)]})) for i in (1, -1, 3)
+        ], return_exceptions=True)
+        await batcher.stop()
+        return outcomes
+
+    good, bad, other = asyncio.run(scenario())
+    assert isinstance(bad, ValueError)
+    assert good["risk_probability"].iloc[0] == 2.0 and other["risk_probability"].iloc[0] == 6.0
+
+def test_batches_are_scored_concurrently_up_to_the_limit():
+    """Test that up to max_in_flight batches are scored at the same time, and no more"""
+    state = {"running": 0, "peak": 0}
+    lock = threading.Lock()
+
+    def slow_score(df):
+        with lock:
+            state["running"] += 1
+            state["peak"] = max(state["peak"], state["running"])
+        time.sleep(0.05)
+        with lock:
+            state["running"] -= 1
+        return double_amount(df)
+
+    async def scenario():
+        batcher = MicroBatcher(slow_score, max_batch_size=1, max_wait_ms=0, max_in_flight=3)
+        await batcher.start()
+        started = time.perf_counter()
+        await asyncio.gather(*[batcher.submit(pd.DataFrame({"Amount": [float(i)]})) for i in range(9)])
+        elapsed = time.perf_counter() - started
+        await batcher.stop()
+        return elapsed
+
+    elapsed = asyncio.run(scenario())
+    assert state["peak"] == 3
+    assert elapsed < 9 * 0.05
+
+def test_stop_fails_requests_still_being_scored():
+    """Test that stopping the batcher releases callers whose batch was still in flight"""
+    async def scenario():
+        batcher = MicroBatcher(lambda df: time.sleep(0.3) or double_amount(df), max_wait_ms=0)
+        await batcher.start()
+        request = asyncio.create_task(batcher.submit(pd.DataFrame({"Amount": [1.0]})))
+        await asyncio.sleep(0.05)
+        await batcher.stop()
+        return await asyncio.gather(request, return_exceptions=True)
+
+    [outcome] = asyncio.run(scenario())
+    assert isinstance(outcome, RuntimeError)
@@ -0,0 +1,59 @@
+import json
+import os
+import sys
+import pytest
+
+# Add the project root directory to the Python path
+project_root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, project_root)
+
+import benchmarks.run_benchmarks as run_benchmarks_module
+from benchmarks.run_benchmarks import compare_results, main, run_benchmarks
+
+def result(benchmark, rows, seconds, peak_mb):
+    return {"benchmark": benchmark, "rows": rows, "seconds_min": seconds, "peak_mb": peak_mb}
+
+def test_compare_flags_time_and_memory_regressions():
+    """Test that slowdowns and memory growth beyond tolerance and noise floor are flagged"""
+    baseline = {"results": [result("a", 10, 1.0, 100.0), result("b", 10, 1.0, 100.0),
+                            result("c", 10, 0.001, 0.1), result("d", 10, 1.0, 100.0)]}
+    current = {"results": [result("a", 10, 1.5, 100.0), result("b", 10, 1.0, 150.0),
+                           result("c", 10, 0.004, 0.5), result("d", 10, 1.1, 105.0), result("e", 10, 9.0, 9.0)]}
+    comparison = compare_results(current, baseline).set_index("benchmark")
+
+    assert comparison.loc["a", "regressed"] and comparison.loc["b", "regressed"]
+    # Tiny absolute differences and in-tolerance changes pass; results without a baseline are skipped
+    assert not comparison.loc["c", "regressed"] and not comparison.loc["d", "regressed"]
+    assert "e" not in comparison.index
+
+def test_run_writes_results_and_fails_on_regression(tmp_path, monkeypatch):
+    """Test that a run stores JSON results, and a baseline far faster than reality fails the run"""
+    monkeypatch.setattr(run_benchmarks_module, "TIME_FLOOR_S", 0.0)
+    output, baseline = str(tmp_path / "latest.json"), str(tmp_path / "baseline.json")
+    assert main([500], ["engineer_features"], repeats=1, output=output, baseline=baseline, update_baseline=True) == 0
+    assert os.path.exists(output) and os.path.exists(baseline)
+
+    faster = run_benchmarks([500], ["engineer_features"], repeats=1, verbose=False)
+    faster["results"][0].update(seconds_min=1e-9)
+    with open(baseline, "w") as f:
+        json.dump(faster, f)
+    assert main([500], ["engineer_features"], repeats=1, output=output, baseline=baseline) == 1
+
+def test_unknown_benchmark_is_rejected():
+    """Test that asking for a benchmark that does not exist fails early"""
+    with pytest.raises(ValueError):
+        run_benchmarks([100], ["no_such_benchmark"], verbose=False)
+
+def test_compare_refuses_a_baseline_from_another_environment(tmp_path):
+    """Test that timings are never compared against a baseline from a different machine"""
+    current = run_benchmarks([200], ["engineer_features"], repeats=1, verbose=False)
+    other = json.loads(json.dumps(current))
+    other["environment"]["cpu_count"] = (current["environment"]["cpu_count"] or 1) + 7
+    with pytest.raises(ValueError, match="cpu_count"):
+        compare_results(current, other)
+
+    baseline = str(tmp_path / "baseline.json")
+    with open(baseline, "w") as f:
+        json.dump(other, f)
+    assert main([200], ["engineer_features"], repeats=1, output=str(tmp_path / "latest.json"),
+                baseline=baseline) == 2
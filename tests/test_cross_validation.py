@@ -0,0 +1,34 @@
+import os
+import sys
+import numpy as np
+import pytest
+from scipy import sparse
+
+# Add the project root directory to the Python path
+project_root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, project_root)
+
+from src.models.cross_validation import run_parallel_cv
+from src.models.train_model import get_model
+
+@pytest.fixture
+def sparse_problem():
+    """Fixture providing a CSR matrix with one informative column"""
+    rng = np.random.default_rng(0)
+    y = (rng.random(600) < 0.2).astype(int)
+    noise = sparse.random(600, 50, density=0.05, format="csr", random_state=0)
+    signal = sparse.csr_matrix(y[:, None] + rng.normal(scale=0.5, size=(600, 1)))
+    return sparse.hstack([noise, signal]).tocsr(), y
+
+@pytest.mark.parametrize("n_workers", [1, 2])
+def test_parallel_cv_scores_every_row_once(sparse_problem, n_workers, tmp_path):
+    """Test that folds partition the rows, report metrics, and clean up the shared matrix"""
+    X, y = sparse_problem
+    result = run_parallel_cv(X, y, get_model(n_estimators=20), n_splits=3,
+                             n_workers=n_workers, tmp_dir=str(tmp_path))
+    folds = result["folds"]
+
+    assert folds.loc[[0, 1, 2], "n_val"].sum() == len(y)
+    assert folds.loc["mean", "roc_auc"] > 0.8
+    assert result["n_workers"] == n_workers
+    assert list(tmp_path.iterdir()) == []
@@ -13,7 +13,12 @@ warnings.filterwarnings("ignore", category=FutureWarning)
 project_root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
 sys.path.insert(0, project_root)
 
-from src.data_processing import preprocess_data
+from src.data_processing import (
+    preprocess_data, preprocess_data_streaming, load_processed_data, load_data,
+    validate_schema, QuantileSketch
+)
+from src import data_processing
+from src.synthetic_data import generate_transactions
 
 @pytest.fixture
 def sample_raw_data():
@@ -95,4 +100,98 @@ def test_fraudresult_filled(sample_raw_data):
     """Test that missing FraudResult values are filled"""
     cleaned = preprocess_data(sample_raw_data.copy())
     assert cleaned['FraudResult'].isnull().sum() == 0, \
-        "Missing FraudResult values should be filled"
\ No newline at end of file
+        "Missing FraudResult values should be filled"
+
+def test_streaming_matches_in_memory(sample_raw_data, tmp_path):
+    """Test that chunked streaming preprocessing reproduces the in-memory output"""
+    raw_path = tmp_path / "raw.csv"
+    # Same TransactionId as T2 but a different amount: not a duplicate row for either path
+    reused_id = sample_raw_data.iloc[[1]].assign(Amount=75.0)
+    pd.concat([sample_raw_data, reused_id], ignore_index=True).to_csv(raw_path, index=False)
+
+    expected_path = tmp_path / "expected.csv"
+    preprocess_data(pd.read_csv(raw_path)).to_csv(expected_path, index=False)
+
+    streamed_path = tmp_path / "streamed.csv"
+    preprocess_data_streaming(str(raw_path), str(streamed_path), chunksize=2)
+
+    pd.testing.assert_frame_equal(pd.read_csv(streamed_path), pd.read_csv(expected_path))
+
+def test_streaming_matches_in_memory_on_synthetic_data(tmp_path):
+    """Test streaming/in-memory parity with repeated rows, reused TransactionIds and NaNs across many chunks"""
+    raw = generate_transactions(3000, seed=5)
+    rng = np.random.default_rng(0)
+    repeated = raw.iloc[rng.choice(len(raw), 200)]
+    reused_ids = raw.iloc[rng.choice(len(raw), 50)].assign(Amount=lambda df: df["Amount"] + 1)
+    raw = pd.concat([raw, repeated, reused_ids], ignore_index=True).sample(frac=1, random_state=0)
+    raw.loc[raw.sample(100, random_state=1).index, "Amount"] = np.nan
+    raw.loc[raw.sample(100, random_state=2).index, "ProviderId"] = None
+    raw_path = tmp_path / "raw.csv"
+    raw.to_csv(raw_path, index=False)
+
+    expected = preprocess_data(pd.read_csv(raw_path))
+    streamed_path = tmp_path / "streamed.csv"
+    preprocess_data_streaming(str(raw_path), str(streamed_path), chunksize=257)
+    streamed = pd.read_csv(streamed_path)
+
+    assert len(streamed) == len(expected) == len(raw.drop_duplicates())
+    expected_path = tmp_path / "expected.csv"
+    expected.to_csv(expected_path, index=False)
+    pd.testing.assert_frame_equal(streamed, pd.read_csv(expected_path))
+
+def test_quantile_sketch_merge_is_exact():
+    """Test that merged sketches give the same quantiles as pandas"""
+    values = np.random.default_rng(0).integers(-500, 500, size=2_000).astype(float)
+    left, right = QuantileSketch().update(values[:700]), QuantileSketch().update(values[700:])
+    merged = left.merge(right)
+    for q in (0.25, 0.5, 0.75):
+        assert merged.quantile(q) == pytest.approx(pd.Series(values).quantile(q))
+
+def test_parquet_output_is_typed_and_projectable(sample_raw_data, tmp_path):
+    """Test that the Parquet output keeps categorical IDs and supports column projection"""
+    raw_path = tmp_path / "raw.csv"
+    sample_raw_data.assign(CustomerId=['C1', 'C2', 'C3', 'C1']).to_csv(raw_path, index=False)
+    parquet_path = tmp_path / "cleaned.parquet"
+    preprocess_data_streaming(str(raw_path), str(parquet_path), chunksize=2)
+
+    loaded = load_processed_data(['CustomerId', 'ChannelId', 'Amount'], str(parquet_path))
+    assert list(loaded.columns) == ['CustomerId', 'ChannelId', 'Amount']
+    assert isinstance(loaded['CustomerId'].dtype, pd.CategoricalDtype)
+    assert isinstance(loaded['ChannelId'].dtype, pd.CategoricalDtype)
+    assert sorted(loaded['CustomerId'].astype(str)) == ['C1', 'C2', 'C3']
+
+def test_schema_driven_loader(sample_raw_data, tmp_path):
+    """Test that the definitions file drives compact dtypes, usecols and validation"""
+    raw_path = tmp_path / "raw.csv"
+    sample_raw_data.assign(Extra=1).to_csv(raw_path, index=False)
+    definitions_path = os.path.join(project_root, "data", "raw", "Xente_Variable_Definitions.csv")
+
+    df, definitions = load_data(str(raw_path), definitions_path)
+    assert 'Extra' not in df.columns
+    assert isinstance(df['TransactionId'].dtype, pd.StringDtype) and df['TransactionId'].dtype.storage == 'pyarrow'
+    assert df['Amount'].dtype == np.float32
+    assert str(df['PricingStrategy'].dtype) == 'Int8'
+
+    report = validate_schema(df, definitions)
+    assert 'CustomerId' in report['missing']
+    assert report['dtype_mismatch'] == {}
+    with pytest.raises(ValueError):
+        validate_schema(df, definitions, strict=True)
+
+    cleaned = preprocess_data(df)
+    assert 'Unknown' in cleaned['BatchId'].values
+    assert str(cleaned['CountryCode'].dtype) == 'Int16'
+
+def test_chunked_main_validates_the_schema(sample_raw_data, tmp_path, monkeypatch, capsys):
+    """Test that the --chunksize path runs the same schema checks as the in-memory path"""
+    raw_path = tmp_path / "raw.csv"
+    sample_raw_data.to_csv(raw_path, index=False)
+    monkeypatch.setattr(data_processing, "RAW_DATA_PATH", str(raw_path))
+    monkeypatch.setattr(data_processing, "RAW_DEFINITIONS_PATH",
+                        os.path.join(project_root, "data", "raw", "Xente_Variable_Definitions.csv"))
+    monkeypatch.setattr(data_processing, "PROCESSED_DATA_PATH", str(tmp_path / "cleaned.parquet"))
+    monkeypatch.setattr(data_processing, "PROCESSED_DEFINITIONS_PATH", str(tmp_path / "definitions.csv"))
+
+    data_processing.main(chunksize=2)
+    assert "Missing columns in dataset" in capsys.readouterr().out
+    assert len(pd.read_parquet(tmp_path / "cleaned.parquet")) == 3
@@ -0,0 +1,51 @@
+import asyncio
+import json
+import os
+import sys
+import pytest
+
+# Add the project root directory to the Python path
+project_root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, project_root)
+
+from benchmarks.load_test import build_requests, load_payloads, run_load_test
+from src.api.server_timing import StageTimer, parse_server_timing
+from tests.test_api import api, train_small_model  # noqa: F401
+
+def test_server_timing_round_trip():
+    """Test that stage durations written to the Server-Timing header parse back in milliseconds"""
+    timer = StageTimer()
+    timer.record("parse", 0.002)
+    timer.record("predict", 0.010)
+    timer.record("predict", 0.005)
+    stages = parse_server_timing(timer.header())
+    assert stages["parse"] == pytest.approx(2.0)
+    assert stages["predict"] == pytest.approx(15.0)
+    assert stages["total"] >= 0
+    assert parse_server_timing(None) == {}
+
+def test_replay_payloads_from_jsonl(tmp_path):
+    """Test that recorded payloads load with or without a "payload" wrapper and batch into CSV uploads"""
+    record = {"Amount": 1000, "Value": 1000, "ProductCategory": "airtime", "ChannelId": "ChannelId_3",
+              "ProviderId": "ProviderId_6", "CustomerId": "CustomerId_1",
+              "TransactionStartTime": "2018-11-15T03:12:00Z"}
+    path = tmp_path / "recorded.jsonl"
+    path.write_text(json.dumps(record) + "\n" + json.dumps({"payload": record, "status": 200}) + "\n")
+    payloads = load_payloads(str(path))
+    assert payloads == [{**record, "Amount": 1000.0, "Value": 1000.0}] * 2
+
+    requests = build_requests(payloads * 3, "predict_batch", batch_rows=4)
+    assert len(requests) == 2 and requests[0]["url"] == "/api/predict_batch"
+
+@pytest.mark.parametrize("endpoint, mode", [("predict", {"concurrency": 4}), ("predict", {"rps": 200}),
+                                            ("predict_batch", {"concurrency": 2})])
+def test_in_process_load_test_reports_latency_and_stages(api, endpoint, mode):
+    """Test that an in-process run reports throughput, percentiles, no errors and server stage timings"""
+    train_small_model(api)
+    requests = build_requests(load_payloads(n=40), endpoint, batch_rows=10)
+    report = asyncio.run(run_load_test(requests, total=20, warmup=2, **mode))
+
+    assert report["requests"] == 20 and report["error_rate"] == 0.0
+    assert report["throughput_rps"] > 0
+    assert report["latency_ms"]["p50"] <= report["latency_ms"]["p99"] <= report["latency_ms"]["max"]
+    assert {"parse", "transform", "predict", "log", "total"} <= set(report["server_ms"])
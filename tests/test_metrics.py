@@ -0,0 +1,61 @@
+import os
+import sys
+import pytest
+
+# Add the project root directory to the Python path
+project_root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, project_root)
+
+from src.metrics import Counter, Gauge, Histogram, MetricsRegistry
+
+@pytest.fixture
+def registry():
+    return MetricsRegistry()
+
+def test_histogram_renders_cumulative_buckets(registry):
+    """Test that observations land in fixed buckets rendered cumulatively with sum and count"""
+    histogram = Histogram("stage_seconds", "Stage time", ("stage",), buckets=(0.01, 0.1, 1.0), registry=registry)
+    for value in (0.005, 0.01, 0.05, 2.0):
+        histogram.labels("predict").observe(value)
+    text = registry.render()
+
+    assert "# TYPE stage_seconds histogram" in text
+    assert 'stage_seconds_bucket{stage="predict",le="0.01"} 2' in text
+    assert 'stage_seconds_bucket{stage="predict",le="0.1"} 3' in text
+    assert 'stage_seconds_bucket{stage="predict",le="1"} 3' in text
+    assert 'stage_seconds_bucket{stage="predict",le="+Inf"} 4' in text
+    assert 'stage_seconds_sum{stage="predict"} 2.065' in text
+    assert 'stage_seconds_count{stage="predict"} 4' in text
+
+def test_counters_gauges_and_collect_hooks(registry):
+    """Test counters, scrape-time gauge functions, label escaping and collect hooks"""
+    counter = Counter("requests_total", "Requests", ("status",), registry=registry)
+    counter.labels("200").inc()
+    counter.labels("200").inc(2)
+    depth = Gauge("queue_depth", "Queue depth", registry=registry)
+    queue = [1, 2, 3]
+    depth.labels().set_function(lambda: len(queue))
+    info = Gauge("model_info", "Model version", ("version",), registry=registry)
+    registry.on_collect(lambda: info.labels('v"1').set(1))
+    text = registry.render()
+
+    assert 'requests_total{status="200"} 3' in text
+    assert "queue_depth 3" in text
+    assert 'model_info{version="v\\"1"} 1' in text
+    with pytest.raises(ValueError):
+        Counter("requests_total", "Duplicate", registry=registry)
+    with pytest.raises(ValueError):
+        counter.labels("200", "extra")
+
+def test_non_string_labels_share_the_lock_free_child(registry):
+    """Test that int/bool label values map to their string child without taking the lock again"""
+    counter = Counter("responses_total", "Responses", ("status", "cached"), registry=registry)
+    child = counter.labels(200, True)
+
+    class NoLock:
+        def __enter__(self):
+            raise AssertionError("existing child looked up under the lock")
+    counter._lock = NoLock()
+    assert counter.labels(200, True) is child and counter.labels("200", "True") is child
+    child.inc()
+    assert 'responses_total{status="200",cached="True"} 1' in registry.render()
@@ -0,0 +1,89 @@
+import os
+import sys
+import numpy as np
+import pytest
+
+# Add the project root directory to the Python path
+project_root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, project_root)
+
+from src.pipeline_runner import ArtifactCache, Stage, run_stages
+
+calls = []
+
+def read_stage(inputs, path):
+    calls.append("read")
+    with open(path) as f:
+        return {"numbers": [int(line) for line in f]}
+
+def scale_stage(inputs, factor):
+    calls.append("scale")
+    return {"scaled": [n * factor for n in inputs["numbers"]]}
+
+@pytest.fixture
+def flow(tmp_path):
+    """Fixture providing a two-stage flow over a small input file and an empty cache"""
+    calls.clear()
+    source = tmp_path / "numbers.txt"
+    source.write_text("1\n2\n3\n")
+
+    def build(factor=2):
+        return [
+            Stage("read", read_stage, inputs=[str(source)], outputs=["numbers"], params={"path": str(source)}),
+            Stage("scale", scale_stage, inputs=["numbers"], outputs=["scaled"], params={"factor": factor}),
+        ]
+    return build, source, ArtifactCache(str(tmp_path / "cache"))
+
+def test_unchanged_stages_are_skipped(flow):
+    """Test that a second identical run serves every stage from the cache"""
+    build, _, cache = flow
+    first, _ = run_stages(build(), cache, verbose=False)
+    second, report = run_stages(build(), cache, verbose=False)
+
+    assert second["scaled"] == first["scaled"] == [2, 4, 6]
+    assert [r["status"] for r in report] == ["cached", "cached"]
+    assert calls == ["read", "scale"]
+
+def test_param_change_reruns_only_downstream_stage(flow):
+    """Test that changing a stage parameter re-runs that stage but not its cached inputs"""
+    build, _, cache = flow
+    run_stages(build(), cache, verbose=False)
+    artifacts, report = run_stages(build(factor=10), cache, verbose=False)
+
+    assert artifacts["scaled"] == [10, 20, 30]
+    assert [r["status"] for r in report] == ["cached", "ran"]
+
+def test_input_content_change_invalidates_dependents(flow):
+    """Test that editing an input file re-runs every stage that depends on it"""
+    build, source, cache = flow
+    run_stages(build(), cache, verbose=False)
+    source.write_text("5\n")
+    artifacts, report = run_stages(build(), cache, verbose=False)
+
+    assert artifacts["scaled"] == [10]
+    assert [r["status"] for r in report] == ["ran", "ran"]
+
+def test_eviction_drops_least_recently_used_entries(tmp_path):
+    """Test size-based eviction removes old entries first and never the protected ones"""
+    cache = ArtifactCache(str(tmp_path / "cache"), max_bytes=0)
+    for key in ("old", "new"):
+        cache.put(key, "stage", {"blob": np.zeros(1000)})
+    os.utime(os.path.join(cache.root, "old", "meta.json"), (0, 0))
+
+    assert cache.evict(keep={"new"}) == ["old"]
+    assert cache.has("new") and not cache.has("old")
+
+def test_config_value_dependency_invalidates_stage(flow):
+    """Test that a config dict listed in code_deps re-runs the stage when its contents change"""
+    build, _, cache = flow
+    config = {"factor": 2}
+
+    def stages():
+        read, scale = build()
+        scale.code_deps = [config]
+        return [read, scale]
+
+    run_stages(stages(), cache, verbose=False)
+    assert [r["status"] for r in run_stages(stages(), cache, verbose=False)[1]] == ["cached", "cached"]
+    config["factor"] = 3
+    assert [r["status"] for r in run_stages(stages(), cache, verbose=False)[1]] == ["cached", "ran"]
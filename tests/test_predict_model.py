@@ -1,6 +1,12 @@
 import pandas as pd
 import numpy as np
-from src.models.predict_model import load_pipeline, predict_risk
+import pytest
+from src.models.predict_model import (
+    load_pipeline, predict_risk, predict_risk_record, engineer_features,
+    get_explainer, get_feature_builder
+)
+from src.models.train_model import build_pipeline, ID_ENCODINGS
+from src.synthetic_data import generate_transactions
 
 def test_predict_risk_output_shape():
     pipeline = load_pipeline("models/fitted_pipeline.pkl")
@@ -20,4 +26,63 @@ def test_predict_risk_output_shape():
     assert risk_band in ["Low", "Medium", "High"]
     assert isinstance(top_features, list)
     assert len(top_features) > 0
-#New commit
\ No newline at end of file
+#New commit
+
+def test_predict_risk_without_explanation_skips_shap():
+    pipeline = load_pipeline("models/fitted_pipeline.pkl")
+    sample_input = pd.DataFrame([{
+        "Amount": 1000.0,
+        "Value": 100.0,
+        "ProductCategory": "airtime",
+        "ChannelId": "ChannelId_3",
+        "ProviderId": "ProviderId_6",
+        "CustomerId": "CustomerId_4406",
+        "TransactionStartTime": "2018-11-15 03:12:00+00:00"
+    }])
+    label, proba, risk_band, top_features = predict_risk(pipeline, sample_input, explain=False)
+    assert top_features is None
+
+    _, explained_proba, _, _ = predict_risk(pipeline, sample_input)
+    assert proba == explained_proba
+    assert get_explainer(pipeline) is get_explainer(pipeline)
+
+def test_feature_builder_matches_pipeline_transform():
+    pipeline = load_pipeline("models/fitted_pipeline.pkl")
+    records = [
+        {"Amount": 95000.0, "Value": 10.0, "ProductCategory": "airtime", "ChannelId": "ChannelId_2",
+         "ProviderId": "ProviderId_3", "CustomerId": "CustomerId_1999",
+         "TransactionStartTime": "2018-11-15 03:12:00+00:00"},
+        {"Amount": -50.0, "Value": 50.0, "ProductCategory": "unseen", "ChannelId": "ChannelId_9",
+         "ProviderId": "ProviderId_1", "CustomerId": "CustomerId_none",
+         "TransactionStartTime": "not a timestamp"},
+    ]
+    builder = get_feature_builder(pipeline)
+    preprocessor = pipeline.named_steps["preprocessor"]
+    for record in records:
+        expected = preprocessor.transform(engineer_features(pd.DataFrame([record]))).toarray()[0]
+        np.testing.assert_array_equal(builder.build(record), expected)
+
+        _, fast_proba, _, _ = predict_risk_record(pipeline, record)
+        _, proba, _, _ = predict_risk(pipeline, pd.DataFrame([record]), explain=False)
+        assert fast_proba == proba
+
+@pytest.mark.parametrize("id_encoding", ID_ENCODINGS)
+def test_id_encodings_stay_sparse_and_match_fast_path(id_encoding):
+    """Test that every CustomerId encoding yields CSR features that the single-record builder reproduces"""
+    rng = np.random.default_rng(0)
+    n = 400
+    raw = generate_transactions(n, seed=0, n_customers=150)
+    y = (rng.random(n) < 0.2).astype(int)
+    numeric = ["Amount", "Value", "Hour", "DayOfWeek", "AmountToValueRatio", "IsNightTransaction"]
+    categorical = ["ProductCategory", "ChannelId", "ProviderId", "CustomerId"]
+
+    pipeline = build_pipeline(numeric, categorical, id_encoding, hash_features=64)
+    pipeline.set_params(classifier__n_estimators=10)
+    pipeline.fit(engineer_features(raw)[numeric + categorical], y)
+
+    builder = get_feature_builder(pipeline)
+    records = raw.head(3).to_dict("records") + [dict(raw.iloc[0].to_dict(), CustomerId="CustomerId_unseen")]
+    for record in records:
+        expected = pipeline[:-1].transform(engineer_features(pd.DataFrame([record]))[numeric + categorical])
+        assert expected.format == "csr"
+        np.testing.assert_allclose(builder.build(record), expected.toarray()[0])
@@ -0,0 +1,64 @@
+import glob
+import os
+import sys
+import time
+import pandas as pd
+import pyarrow.parquet as pq
+
+# Add the project root directory to the Python path
+project_root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, project_root)
+
+from src.api.prediction_logger import PredictionLogger
+
+def read_logs(log_dir):
+    files = sorted(glob.glob(os.path.join(log_dir, "*.parquet")))
+    return files, pd.concat([pd.read_parquet(f) for f in files], ignore_index=True)
+
+def test_logger_flushes_and_rotates(tmp_path):
+    """Test that buffered rows reach rotated Parquet files and are flushed on close"""
+    logger = PredictionLogger(str(tmp_path), flush_rows=10, rotate_rows=25).start()
+    for i in range(60):
+        assert logger.log(pd.DataFrame({"CustomerId": [f"C{i}"], "risk_probability": [i / 100]}))
+    logger.close()
+
+    files, logged = read_logs(str(tmp_path))
+    assert len(files) >= 2
+    assert sorted(logged["CustomerId"]) == sorted(f"C{i}" for i in range(60))
+    assert logger.written_rows == 60
+
+def test_logger_drops_when_full(tmp_path):
+    """Test that the drop policy bounds memory instead of blocking callers"""
+    logger = PredictionLogger(str(tmp_path), max_buffer_rows=5, when_full="drop")
+    accepted = [logger.log(pd.DataFrame({"risk_probability": [0.1]})) for _ in range(8)]
+    assert accepted.count(True) == 5
+    assert logger.dropped_rows == 3
+
+    logger.close()
+    _, logged = read_logs(str(tmp_path))
+    assert len(logged) == 5
+
+def test_logger_survives_write_failures(tmp_path, monkeypatch):
+    """Test that failed writes are counted and the writer thread keeps draining later rows"""
+    logger = PredictionLogger(str(tmp_path), flush_rows=1, flush_interval_s=0.05).start()
+    # Mixed int/str values cannot be converted to an Arrow column
+    logger.log(pd.DataFrame({"CustomerId": [1, "C2"], "risk_probability": [0.1, 0.2]}))
+    logger.log(pd.DataFrame({"CustomerId": ["C3"], "risk_probability": [0.3]}))
+    deadline = time.monotonic() + 5
+    while logger.failed_rows + logger.written_rows < 3 and time.monotonic() < deadline:
+        time.sleep(0.01)
+
+    def full_disk(self, table):
+        raise OSError("No space left on device")
+    monkeypatch.setattr(pq.ParquetWriter, "write_table", full_disk)
+    logger.log(pd.DataFrame({"CustomerId": ["C4"], "risk_probability": [0.4]}))
+    while logger.failed_rows < 3 and time.monotonic() < deadline:
+        time.sleep(0.01)
+    monkeypatch.undo()
+
+    logger.log(pd.DataFrame({"CustomerId": ["C5"], "risk_probability": [0.5]}))
+    logger.close()
+    assert (logger.failed_rows, logger.written_rows) == (3, 2)
+    assert "No space left" in logger.last_error
+    _, logged = read_logs(str(tmp_path))
+    assert sorted(logged["CustomerId"]) == ["C3", "C5"]
@@ -0,0 +1,77 @@
+import os
+import sys
+import numpy as np
+import pandas as pd
+import pytest
+
+# Add the project root directory to the Python path
+project_root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, project_root)
+
+from src.features.rfm_target import create_rfm_features, IncrementalRFM, assign_risk_label
+
+@pytest.fixture
+def transactions():
+    """Fixture providing two days of transactions for three customers"""
+    return pd.DataFrame({
+        'TransactionId': ['T1', 'T2', 'T3', 'T4', 'T5', 'T6'],
+        'CustomerId': ['C1', 'C2', 'C1', 'C3', 'C2', 'C1'],
+        'Amount': [100.0, 50.0, 300.0, 20.0, -10.0, 5.0],
+        'TransactionStartTime': [
+            '2018-11-01T08:00:00Z', '2018-11-01T09:30:00Z', '2018-11-05T10:00:00Z',
+            '2018-11-06T12:00:00Z', '2018-11-10T23:00:00Z', '2018-11-11T01:00:00Z'
+        ]
+    })
+
+def test_create_rfm_features(transactions):
+    """Test recency, frequency and monetary values per customer"""
+    rfm = create_rfm_features(transactions, pd.Timestamp('2018-11-12')).set_index('CustomerId')
+
+    assert list(rfm.columns) == ['Recency', 'Frequency', 'Monetary']
+    assert rfm.loc['C1'].tolist() == [0, 3, 405.0]
+    assert rfm.loc['C2'].tolist() == [1, 2, 40.0]
+    assert rfm.loc['C3'].tolist() == [5, 1, 20.0]
+
+def test_incremental_rfm_matches_full_recompute(transactions):
+    """Test that absorbing days one at a time matches a full recomputation"""
+    incremental = IncrementalRFM().update(transactions.iloc[:3]).update(transactions.iloc[3:])
+    snapshot = pd.Timestamp('2018-11-20')
+
+    pd.testing.assert_frame_equal(
+        incremental.compute(snapshot),
+        create_rfm_features(transactions, snapshot)
+    )
+    assert incremental.latest_transaction == pd.Timestamp('2018-11-11 01:00:00')
+
+@pytest.fixture
+def rfm_table():
+    """Fixture providing an RFM table with a clearly low-value customer group"""
+    rng = np.random.default_rng(0)
+    n = 600
+    low_value = np.arange(n) < 200
+    return pd.DataFrame({
+        'CustomerId': [f'C{i}' for i in range(n)],
+        'Recency': np.where(low_value, rng.integers(60, 90, n), rng.integers(0, 10, n)),
+        'Frequency': np.where(low_value, 1, rng.integers(20, 40, n)),
+        'Monetary': np.where(low_value, rng.uniform(10, 50, n), rng.uniform(5_000, 9_000, n))
+    })
+
+@pytest.mark.parametrize("options", [
+    {},
+    {"backend": "minibatch"},
+    {"backend": "minibatch", "sample_size": 100},
+])
+def test_assign_risk_label_backends(rfm_table, options):
+    """Test that every clustering backend keeps the output contract and finds the risky group"""
+    labels = assign_risk_label(rfm_table, **options)
+
+    assert list(labels.columns) == ['CustomerId', 'is_high_risk']
+    assert len(labels) == len(rfm_table)
+    assert labels['is_high_risk'].iloc[:200].all()
+
+def test_assign_risk_label_warm_start(rfm_table):
+    """Test that yesterday's centroids can seed today's clustering"""
+    labels, clusters = assign_risk_label(rfm_table, return_clusters=True)
+    warm = assign_risk_label(rfm_table, init_centroids=clusters['centroids'])
+
+    pd.testing.assert_frame_equal(labels, warm)
@@ -0,0 +1,101 @@
+import contextlib
+import io
+import os
+import sys
+import pandas as pd
+import pytest
+
+# Add the project root directory to the Python path
+project_root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, project_root)
+
+from run_prediction import (
+    _init_worker, _worker, count_rows, csv_shard_offsets, merge_shards, read_csv_bytes, read_rows, score_sharded
+)
+from src.synthetic_data import generate_transactions
+from tests.test_api import train_small_model
+
+@pytest.fixture
+def frame():
+    """Fixture providing a frame large enough to span several Parquet row groups"""
+    return pd.DataFrame({"CustomerId": [f"C{i}" for i in range(1000)], "Amount": range(1000)})
+
+def test_read_rows_returns_exact_ranges(frame, tmp_path):
+    """Test that Parquet row ranges are read exactly, across row-group boundaries"""
+    path = str(tmp_path / "input.parquet")
+    frame.to_parquet(path, index=False, row_group_size=128)
+
+    assert count_rows(path) == len(frame)
+    for start, stop in [(0, 250), (250, 500), (900, 1000), (127, 129)]:
+        shard = read_rows(path, start, stop, ["CustomerId", "Amount"])
+        pd.testing.assert_frame_equal(shard, frame.iloc[start:stop].reset_index(drop=True))
+
+def test_csv_shards_are_read_by_byte_offset(frame, tmp_path):
+    """Test that CSV shard offsets cover every row exactly once, in order"""
+    path = str(tmp_path / "input.csv")
+    frame.to_csv(path, index=False)
+
+    rows, offsets = csv_shard_offsets(path, 300)
+    assert rows == count_rows(path) == len(frame) and len(offsets) == 5
+    for shard_id, start in enumerate(range(0, rows, 300)):
+        shard = read_csv_bytes(path, *offsets[shard_id:shard_id + 2], ["CustomerId", "Amount"])
+        pd.testing.assert_frame_equal(shard, frame.iloc[start:start + 300].reset_index(drop=True))
+
+@pytest.fixture
+def scoring_run(tmp_path):
+    """Fixture providing small trained artifacts and a synthetic input written as Parquet and CSV"""
+    train_small_model(tmp_path)
+    df = generate_transactions(1000, seed=3)
+    df.to_parquet(tmp_path / "input.parquet", index=False, row_group_size=100)
+    df.to_csv(tmp_path / "input.csv", index=False)
+
+    def run(suffix=".parquet", output_dir="shards"):
+        with contextlib.redirect_stdout(io.StringIO()):
+            return score_sharded(str(tmp_path / f"input{suffix}"), str(tmp_path / output_dir),
+                                 str(tmp_path / "final_cv_model.pkl"), str(tmp_path / "fitted_pipeline.pkl"),
+                                 shard_rows=300, workers=1)
+    return run, df, tmp_path
+
+def shard_mtimes(directory):
+    return {name: os.stat(os.path.join(directory, name)).st_mtime_ns
+            for name in os.listdir(directory) if name.startswith("part-")}
+
+@pytest.mark.parametrize("suffix", [".parquet", ".csv"])
+def test_score_sharded_scores_every_transaction_once(scoring_run, suffix):
+    """Test that sharded scoring covers every input row, keyed by TransactionId, with a complete manifest"""
+    run, df, tmp_path = scoring_run
+    manifest = run(suffix)
+
+    assert manifest["completed"] and manifest["total_rows"] == len(df)
+    assert sorted(int(k) for k in manifest["shards"]) == [0, 1, 2, 3]
+    assert [manifest["shards"][k]["rows"] for k in ("0", "3")] == [300, 100]
+    assert manifest["params"]["model"]["sha256"] and manifest["params"]["pipeline"]["sha256"]
+
+    merge_shards(str(tmp_path / "shards"), str(tmp_path / "predictions.csv"))
+    scores = pd.read_csv(tmp_path / "predictions.csv")
+    assert list(scores.columns[:2]) == ["TransactionId", "CustomerId"]
+    assert sorted(scores["TransactionId"]) == sorted(df["TransactionId"])
+    assert scores["risk_probability"].between(0, 1).all()
+
+def test_rerun_resumes_until_artifacts_change(scoring_run):
+    """Test that a rerun only scores missing shards, and retraining in place rescores everything"""
+    run, _, tmp_path = scoring_run
+    shards = tmp_path / "shards"
+    run()
+    before = shard_mtimes(shards)
+    os.remove(shards / "part-00002.parquet")
+    run()
+    after = shard_mtimes(shards)
+    assert {name for name in after if after[name] != before.get(name)} == {"part-00002.parquet"}
+
+    train_small_model(tmp_path, threshold=500)
+    manifest = run()
+    assert manifest["completed"]
+    rescored = shard_mtimes(shards)
+    assert all(rescored[name] != after[name] for name in after)
+
+def test_workers_split_the_cores(scoring_run):
+    """Test that each scoring worker's classifier is limited to its share of the cores"""
+    _, _, tmp_path = scoring_run
+    _init_worker(str(tmp_path / "final_cv_model.pkl"), str(tmp_path / "fitted_pipeline.pkl"), 3)
+    assert _worker["model"].get_params()["n_jobs"] == 3
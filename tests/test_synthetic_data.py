@@ -0,0 +1,41 @@
+import os
+import sys
+import pandas as pd
+import pytest
+
+# Add the project root directory to the Python path
+project_root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, project_root)
+
+from src.data_processing import RAW_DEFINITIONS_PATH, load_definitions, preprocess_data, validate_schema
+from src.synthetic_data import RAW_COLUMNS, as_loaded, generate_transactions
+
+def test_generator_is_deterministic():
+    """Test that the same size and seed give identical frames and another seed does not"""
+    assert generate_transactions(2_000, seed=7).equals(generate_transactions(2_000, seed=7))
+    assert not generate_transactions(2_000, seed=7).equals(generate_transactions(2_000, seed=8))
+
+@pytest.mark.parametrize("n_rows", [500, 20_000])
+def test_xente_shape_at_scale(n_rows):
+    """Test raw layout, scaled ID cardinalities, fraud skew and the 90-day time window"""
+    df = generate_transactions(n_rows)
+
+    assert list(df.columns) == RAW_COLUMNS and len(df) == n_rows
+    assert df["TransactionId"].is_unique
+    assert df["CustomerId"].nunique() <= round(n_rows * 3_742 / 95_662) + 1
+    assert df["AccountId"].nunique() <= df["CustomerId"].nunique()
+    assert (df["Value"] == df["Amount"].abs()).all()
+    assert 2 <= df["FraudResult"].sum() <= max(2, n_rows // 200)
+    # Fraud sits on much larger amounts than ordinary transactions
+    assert df.loc[df["FraudResult"] == 1, "Value"].median() > 10 * df.loc[df["FraudResult"] == 0, "Value"].median()
+
+    ts = pd.to_datetime(df["TransactionStartTime"])
+    assert ts.is_monotonic_increasing
+    assert (ts.max() - ts.min()).days < 90
+
+def test_generated_data_matches_schema():
+    """Test that generated data passes strict schema validation and preprocessing"""
+    df = as_loaded(generate_transactions(1_000))
+    report = validate_schema(df, load_definitions(os.path.join(project_root, RAW_DEFINITIONS_PATH)), strict=True)
+    assert not report["missing"] and not report["dtype_mismatch"]
+    assert len(preprocess_data(df)) == 1_000
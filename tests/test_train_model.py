@@ -0,0 +1,95 @@
+import json
+import os
+import sys
+import numpy as np
+import pandas as pd
+import pytest
+
+# Add the project root directory to the Python path
+project_root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, project_root)
+
+from src.features.transformers import HashingEncoder
+from src.models.predict_model import engineer_features
+from src.models.train_model import (
+    build_pipeline, compute_scale_pos_weight, fit_classifier, fit_with_cost, get_model, load_tuned_params,
+    to_serving_pipeline
+)
+from src.synthetic_data import generate_transactions
+
+NUMERIC = ["Amount", "Value", "Hour", "DayOfWeek", "AmountToValueRatio", "IsNightTransaction"]
+CATEGORICAL = ["ProductCategory", "ChannelId", "ProviderId", "CustomerId"]
+
+@pytest.fixture
+def skewed_training_data():
+    """Fixture providing raw features with roughly 2% positive labels"""
+    rng = np.random.default_rng(0)
+    n = 2000
+    raw = generate_transactions(n, seed=0, n_customers=300)
+    y = pd.Series((rng.random(n) < 0.02).astype(int))
+    return engineer_features(raw)[NUMERIC + CATEGORICAL], y
+
+def test_scale_pos_weight_is_negative_to_positive_ratio():
+    """Test that the weighting strategy uses negatives / positives"""
+    assert compute_scale_pos_weight([0, 0, 0, 1]) == 3.0
+    with pytest.raises(ValueError):
+        compute_scale_pos_weight([0, 0])
+
+def test_weight_strategy_requires_scale_pos_weight():
+    """Test that weighting without a computed ratio fails loudly instead of silently training unweighted"""
+    with pytest.raises(ValueError):
+        build_pipeline(NUMERIC, CATEGORICAL, imbalance="weight")
+
+@pytest.mark.parametrize("imbalance, shrinks", [("undersample", True), ("smote", False)])
+def test_sampler_only_touches_training_rows(skewed_training_data, imbalance, shrinks):
+    """Test that resampling changes the fitted row count but not the serving pipeline"""
+    X, y = skewed_training_data
+    pipeline = build_pipeline(NUMERIC, CATEGORICAL, imbalance=imbalance, sampling_ratio=0.2)
+    pipeline.set_params(classifier__n_estimators=10)
+    cost = fit_with_cost(pipeline, X, y)
+
+    assert (cost["train_rows"] < len(y)) == shrinks
+    assert cost["fit_seconds"] > 0 and cost["fit_peak_mb"] > 0
+    assert "XGBoost native" in cost["fit_peak_mb_scope"]
+
+    serving = to_serving_pipeline(pipeline)
+    assert list(serving.named_steps) == ["preprocessor", "classifier"]
+    assert serving.predict_proba(X).shape == (len(X), 2)
+
+def test_fast_profile_persists_only_best_trees(skewed_training_data):
+    """Test that early stopping truncates the booster to best_iteration + 1 trees"""
+    X, y = skewed_training_data
+    pipeline = build_pipeline(NUMERIC, CATEGORICAL, profile="fast", n_estimators=300,
+                              learning_rate=0.3, early_stopping_rounds=5, max_bin=32, n_jobs=1)
+    cost = fit_with_cost(pipeline, X, y)
+
+    classifier = pipeline.named_steps["classifier"]
+    assert classifier.get_params()["tree_method"] == "hist"
+    assert classifier.get_params()["max_bin"] == 32
+    assert cost["n_trees"] < 300
+    assert classifier.get_booster().num_boosted_rounds() == cost["n_trees"]
+    assert pipeline.predict_proba(X).shape == (len(X), 2)
+
+def test_fit_classifier_holds_out_eval_rows_for_early_stopping(skewed_training_data):
+    """Test that a bare classifier with early stopping fits on a transformed matrix without an eval set"""
+    X, y = skewed_training_data
+    X_transformed = build_pipeline(NUMERIC, CATEGORICAL).named_steps["preprocessor"].fit_transform(X)
+    model = get_model("fast", n_estimators=300, learning_rate=0.3, early_stopping_rounds=5, n_jobs=1)
+    fit_classifier(model, X_transformed, y)
+
+    assert model.get_booster().num_boosted_rounds() < 300
+    assert model.predict_proba(X_transformed).shape == (len(X), 2)
+
+def test_tuned_params_override_the_profile(tmp_path):
+    """Test that a best_params.json from the hyperparameter search reaches the classifier"""
+    path = tmp_path / "best_params.json"
+    path.write_text(json.dumps({"max_depth": 4, "learning_rate": 0.07, "n_estimators": 150,
+                                "profile": "fast", "imbalance": "none", "id_encoding": "hash"}))
+
+    # The recorded search settings are build_pipeline arguments too, so the tuned model is rebuilt as scored
+    pipeline = build_pipeline(NUMERIC, CATEGORICAL, **load_tuned_params(str(path)))
+    params = pipeline.named_steps["classifier"].get_params()
+    assert (params["max_depth"], params["learning_rate"], params["n_estimators"]) == (4, 0.07, 150)
+    assert params["tree_method"] == "hist"
+    assert isinstance(dict((name, step) for name, step, _ in pipeline.named_steps["preprocessor"].transformers)["id"],
+                      HashingEncoder)
@@ -0,0 +1,86 @@
+import os
+import sys
+import numpy as np
+import pandas as pd
+import pytest
+
+# Add the project root directory to the Python path
+project_root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, project_root)
+
+from scipy import sparse
+
+from src.features.transformers import AggregateCustomerFeatures, FrequencyEncoder, HashingEncoder
+
+@pytest.fixture
+def history():
+    """Fixture providing a small transaction history for three customers"""
+    return pd.DataFrame({
+        'CustomerId': ['C1', 'C1', 'C2', 'C1', 'C2', 'C3'],
+        'Amount': [100.0, 300.0, 50.0, 200.0, np.nan, 10.0]
+    })
+
+def test_single_row_uses_fitted_history(history):
+    """Test that a one-row request sees the customer's full history, not TxnCount=1"""
+    transformer = AggregateCustomerFeatures().fit(history)
+    out = transformer.transform(pd.DataFrame({'CustomerId': ['C1'], 'Amount': [999.0]}))
+
+    assert out['TxnCount'].iloc[0] == 3
+    assert out['TotalAmount'].iloc[0] == pytest.approx(600.0)
+    assert out['AvgAmount'].iloc[0] == pytest.approx(200.0)
+    assert out['AmountStd'].iloc[0] == pytest.approx(100.0)
+
+def test_unseen_customer_gets_fallback(history):
+    """Test that customers absent at fit time get the defined fallback values"""
+    transformer = AggregateCustomerFeatures().fit(history)
+    out = transformer.transform(pd.DataFrame({'CustomerId': ['C9'], 'Amount': [5.0]}))
+
+    assert out['TxnCount'].iloc[0] == 0
+    assert out['TotalAmount'].iloc[0] == 0.0
+    assert out['AvgAmount'].iloc[0] == pytest.approx(history['Amount'].mean())
+
+def test_update_matches_full_refit(history):
+    """Test that folding in new transactions equals refitting on the combined data"""
+    new = pd.DataFrame({'CustomerId': ['C2', 'C4', 'C1'], 'Amount': [70.0, 5.0, 400.0]})
+    incremental = AggregateCustomerFeatures().fit(history).update(new)
+    refit = AggregateCustomerFeatures().fit(pd.concat([history, new]))
+
+    probe = pd.DataFrame({'CustomerId': ['C1', 'C2', 'C3', 'C4'], 'Amount': 0.0})
+    cols = ['TotalAmount', 'AvgAmount', 'TxnCount', 'AmountStd']
+    pd.testing.assert_frame_equal(incremental.transform(probe)[cols], refit.transform(probe)[cols])
+
+def test_empty_fit_returns_fallbacks():
+    """Test that a store fitted on no rows treats every customer as unseen"""
+    empty = pd.DataFrame({'CustomerId': pd.Series([], dtype=object), 'Amount': pd.Series([], dtype=float)})
+    out = AggregateCustomerFeatures().fit(empty).transform(pd.DataFrame({'CustomerId': ['C1'], 'Amount': [5.0]}))
+    assert out['TxnCount'].iloc[0] == 0 and out['TotalAmount'].iloc[0] == 0.0
+
+def test_std_is_accurate_for_large_amounts():
+    """Test that batched updates keep the std exact where sum-of-squares arithmetic cancels"""
+    rng = np.random.default_rng(0)
+    amounts = 1e9 + rng.normal(0, 1, 3000)
+    transformer = AggregateCustomerFeatures().fit(pd.DataFrame({'CustomerId': 'C1', 'Amount': amounts[:1000]}))
+    for batch in (amounts[1000:2000], amounts[2000:]):
+        transformer.update(pd.DataFrame({'CustomerId': 'C1', 'Amount': batch}))
+
+    out = transformer.transform(pd.DataFrame({'CustomerId': ['C1'], 'Amount': [0.0]}))
+    assert out['AmountStd'].iloc[0] == pytest.approx(np.std(amounts, ddof=1), rel=1e-6)
+    assert out['AvgAmount'].iloc[0] == pytest.approx(amounts.mean(), rel=1e-12)
+
+def test_hashing_encoder_is_fixed_width_and_sparse(history):
+    """Test that hashed IDs stay within n_features, are CSR, and match the single-token bucket"""
+    encoder = HashingEncoder(n_features=16).fit(history[['CustomerId']])
+    out = encoder.transform(pd.DataFrame({'CustomerId': ['C1', 'C2', 'never_seen']}))
+
+    assert sparse.isspmatrix_csr(out)
+    assert out.shape == (3, 16)
+    for row, value in enumerate(['C1', 'C2', 'never_seen']):
+        assert out[row, encoder.bucket('CustomerId', value)] == 1.0
+
+def test_frequency_encoder_uses_fitted_shares(history):
+    """Test that frequency encoding returns the fitted row share and 0 for unseen IDs"""
+    encoder = FrequencyEncoder().fit(history[['CustomerId']])
+    out = encoder.transform(pd.DataFrame({'CustomerId': ['C1', 'C3', 'C9']}))
+
+    np.testing.assert_allclose(out[:, 0], [3 / 6, 1 / 6, 0.0])
+    assert list(encoder.get_feature_names_out()) == ['CustomerId_frequency']
@@ -0,0 +1,62 @@
+import os
+import sys
+import numpy as np
+import pytest
+from scipy import sparse
+from xgboost import XGBClassifier
+
+# Add the project root directory to the Python path
+project_root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, project_root)
+
+from src.models.tree_compiler import FlatForest, export_booster
+
+@pytest.fixture
+def training_data():
+    """Fixture providing a small binary problem with missing values"""
+    rng = np.random.default_rng(0)
+    X = rng.normal(size=(600, 8)).astype(np.float32)
+    y = (X[:, 0] + X[:, 1] * X[:, 2] + rng.normal(scale=0.5, size=600) > 0).astype(int)
+    X[rng.random(X.shape) < 0.1] = np.nan
+    return X, y
+
+def test_dense_probabilities_match_xgboost(training_data):
+    """Test that the flattened forest reproduces XGBoost on dense input with NaNs, for batches and single rows"""
+    X, y = training_data
+    model = XGBClassifier(n_estimators=50, max_depth=4).fit(X, y)
+    forest = export_booster(model)
+
+    assert forest.n_trees == 50
+    np.testing.assert_allclose(forest.predict_proba(X), model.predict_proba(X), atol=1e-5)
+    np.testing.assert_allclose(forest.predict_proba(X[:1]), model.predict_proba(X[:1]), atol=1e-5)
+
+def test_sparse_absent_entries_are_missing(training_data):
+    """Test that CSR input treats absent entries as missing, exactly like XGBoost"""
+    X, y = training_data
+    X = np.where(np.random.default_rng(1).random(X.shape) < 0.5, 0.0, np.nan_to_num(X)).astype(np.float32)
+    X_sparse = sparse.csr_matrix(X)
+    model = XGBClassifier(n_estimators=50, max_depth=4).fit(X_sparse, y)
+    forest = export_booster(model)
+
+    np.testing.assert_allclose(forest.predict_proba(X_sparse), model.predict_proba(X_sparse), atol=1e-5)
+
+def test_export_honours_best_iteration(training_data):
+    """Test that an early-stopped model is exported only up to its best iteration"""
+    X, y = training_data
+    model = XGBClassifier(n_estimators=300, learning_rate=0.5, early_stopping_rounds=5)
+    model.fit(X[:400], y[:400], eval_set=[(X[400:], y[400:])], verbose=False)
+    forest = export_booster(model)
+
+    assert forest.n_trees == model.best_iteration + 1
+    np.testing.assert_allclose(forest.predict_proba(X), model.predict_proba(X), atol=1e-5)
+
+def test_saved_forest_is_memory_mapped(training_data, tmp_path):
+    """Test that a saved forest loads as read-only memory maps and scores identically"""
+    X, y = training_data
+    forest = export_booster(XGBClassifier(n_estimators=20, max_depth=3).fit(X, y))
+    forest.save(tmp_path / "forest")
+    loaded = FlatForest.load(tmp_path / "forest")
+
+    assert isinstance(loaded.feature, np.memmap) and not loaded.feature.flags.writeable
+    np.testing.assert_allclose(loaded.predict_proba(X), forest.predict_proba(X))
+    np.testing.assert_allclose(loaded.predict_proba(X[:1]), forest.predict_proba(X[:1]))
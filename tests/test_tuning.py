@@ -0,0 +1,54 @@
+import multiprocessing
+import os
+import sys
+import time
+import numpy as np
+import pytest
+
+# Add the project root directory to the Python path
+project_root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, project_root)
+
+from src.models.tuning import halving_schedule, successive_halving
+
+@pytest.fixture
+def holdout_problem():
+    """Fixture providing a small train/validation split with one informative column"""
+    rng = np.random.default_rng(0)
+    y = (rng.random(800) < 0.3).astype(int)
+    X = np.column_stack([y + rng.normal(scale=0.7, size=800), rng.normal(size=(800, 4))])
+    return X[:600], y[:600], X[600:], y[600:]
+
+def test_halving_schedule_shrinks_trials_and_grows_trees():
+    """Test the rung layout: keep 1/eta of the trials, give them eta times the trees"""
+    assert halving_schedule(27, 10, 1000, 3) == [(27, 10), (9, 30), (3, 90), (1, 270)]
+    assert halving_schedule(9, 100, 300, 3) == [(9, 100), (3, 300)]
+
+@pytest.mark.parametrize("cpu_budget", [1, 2])
+def test_successive_halving_logs_every_trial(holdout_problem, cpu_budget, tmp_path):
+    """Test that every finished trial is logged and the best comes from the deepest rung"""
+    logged = []
+    result = successive_halving(*holdout_problem, n_trials=4, min_trees=5, max_trees=20, eta=2,
+                                cpu_budget=cpu_budget, log_trial=logged.append, tmp_dir=str(tmp_path))
+
+    assert [t["rung"] for t in logged].count(0) == 4
+    assert len(logged) == len(result["trials"]) == 4 + 2 + 1
+    assert result["best"]["rung"] == 2 and result["best"]["n_estimators"] == 20
+    assert not result["out_of_time"]
+    assert list(tmp_path.iterdir()) == []
+
+def test_time_budget_stops_scheduling(holdout_problem):
+    """Test that an exhausted wall-clock budget stops the search instead of running every rung"""
+    with pytest.raises(RuntimeError):
+        successive_halving(*holdout_problem, n_trials=4, min_trees=5, max_trees=20, eta=2,
+                           cpu_budget=1, time_budget_s=0.0)
+
+def test_time_budget_kills_running_trials(holdout_problem):
+    """Test that trials still running at the deadline are killed with their workers, not awaited"""
+    started = time.monotonic()
+    with pytest.raises(RuntimeError):
+        successive_halving(*holdout_problem, n_trials=2, min_trees=200000, max_trees=200000,
+                           cpu_budget=2, time_budget_s=0.5)
+
+    assert time.monotonic() - started < 10
+    assert multiprocessing.active_children() == []